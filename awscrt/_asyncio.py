@@ -0,0 +1,281 @@
+"""
+Private utilities for the asyncio front ends of `awscrt`.
+
+awscrt's callbacks run on native event-loop threads, not the asyncio event loop.
+Going through loop.call_soon_threadsafe() for each callback writes to the loop's
+self-pipe and wakes it up every time. These utilities batch up everything that
+arrives while the loop hasn't woken up yet, so a burst of callbacks costs one wakeup.
+"""
+
+# Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.
+# SPDX-License-Identifier: Apache-2.0.
+
+import threading
+import weakref
+from collections import deque
+
+
+class _LoopBridge:
+    '''
+    Private class to run functions on an asyncio event loop, on behalf of other threads.
+    There is one per loop, shared by everything on that loop. Get it with _LoopBridge.get().
+    '''
+
+    _bridges = weakref.WeakKeyDictionary()
+    _bridges_lock = threading.Lock()
+
+    @classmethod
+    def get(cls, loop):
+        with cls._bridges_lock:
+            bridge = cls._bridges.get(loop)
+            if bridge is None:
+                bridge = cls(loop)
+                cls._bridges[loop] = bridge
+            return bridge
+
+    def __init__(self, loop):
+        # loop MUST only be weakly referenced, or the WeakKeyDictionary would keep it alive forever
+        self._loop_ref = weakref.ref(loop)
+        self._lock = threading.Lock()
+        self._pending = []
+        self._wakeup_scheduled = False
+
+    def call(self, fn, *args):
+        """Run fn(*args) on the loop soon. Safe to call from any thread, including the loop's."""
+        with self._lock:
+            self._pending.append((fn, args))
+            if self._wakeup_scheduled:
+                return
+            self._wakeup_scheduled = True
+
+        loop = self._loop_ref()
+        if loop is None:
+            return
+        try:
+            loop.call_soon_threadsafe(self._run_pending)
+        except RuntimeError:
+            # loop is closed, there's no one left to deliver to
+            pass
+
+    def set_result(self, future, result):
+        """Set an asyncio future's result from any thread, unless it's already done (ex: cancelled)"""
+        self.call(_set_future_result, future, result)
+
+    def set_exception(self, future, exception):
+        """Set an asyncio future's exception from any thread, unless it's already done (ex: cancelled)"""
+        self.call(_set_future_exception, future, exception)
+
+    def _run_pending(self):
+        with self._lock:
+            pending = self._pending
+            self._pending = []
+            self._wakeup_scheduled = False
+
+        for fn, args in pending:
+            try:
+                fn(*args)
+            except Exception as e:
+                self._loop_ref().call_exception_handler({
+                    'message': 'Exception in callback from awscrt',
+                    'exception': e,
+                })
+
+
+def _set_future_result(future, result):
+    if not future.done():
+        future.set_result(result)
+
+
+def _set_future_exception(future, exception):
+    if not future.done():
+        future.set_exception(exception)
+
+
+class _AsyncChunkQueue:
+    '''
+    Private class to pass chunks of data from native threads to a coroutine.
+    put() never blocks: it's called on native event-loop threads, which other streams and connections share.
+    Backpressure is up to the producer's flow-control window instead. on_consumed(size) is called as the
+    consumer takes each chunk, and for chunks that are dropped because the consumer is gone,
+    so the producer can let that many more bytes in.
+    on_consumed is let go once no more chunks can arrive, so it doesn't outlive the producer.
+    '''
+
+    def __init__(self, loop, on_consumed=None):
+        self._loop = loop
+        self._bridge = _LoopBridge.get(loop)
+        self._on_consumed = on_consumed
+        self._condition = threading.Condition()
+        self._chunks = deque()
+        self._buffered = 0
+        self._waiter = None
+        self._finished = False
+        self._error = None
+        self._closed = False
+
+    def put(self, chunk):
+        """Called from a native thread. Returns False if the consumer is gone and the chunk was dropped."""
+        with self._condition:
+            closed = self._closed
+            if not closed:
+                self._chunks.append(chunk)
+                self._buffered += len(chunk)
+                self._wake_consumer()
+        if closed:
+            self._consumed(len(chunk))
+            return False
+        return True
+
+    def finish(self, error=None):
+        """Called from a native thread, once there will be no more chunks"""
+        with self._condition:
+            self._finished = True
+            self._error = error
+            self._on_consumed = None
+            self._wake_consumer()
+
+    def close(self):
+        """Called by the consumer when it doesn't want any more chunks"""
+        with self._condition:
+            self._closed = True
+            dropped = self._buffered
+            self._chunks.clear()
+            self._buffered = 0
+            on_consumed = self._on_consumed
+            if self._finished:
+                self._on_consumed = None
+        # chunks that arrive after this are still dropped and reported, until finish()
+        if dropped and on_consumed is not None:
+            on_consumed(dropped)
+
+    async def get(self):
+        """Return the next chunk, or None once finished. Raises the error finish() was called with."""
+        while True:
+            with self._condition:
+                if self._chunks:
+                    chunk = self._chunks.popleft()
+                    self._buffered -= len(chunk)
+                    waiter = None
+                elif self._closed:
+                    return None
+                elif self._finished:
+                    if self._error is not None:
+                        raise self._error
+                    return None
+                else:
+                    waiter = self._loop.create_future()
+                    self._waiter = waiter
+            if waiter is None:
+                self._consumed(len(chunk))
+                return chunk
+            await waiter
+
+    def _consumed(self, size):
+        # self._condition MUST NOT be held, on_consumed calls into native code
+        on_consumed = self._on_consumed
+        if size and on_consumed is not None:
+            on_consumed(size)
+
+    def _wake_consumer(self):
+        # self._condition MUST be held
+        if self._waiter is not None:
+            self._bridge.set_result(self._waiter, None)
+            self._waiter = None
+
+
+class _AsyncSourceReader:
+    '''
+    Private class that lets native code read, as if from a non-blocking file, the data produced by an async iterable.
+    A task on the loop pulls from the async iterable, up to max_buffered bytes ahead of the reader.
+    readinto() is called from a native event-loop thread, which other requests share, so it never waits:
+    if nothing is buffered yet it raises BlockingIOError, and the native side tries again later.
+    '''
+
+    def __init__(self, loop, source, max_buffered):
+        self._loop = loop
+        self._bridge = _LoopBridge.get(loop)
+        self._source = source
+        self._max_buffered = max_buffered
+        self._lock = threading.Lock()
+        self._chunks = deque()
+        self._chunk_offset = 0
+        self._buffered = 0
+        self._space_waiter = None
+        self._eof = False
+        self._error = None
+        self._closed = False
+        self._position = 0
+        self._task = loop.create_task(self._pump())
+
+    async def _pump(self):
+        try:
+            async for data in self._source:
+                data = memoryview(data).cast('B')
+                if not data:
+                    continue
+                while True:
+                    with self._lock:
+                        if self._closed:
+                            return
+                        if not self._buffered or self._buffered + len(data) <= self._max_buffered:
+                            self._chunks.append(data)
+                            self._buffered += len(data)
+                            break
+                        waiter = self._loop.create_future()
+                        self._space_waiter = waiter
+                    await waiter
+        except Exception as e:
+            with self._lock:
+                self._error = e
+        else:
+            with self._lock:
+                self._eof = True
+
+    def read(self, size=-1):
+        # InputStream prefers readinto(), this only exists so it recognizes us as a stream
+        buf = bytearray(size if size >= 0 else 64 * 1024)
+        n = self.readinto(buf)
+        return bytes(buf[:n])
+
+    def readinto(self, m):
+        with self._lock:
+            if self._error is not None:
+                raise self._error
+            if self._closed:
+                raise ValueError('async source was closed')
+            if not self._chunks and not self._eof:
+                raise BlockingIOError('async source has no data buffered yet')
+
+            n = 0
+            while self._chunks and n < len(m):
+                chunk = self._chunks[0]
+                count = min(len(chunk) - self._chunk_offset, len(m) - n)
+                m[n:n + count] = chunk[self._chunk_offset:self._chunk_offset + count]
+                n += count
+                self._chunk_offset += count
+                if self._chunk_offset == len(chunk):
+                    self._chunks.popleft()
+                    self._chunk_offset = 0
+            self._buffered -= n
+            self._position += n
+
+            if self._space_waiter is not None:
+                self._bridge.set_result(self._space_waiter, None)
+                self._space_waiter = None
+            return n
+
+    def seek(self, offset, whence=0):
+        # The data can't be read again. Only allow "seeking" to where we already are.
+        if (whence == 0 and offset == self._position) or (whence == 1 and offset == 0):
+            return self._position
+        raise OSError('async source is not seekable')
+
+    def close(self):
+        with self._lock:
+            self._closed = True
+            self._chunks.clear()
+            self._buffered = 0
+            if self._space_waiter is not None:
+                self._bridge.set_result(self._space_waiter, None)
+                self._space_waiter = None
+        self._bridge.call(self._task.cancel)
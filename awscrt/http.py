@@ -8,11 +8,15 @@ All network operations in `awscrt.http` are asynchronous.
 # SPDX-License-Identifier: Apache-2.0.
 
 import _awscrt
+import asyncio
 from concurrent.futures import Future
 from awscrt import NativeResource
+from awscrt._asyncio import _AsyncChunkQueue, _LoopBridge
 import awscrt.exceptions
 from awscrt.io import ClientBootstrap, InputStream, TlsConnectionOptions, SocketOptions
 from enum import IntEnum
+import threading
+import weakref
 
 
 class HttpVersion(IntEnum):
@@ -23,6 +27,49 @@ class HttpVersion(IntEnum):
     Http2 = 3  #: HTTP/2
 
 
+class Http2SettingID(IntEnum):
+    """HTTP/2 setting identifiers, see RFC 7540 section 6.5.2"""
+    HEADER_TABLE_SIZE = 1  #: Size of the header compression table
+    ENABLE_PUSH = 2  #: Whether server push is allowed
+    MAX_CONCURRENT_STREAMS = 3  #: Most streams the sender allows its peer to have open at once
+    INITIAL_WINDOW_SIZE = 4  #: Initial flow-control window of each stream
+    MAX_FRAME_SIZE = 5  #: Largest frame payload the sender will receive
+    MAX_HEADER_LIST_SIZE = 6  #: Largest header list the sender will receive
+
+
+class Http2Setting:
+    """HTTP/2 setting.
+
+    Args:
+        id (Http2SettingID): Setting identifier.
+        value (int): Setting value, a 32-bit unsigned integer.
+
+    Attributes:
+        id (Http2SettingID): Setting identifier.
+        value (int): Setting value.
+    """
+    __slots__ = ('id', 'value')
+
+    def __init__(self, id, value):
+        assert isinstance(id, Http2SettingID)
+        assert isinstance(value, int)
+        self.id = id
+        self.value = value
+
+    def __repr__(self):
+        return 'Http2Setting(id={}, value={})'.format(self.id.name, self.value)
+
+
+def _settings_to_tuples(settings):
+    if settings is None:
+        return None
+    return [(setting.id, setting.value) for setting in settings]
+
+
+def _settings_from_tuples(tuples):
+    return [Http2Setting(Http2SettingID(id), value) for id, value in tuples]
+
+
 class HttpConnectionBase(NativeResource):
     """Base for HTTP connection classes."""
 
@@ -76,7 +123,7 @@ class HttpClientConnection(HttpConnectionBase):
 
     Use :meth:`HttpClientConnection.new()` to establish a new connection.
     """
-    __slots__ = ('_host_name', '_port')
+    __slots__ = ('_host_name', '_port', '_manual_window_management')
 
     @classmethod
     def new(cls,
@@ -85,7 +132,9 @@ class HttpClientConnection(HttpConnectionBase):
             bootstrap=None,
             socket_options=None,
             tls_connection_options=None,
-            proxy_options=None):
+            proxy_options=None,
+            manual_window_management=False,
+            initial_window_size=None):
         """
         Asynchronously establish a new HttpClientConnection.
 
@@ -107,11 +156,50 @@ class HttpClientConnection(HttpConnectionBase):
             proxy_options (Optional[HttpProxyOptions]): Optional proxy options.
                 If None is provided then a proxy is not used.
 
+            manual_window_management (bool): If True, each stream's read window shrinks
+                as response body data arrives, and no more data is read from the socket once
+                it reaches 0, until :meth:`HttpClientStream.update_window()` is called.
+                This lets a slow consumer push back on a fast server, via TCP flow control.
+                Required for :meth:`request_async()`.
+                If False (the default), data is read as fast as it arrives.
+
+            initial_window_size (Optional[int]): The initial size of each stream's read window, in bytes.
+                This must be set if `manual_window_management` is True, otherwise it is ignored.
+                An initial size of 0 prevents any body data from arriving
+                until :meth:`HttpClientStream.update_window()` is called.
+
         Returns:
             concurrent.futures.Future: A Future which completes when connection succeeds or fails.
             If successful, the Future will contain a new :class:`HttpClientConnection`.
             Otherwise, it will contain an exception.
         """
+        if manual_window_management and initial_window_size is None:
+            raise ValueError("'initial_window_size' must be set if 'manual_window_management' is true")
+
+        return cls._generic_new(
+            host_name,
+            port,
+            bootstrap,
+            socket_options,
+            tls_connection_options,
+            proxy_options,
+            manual_window_management=manual_window_management,
+            initial_window_size=initial_window_size)
+
+    @classmethod
+    def _generic_new(cls,
+                     host_name,
+                     port,
+                     bootstrap,
+                     socket_options,
+                     tls_connection_options,
+                     proxy_options,
+                     manual_window_management=False,
+                     initial_window_size=None,
+                     expect_http2=False,
+                     prior_knowledge=False,
+                     initial_settings=None,
+                     on_remote_settings_changed=None):
         assert isinstance(bootstrap, ClientBootstrap) or bootstrap is None
         assert isinstance(host_name, str)
         assert isinstance(port, int)
@@ -119,6 +207,11 @@ class HttpClientConnection(HttpConnectionBase):
         assert isinstance(socket_options, SocketOptions) or socket_options is None
         assert isinstance(proxy_options, HttpProxyOptions) or proxy_options is None
 
+        if initial_window_size is None:
+            initial_window_size = 0
+        elif initial_window_size < 0:
+            raise ValueError("'initial_window_size' cannot be negative")
+
         future = Future()
         try:
             if not socket_options:
@@ -130,6 +223,7 @@ class HttpClientConnection(HttpConnectionBase):
             connection = cls()
             connection._host_name = host_name
             connection._port = port
+            connection._manual_window_management = manual_window_management
 
             def on_connection_setup(binding, error_code, http_version):
                 if error_code == 0:
@@ -157,7 +251,13 @@ class HttpClientConnection(HttpConnectionBase):
                 port,
                 socket_options,
                 tls_connection_options,
-                proxy_options)
+                proxy_options,
+                manual_window_management,
+                initial_window_size,
+                expect_http2,
+                prior_knowledge,
+                initial_settings,
+                on_remote_settings_changed)
 
         except Exception as e:
             future.set_exception(e)
@@ -174,7 +274,7 @@ class HttpClientConnection(HttpConnectionBase):
         """Remote port"""
         return self._port
 
-    def request(self, request, on_response=None, on_body=None):
+    def request(self, request, on_response=None, on_body=None, reuse_body_buffer=False):
         """Create :class:`HttpClientStream` to carry out the request/response exchange.
 
         NOTE: The HTTP stream sends no data until :meth:`HttpClientStream.activate()`
@@ -207,16 +307,581 @@ class HttpClientConnection(HttpConnectionBase):
 
                     *   `chunk` (buffer): Response body data (not necessarily
                         a whole "chunk" of chunked encoding).
+                        This is a :class:`bytes` object, unless `reuse_body_buffer` is set.
 
                     *   `**kwargs` (dict): Forward-compatibility kwargs.
 
                 An exception raise by this function will cause the HTTP stream to end in error.
                 This callback is always invoked on the connection's event-loop thread.
 
+            reuse_body_buffer (bool): If True, each chunk is copied into a buffer that is reused from one chunk
+                to the next, and the `chunk` passed to `on_body` is a :class:`memoryview` of it,
+                instead of a new :class:`bytes` object. The chunk is still copied out of native memory,
+                but there's no allocation per chunk, which matters for large downloads.
+                The memoryview owns its memory, so it's safe to keep it, or anything derived from it
+                (slices, casts, ``numpy.frombuffer(chunk)``). The buffer is only reused once nothing
+                refers to it anymore, so keeping a chunk just costs a new buffer for the next one.
+                Default is False.
+
         Returns:
             HttpClientStream:
         """
-        return HttpClientStream(self, request, on_response, on_body)
+        return HttpClientStream(self, request, on_response, on_body, reuse_body_buffer)
+
+    async def request_async(self, request):
+        """Send a request, for use with asyncio.
+
+        MUST be called from a coroutine running on an asyncio event loop.
+        Callbacks from the native threads are batched into as few event loop wakeups as possible,
+        shared by every request on the loop.
+
+        The connection MUST have `manual_window_management`. The stream's read window
+        only grows as the body is consumed, so at most a window's worth of body
+        (`initial_window_size`, or the INITIAL_WINDOW_SIZE setting for HTTP/2) is buffered.
+        The native threads delivering the body never wait on the consumer.
+
+        Args:
+            request (HttpRequest): Definition for outgoing request.
+
+        Returns:
+            HttpAsyncResponse: The response, once its headers have arrived.
+            Raises an exception if the request fails before then.
+        """
+        if not self._manual_window_management:
+            raise ValueError("request_async requires a connection with 'manual_window_management'")
+
+        loop = asyncio.get_running_loop()
+        # Nothing below may reference the stream itself,
+        # or it would be in a reference cycle with its own callbacks
+        bridge = _LoopBridge.get(loop)
+        headers_future = loop.create_future()
+        stream_ref = None
+        is_http2 = isinstance(self, Http2ClientConnection)
+
+        def on_body_consumed(size):
+            # grow the windows as the body is consumed (or dropped, once closed), rather than when it's queued
+            stream = stream_ref()
+            if stream is not None:
+                stream.update_window(size)
+                if is_http2:
+                    stream.connection.update_window(size)
+
+        body_queue = _AsyncChunkQueue(loop, on_body_consumed)
+
+        def on_response(http_stream, status_code, headers, **kwargs):
+            bridge.set_result(headers_future, (status_code, headers))
+
+        def on_body(http_stream, chunk, **kwargs):
+            body_queue.put(chunk)
+
+        def on_complete(completion_future):
+            error = completion_future.exception()
+            body_queue.finish(error)
+            if error is None:
+                # only reached if the exchange finished without reporting headers
+                bridge.set_result(headers_future, (completion_future.result(), []))
+            else:
+                bridge.set_exception(headers_future, error)
+
+        stream = self.request(request, on_response, on_body)
+        stream_ref = weakref.ref(stream)
+        stream.completion_future.add_done_callback(on_complete)
+        stream.activate()
+
+        try:
+            status_code, headers = await headers_future
+        except BaseException:
+            body_queue.close()
+            raise
+
+        return HttpAsyncResponse(stream, status_code, headers, body_queue)
+
+
+class HttpAsyncResponse:
+    """Response to a request made with :meth:`HttpClientConnection.request_async()`.
+
+    Use ``async for chunk in response`` to receive the body. Chunks are :class:`bytes`, in order.
+    The iteration ends once the whole body has been received, and raises an exception
+    if the request failed. Or use :meth:`read()` to receive the whole body at once.
+    The body MUST be consumed (or the response closed), or the stream stalls
+    once its read window is used up, and holds on to its connection.
+
+    Attributes:
+        stream (HttpClientStream): The underlying stream.
+
+        status_code (int): Response status code.
+
+        headers (List[Tuple[str, str]]): Response headers as a list of (name,value) pairs.
+    """
+    __slots__ = ('stream', 'status_code', 'headers', '_body_queue')
+
+    def __init__(self, stream, status_code, headers, body_queue):
+        self.stream = stream
+        self.status_code = status_code
+        self.headers = headers
+        self._body_queue = body_queue
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        chunk = await self._body_queue.get()
+        if chunk is None:
+            raise StopAsyncIteration
+        return chunk
+
+    async def read(self):
+        """Receive the rest of the body.
+
+        Returns:
+            bytes: The body. Raises an exception if the request failed.
+        """
+        return b''.join([chunk async for chunk in self])
+
+    def close(self):
+        """Stop receiving the body. Any more body data that arrives is dropped.
+
+        Dropped data still counts as consumed, so the read window keeps growing and the stream
+        runs to completion, rather than stalling and holding on to its connection.
+        """
+        self._body_queue.close()
+
+
+class Http2ClientConnection(HttpClientConnection):
+    """
+    An HTTP/2 client connection, which carries many concurrent streams.
+
+    Use :meth:`Http2ClientConnection.new()` to establish a new connection.
+    """
+    UNLIMITED_CONCURRENT_STREAMS = 2**32 - 1
+    """Value of :attr:`max_concurrent_streams` while the peer hasn't limited it (RFC 7540 section 6.5.2)"""
+
+    __slots__ = ('_streams_lock', '_active_stream_count')
+
+    def __init__(self):
+        super().__init__()
+        self._streams_lock = threading.Lock()
+        self._active_stream_count = 0
+
+    @classmethod
+    def new(cls,
+            host_name,
+            port,
+            bootstrap=None,
+            socket_options=None,
+            tls_connection_options=None,
+            proxy_options=None,
+            initial_settings=None,
+            on_remote_settings_changed=None,
+            prior_knowledge=False,
+            manual_window_management=False):
+        """
+        Asynchronously establish a new Http2ClientConnection.
+
+        Over TLS, the connection must negotiate HTTP/2 via ALPN, so
+        `tls_connection_options` should have "h2" in its ALPN list.
+
+        Args:
+            host_name (str): Connect to host.
+
+            port (int): Connect to port.
+
+            bootstrap (Optional [ClientBootstrap]): Client bootstrap to use when initiating socket connection.
+                If None is provided, the default singleton is used.
+
+            socket_options (Optional[SocketOptions]): Optional socket options.
+                If None is provided, then default options are used.
+
+            tls_connection_options (Optional[TlsConnectionOptions]): Optional TLS
+                connection options. If None is provided, then the connection will
+                be attempted over plain-text, which requires `prior_knowledge`.
+
+            proxy_options (Optional[HttpProxyOptions]): Optional proxy options.
+                If None is provided then a proxy is not used.
+
+            initial_settings (Optional[List[Http2Setting]]): Settings sent to the peer
+                when the connection starts. Settings not listed keep their RFC 7540 defaults.
+
+            on_remote_settings_changed: Optional callback invoked each time the peer changes its settings.
+                The function should take the following arguments and return nothing:
+
+                    *   `settings` (List[:class:`Http2Setting`]): Settings the peer changed.
+
+                    *   `**kwargs` (dict): Forward-compatibility kwargs.
+
+                This callback is always invoked on the connection's event-loop thread.
+
+            prior_knowledge (bool): If True, speak HTTP/2 immediately over plain-text,
+                without negotiating it first. Only valid without TLS.
+
+            manual_window_management (bool): If True, flow-control windows of the connection
+                and its streams shrink as body data arrives, and only grow again when
+                :meth:`update_window()` and :meth:`HttpClientStream.update_window()` are called.
+                Required for :meth:`~HttpClientConnection.request_async()`.
+                If False (the default), windows are updated automatically.
+
+        Returns:
+            concurrent.futures.Future: A Future which completes when connection succeeds or fails.
+            If successful, the Future will contain a new :class:`Http2ClientConnection`.
+            Otherwise, it will contain an exception. If the peer doesn't agree to
+            HTTP/2, the exception is AWS_ERROR_HTTP_UNSUPPORTED_PROTOCOL.
+        """
+        assert callable(on_remote_settings_changed) or on_remote_settings_changed is None
+        assert not (prior_knowledge and tls_connection_options)
+
+        # wrapper MUST NOT reference the connection, or we create a circular reference that prevents GC
+        on_remote_settings_changed_wrapper = None
+        if on_remote_settings_changed:
+            def on_remote_settings_changed_from_tuples(settings):
+                on_remote_settings_changed(settings=_settings_from_tuples(settings))
+            on_remote_settings_changed_wrapper = on_remote_settings_changed_from_tuples
+
+        return cls._generic_new(
+            host_name,
+            port,
+            bootstrap,
+            socket_options,
+            tls_connection_options,
+            proxy_options,
+            manual_window_management=manual_window_management,
+            expect_http2=True,
+            prior_knowledge=prior_knowledge,
+            initial_settings=_settings_to_tuples(initial_settings),
+            on_remote_settings_changed=on_remote_settings_changed_wrapper)
+
+    @property
+    def active_stream_count(self):
+        """int: Number of streams activated on this connection that haven't completed yet."""
+        return self._active_stream_count
+
+    @property
+    def max_concurrent_streams(self):
+        """int: Most streams the peer allows to be open at once.
+        Activating more than this fails with AWS_ERROR_HTTP_MAX_CONCURRENT_STREAMS_EXCEEDED.
+        :attr:`UNLIMITED_CONCURRENT_STREAMS` if the peer never sent SETTINGS_MAX_CONCURRENT_STREAMS."""
+        for setting in self.get_remote_settings():
+            if setting.id == Http2SettingID.MAX_CONCURRENT_STREAMS:
+                return setting.value
+        return self.UNLIMITED_CONCURRENT_STREAMS
+
+    def get_local_settings(self):
+        """
+        Returns:
+            List[Http2Setting]: Settings this side sent, that the peer has acknowledged.
+        """
+        return _settings_from_tuples(_awscrt.http2_connection_get_settings(self._binding, False))
+
+    def get_remote_settings(self):
+        """
+        Returns:
+            List[Http2Setting]: Settings the peer sent.
+        """
+        return _settings_from_tuples(_awscrt.http2_connection_get_settings(self._binding, True))
+
+    def change_settings(self, settings):
+        """Send new settings to the peer.
+
+        Args:
+            settings (List[Http2Setting]): Settings to change.
+
+        Returns:
+            concurrent.futures.Future: A Future which completes with a result of None
+            when the peer acknowledges the settings, or contains an exception if it fails.
+        """
+        future = Future()
+
+        def on_complete(error_code):
+            if error_code:
+                future.set_exception(awscrt.exceptions.from_code(error_code))
+            else:
+                future.set_result(None)
+
+        _awscrt.http2_connection_change_settings(self._binding, _settings_to_tuples(settings), on_complete)
+        return future
+
+    def ping(self, data=None):
+        """Send a PING frame, to measure round-trip time or check the connection is alive.
+
+        Args:
+            data (Optional[bytes]): 8 bytes of opaque data to send.
+                If None is provided, 8 zero bytes are sent.
+
+        Returns:
+            concurrent.futures.Future: A Future which completes with the round-trip
+            time in seconds (float) when the peer replies, or contains an exception if it fails.
+        """
+        assert data is None or len(data) == 8
+
+        future = Future()
+
+        def on_complete(round_trip_time_ns, error_code):
+            if error_code:
+                future.set_exception(awscrt.exceptions.from_code(error_code))
+            else:
+                future.set_result(round_trip_time_ns / 1000000000)
+
+        _awscrt.http2_connection_ping(self._binding, data, on_complete)
+        return future
+
+    def update_window(self, increment_size):
+        """Increment the connection's flow-control window, letting the peer send more body data.
+
+        Only has an effect if the connection was created with `manual_window_management`.
+
+        Args:
+            increment_size (int): Number of bytes to add to the window.
+        """
+        assert 0 < increment_size <= 0x7FFFFFFF
+        _awscrt.http2_connection_update_window(self._binding, increment_size)
+
+    def request(self, request, on_response=None, on_body=None, reuse_body_buffer=False):
+        """Create :class:`Http2ClientStream` to carry out the request/response exchange.
+
+        Arguments are the same as :meth:`HttpClientConnection.request()`.
+
+        Returns:
+            Http2ClientStream:
+        """
+        return Http2ClientStream(self, request, on_response, on_body, reuse_body_buffer)
+
+    def _on_stream_activated(self):
+        with self._streams_lock:
+            self._active_stream_count += 1
+
+    def _on_stream_completed(self):
+        with self._streams_lock:
+            self._active_stream_count -= 1
+
+
+class HttpClientConnectionManager(NativeResource):
+    """
+    Pool of HTTP client connections to one host.
+
+    Connections are established as needed, up to `max_connections` at once,
+    and are reused after they're released back to the manager. Acquire and
+    release are thread-safe, and do no Python-side locking.
+
+    Args:
+        host_name (str): Connect to host.
+
+        port (int): Connect to port.
+
+        bootstrap (Optional [ClientBootstrap]): Client bootstrap to use when initiating socket connections.
+            If None is provided, the default singleton is used.
+
+        socket_options (Optional[SocketOptions]): Optional socket options.
+            If None is provided, then default options are used.
+
+        tls_connection_options (Optional[TlsConnectionOptions]): Optional TLS
+            connection options. If None is provided, then connections will
+            be attempted over plain-text.
+
+        proxy_options (Optional[HttpProxyOptions]): Optional proxy options.
+            If None is provided then a proxy is not used.
+
+        max_connections (int): Most connections the manager will have open at once.
+            Further acquisitions wait until a connection is released.
+
+        max_connection_idle_in_milliseconds (int): Close connections that sit idle
+            in the pool for this long. If 0 (the default), idle connections are kept open.
+
+        manual_window_management (bool): If True, the pool's connections manage their streams'
+            read windows manually, see :meth:`HttpClientConnection.new()`. Required for
+            :meth:`HttpClientConnection.request_async()`. False by default.
+
+        initial_window_size (Optional[int]): The initial size of each stream's read window, in bytes.
+            This must be set if `manual_window_management` is True, otherwise it is ignored.
+    """
+    __slots__ = ('_host_name', '_port', '_shutdown_future', '_manual_window_management')
+
+    def __init__(self,
+                 host_name,
+                 port,
+                 bootstrap=None,
+                 socket_options=None,
+                 tls_connection_options=None,
+                 proxy_options=None,
+                 max_connections=2,
+                 max_connection_idle_in_milliseconds=0,
+                 manual_window_management=False,
+                 initial_window_size=None):
+        assert isinstance(bootstrap, ClientBootstrap) or bootstrap is None
+        assert isinstance(host_name, str)
+        assert isinstance(port, int)
+        assert isinstance(tls_connection_options, TlsConnectionOptions) or tls_connection_options is None
+        assert isinstance(socket_options, SocketOptions) or socket_options is None
+        assert isinstance(proxy_options, HttpProxyOptions) or proxy_options is None
+
+        if manual_window_management and initial_window_size is None:
+            raise ValueError("'initial_window_size' must be set if 'manual_window_management' is true")
+        if initial_window_size is None:
+            initial_window_size = 0
+        elif initial_window_size < 0:
+            raise ValueError("'initial_window_size' cannot be negative")
+
+        super().__init__()
+
+        if not socket_options:
+            socket_options = SocketOptions()
+
+        if not bootstrap:
+            bootstrap = ClientBootstrap.get_or_create_static_default()
+
+        self._host_name = host_name
+        self._port = port
+        self._shutdown_future = Future()
+        self._manual_window_management = manual_window_management
+
+        # on_shutdown MUST NOT reference the manager itself, just the shutdown_future within it.
+        # Otherwise we create a circular reference that prevents the manager from getting GC'd.
+        shutdown_future = self._shutdown_future
+
+        def on_shutdown():
+            shutdown_future.set_result(None)
+
+        self._binding = _awscrt.http_connection_manager_new(
+            bootstrap,
+            on_shutdown,
+            host_name,
+            port,
+            socket_options,
+            tls_connection_options,
+            proxy_options,
+            max_connections,
+            max_connection_idle_in_milliseconds,
+            manual_window_management,
+            initial_window_size)
+
+    @property
+    def host_name(self):
+        """Remote hostname"""
+        return self._host_name
+
+    @property
+    def port(self):
+        """Remote port"""
+        return self._port
+
+    @property
+    def shutdown_future(self):
+        """
+        concurrent.futures.Future: Completes when this manager has finished shutting down.
+        Shutdown begins when the manager is garbage-collected, and finishes
+        once every acquired connection has been released.
+        """
+        return self._shutdown_future
+
+    def acquire_connection(self):
+        """
+        Asynchronously acquire a connection from the pool.
+
+        An idle connection is reused if there is one, otherwise a new connection
+        is established if there are fewer than `max_connections`. Otherwise the
+        acquisition waits until another connection is released.
+
+        Returns:
+            concurrent.futures.Future: A Future which completes when a connection is acquired, or fails.
+            If successful, the Future will contain a :class:`HttpClientConnection`.
+            Pass it to :meth:`release_connection()` when done with it.
+            Otherwise, the Future will contain an exception.
+        """
+        future = Future()
+        try:
+            connection = HttpClientConnection()
+            connection._host_name = self._host_name
+            connection._port = self._port
+            connection._manual_window_management = self._manual_window_management
+
+            def on_connection_setup(binding, error_code, http_version):
+                if error_code == 0:
+                    connection._binding = binding
+                    connection._version = HttpVersion(http_version)
+                    future.set_result(connection)
+                else:
+                    future.set_exception(awscrt.exceptions.from_code(error_code))
+
+            _awscrt.http_connection_manager_acquire_connection(self._binding, on_connection_setup)
+
+        except Exception as e:
+            future.set_exception(e)
+
+        return future
+
+    async def acquire_connection_async(self):
+        """Acquire a connection from the pool, for use with asyncio.
+
+        MUST be called from a coroutine running on an asyncio event loop.
+        See :meth:`acquire_connection()`. If the awaiting task is cancelled,
+        a connection acquired afterwards is released right back to the pool.
+
+        Returns:
+            HttpClientConnection: Pass it to :meth:`release_connection()` when done with it.
+        """
+        loop = asyncio.get_running_loop()
+        bridge = _LoopBridge.get(loop)
+        future = loop.create_future()
+
+        def deliver(acquire_future):
+            # runs on the loop
+            error = acquire_future.exception()
+            if error is not None:
+                if not future.done():
+                    future.set_exception(error)
+            elif future.done():
+                # awaiting task was cancelled, nobody will use the connection
+                self.release_connection(acquire_future.result())
+            else:
+                future.set_result(acquire_future.result())
+
+        self.acquire_connection().add_done_callback(lambda acquire_future: bridge.call(deliver, acquire_future))
+        return await future
+
+    def release_connection(self, connection):
+        """
+        Release a connection back to the pool, so it can be acquired again.
+
+        The connection must not be used after it is released. Its
+        :attr:`~HttpConnectionBase.shutdown_future` completes now, since the manager
+        takes over the connection's shutdown. A connection that is garbage-collected
+        without being released is released automatically.
+
+        Args:
+            connection (HttpClientConnection): Connection from :meth:`acquire_connection()`.
+        """
+        assert isinstance(connection, HttpClientConnection)
+        _awscrt.http_connection_manager_release_connection(self._binding, connection._binding)
+        if not connection.shutdown_future.done():
+            connection.shutdown_future.set_result(None)
+
+    def get_metrics(self):
+        """
+        Returns:
+            HttpClientConnectionManagerMetrics: Snapshot of this manager's connection counts.
+        """
+        return HttpClientConnectionManagerMetrics(*_awscrt.http_connection_manager_fetch_metrics(self._binding))
+
+
+class HttpClientConnectionManagerMetrics:
+    """Snapshot of the connection counts of an :class:`HttpClientConnectionManager`.
+    Get one from :meth:`HttpClientConnectionManager.get_metrics()`.
+
+    Attributes:
+        idle_connections (int): Open connections waiting in the pool to be acquired.
+
+        leased_connections (int): Connections currently acquired and not yet released.
+
+        pending_acquisitions (int): Acquisitions waiting for a connection.
+    """
+    __slots__ = ('idle_connections', 'leased_connections', 'pending_acquisitions')
+
+    def __init__(self, idle_connections=0, leased_connections=0, pending_acquisitions=0):
+        self.idle_connections = idle_connections
+        self.leased_connections = leased_connections
+        self.pending_acquisitions = pending_acquisitions
+
+    def __repr__(self):
+        return 'HttpClientConnectionManagerMetrics({})'.format(
+            ', '.join('{}={}'.format(name, getattr(self, name)) for name in self.__slots__))
 
 
 class HttpStreamBase(NativeResource):
@@ -260,7 +925,7 @@ class HttpClientStream(HttpStreamBase):
     """
     __slots__ = ('_response_status_code', '_on_response_cb', '_on_body_cb', '_request')
 
-    def __init__(self, connection, request, on_response=None, on_body=None):
+    def __init__(self, connection, request, on_response=None, on_body=None, reuse_body_buffer=False):
         assert isinstance(connection, HttpClientConnection)
         assert isinstance(request, HttpRequest)
         assert callable(on_response) or on_response is None
@@ -274,7 +939,7 @@ class HttpClientStream(HttpStreamBase):
         # keep HttpRequest alive until stream completes
         self._request = request
 
-        self._binding = _awscrt.http_client_stream_new(self, connection, request)
+        self._binding = _awscrt.http_client_stream_new(self, connection, request, reuse_body_buffer)
 
     @property
     def response_status_code(self):
@@ -291,6 +956,21 @@ class HttpClientStream(HttpStreamBase):
         """
         _awscrt.http_client_stream_activate(self)
 
+    def update_window(self, increment_size):
+        """Increment the stream's read window, letting more response body data arrive.
+
+        Only has an effect if the connection was created with `manual_window_management`.
+        The window shrinks by the size of each `on_body` chunk. Once it reaches 0,
+        no more data is read until this is called. This function may be called from any thread.
+
+        Args:
+            increment_size (int): Number of bytes to add to the window.
+        """
+        if increment_size < 0:
+            raise ValueError("Increment size cannot be negative")
+
+        _awscrt.http_stream_update_window(self, increment_size)
+
     def _on_response(self, status_code, name_value_pairs):
         self._response_status_code = status_code
 
@@ -307,6 +987,35 @@ class HttpClientStream(HttpStreamBase):
             self._completion_future.set_exception(awscrt.exceptions.from_code(error_code))
 
 
+class Http2ClientStream(HttpClientStream):
+    """HTTP/2 stream that sends a request and receives a response.
+
+    Create an Http2ClientStream with :meth:`Http2ClientConnection.request()`.
+    """
+    __slots__ = ('_activated',)
+
+    def __init__(self, connection, request, on_response=None, on_body=None, reuse_body_buffer=False):
+        assert isinstance(connection, Http2ClientConnection)
+        self._activated = False
+        super().__init__(connection, request, on_response, on_body, reuse_body_buffer)
+
+    def activate(self):
+        # count the stream first, it may complete on another thread before activate() returns
+        self._activated = True
+        self._connection._on_stream_activated()
+        try:
+            super().activate()
+        except Exception:
+            self._activated = False
+            self._connection._on_stream_completed()
+            raise
+
+    def _on_complete(self, error_code):
+        if self._activated:
+            self._connection._on_stream_completed()
+        super()._on_complete(error_code)
+
+
 class HttpMessageBase(NativeResource):
     """
     Base for HttpRequest and HttpResponse classes.
@@ -6,14 +6,30 @@ S3 client
 # SPDX-License-Identifier: Apache-2.0.
 
 import _awscrt
-from concurrent.futures import Future
+from concurrent.futures import FIRST_COMPLETED, CancelledError, Future, ThreadPoolExecutor, wait
 from awscrt import NativeResource
-from awscrt.http import HttpRequest
-from awscrt.io import ClientBootstrap, TlsConnectionOptions
+from awscrt._asyncio import _AsyncChunkQueue, _AsyncSourceReader, _LoopBridge
+from awscrt.http import HttpHeaders, HttpRequest
+from awscrt.common import get_cpu_group_count
+from awscrt.io import ClientBootstrap, DefaultHostResolver, EventLoopGroup, TlsConnectionOptions
 from awscrt.auth import AwsCredentialsProvider
 import awscrt.exceptions
+import asyncio
+import functools
+import hashlib
+import io
+import json
+import os
 import threading
+import time
+import weakref
+import xml.etree.ElementTree as ElementTree
+from collections import deque
 from enum import IntEnum
+from urllib.parse import quote, urlencode
+
+# Throughput target assumed when throughput_target_gbps isn't set, where a client splits or tunes it
+_DEFAULT_THROUGHPUT_TARGET_GBPS = 5.0
 
 
 class S3RequestType(IntEnum):
@@ -22,7 +38,7 @@ class S3RequestType(IntEnum):
     DEFAULT = 0
     """
     Default type, for all S3 request types other than
-    :attr:`~S3RequestType.GET_OBJECT`/:attr:`~S3RequestType.PUT_OBJECT`.
+    :attr:`~S3RequestType.GET_OBJECT`/:attr:`~S3RequestType.PUT_OBJECT`/:attr:`~S3RequestType.COPY_OBJECT`.
     """
 
     GET_OBJECT = 1
@@ -35,6 +51,74 @@ class S3RequestType(IntEnum):
     Put Object S3 request
     """
 
+    COPY_OBJECT = 3
+    """
+    Copy Object S3 request, copying an object within S3 without downloading it.
+
+    The request is a PUT to the destination object, with an ``x-amz-copy-source`` header
+    naming the source object (ex: ``/source-bucket/source-key``, URL encoded).
+    The source's size is found with a HeadObject. A large object is copied with a multipart upload,
+    whose parts are copied in parallel with UploadPartCopy. A small object is copied with a single CopyObject.
+    """
+
+
+class S3ChecksumAlgorithm(IntEnum):
+    """Checksum algorithm used to verify object integrity"""
+
+    CRC32C = 1
+    """CRC32C"""
+
+    CRC32 = 2
+    """CRC32"""
+
+    SHA1 = 3
+    """SHA-1"""
+
+    SHA256 = 4
+    """SHA-256"""
+
+
+class S3ChecksumLocation(IntEnum):
+    """Where to put the checksum of an upload"""
+
+    HEADER = 1
+    """
+    Put the checksum in a header. The body is checksummed before it's sent.
+    """
+
+    TRAILER = 2
+    """
+    Put the checksum in a trailer, after the body. The body is checksummed as it's sent.
+    """
+
+
+class S3ChecksumConfig:
+    """Configures how a request computes and validates checksums.
+
+    Args:
+        algorithm (Optional[S3ChecksumAlgorithm]): For uploads, S3 is sent a checksum of each part
+            computed with this algorithm, and rejects a part that doesn't match.
+            For uploads from `send_filepath` and for downloads, a checksum of the whole object is
+            also computed with this algorithm as the body streams through, and passed to `on_done`.
+
+        location (Optional[S3ChecksumLocation]): For uploads, where to put each part's checksum.
+            (:attr:`S3ChecksumLocation.HEADER` by default, if `algorithm` is set)
+
+        validate_response (bool): For downloads, validate the body against the checksum
+            S3 has stored for the object (if any), failing the request if they don't match.
+            The body is validated as it's received, not in a second pass. (False by default)
+    """
+    __slots__ = ('algorithm', 'location', 'validate_response')
+
+    def __init__(self, algorithm=None, location=None, validate_response=False):
+        assert isinstance(algorithm, S3ChecksumAlgorithm) or algorithm is None
+        assert isinstance(location, S3ChecksumLocation) or location is None
+        if location is None and algorithm is not None:
+            location = S3ChecksumLocation.HEADER
+        self.algorithm = algorithm
+        self.location = location
+        self.validate_response = validate_response
+
 
 class S3RequestTlsMode(IntEnum):
     """TLS mode for S3 request"""
@@ -50,6 +134,118 @@ class S3RequestTlsMode(IntEnum):
     """
 
 
+class S3RequestPriority(IntEnum):
+    """Priority of a S3 request, for a client with `priority_weights`"""
+
+    LOW = 0
+    """
+    For bulk transfers that shouldn't slow down anything else (ex: backfills).
+    """
+
+    NORMAL = 1
+    """
+    Default priority.
+    """
+
+    HIGH = 2
+    """
+    For latency-sensitive requests (ex: small objects that a user is waiting on).
+    """
+
+
+class S3BufferPool:
+    """Pool of caller-supplied writable buffers that downloaded parts are received into.
+
+    Register a pool with an :class:`S3Client` (see `buffer_pool`) and the body of
+    :attr:`S3RequestType.GET_OBJECT` requests is copied straight into these buffers,
+    instead of into a new :class:`bytes` object for every part.
+    Memory use is bounded by the buffers you supply, and nothing is allocated per part.
+
+    Each buffer is handed to `on_body`, and stays out of the pool until you give it back
+    with :meth:`release()`. Parts are delivered on the client's event-loop threads, which must
+    never wait, so if every buffer is out of the pool a part is delivered in a new :class:`bytes`
+    object (with `buffer` None) instead. Keep the pool large enough for the parts you hold at once,
+    and release buffers promptly.
+
+    Args:
+        buffers (Iterable[buffer]): Writable, C-contiguous objects that support the buffer protocol
+            (ex: :class:`bytearray`, :class:`mmap.mmap`, NumPy arrays).
+            For best performance, each buffer should be at least the client's `part_size`.
+            Larger parts are split across several buffers.
+    """
+
+    __slots__ = ('_views', '_free', '_outstanding', '_condition')
+
+    def __init__(self, buffers):
+        self._views = {}
+        self._free = []
+        self._outstanding = set()
+        self._condition = threading.Condition()
+        for buffer in buffers:
+            view = memoryview(buffer).cast('B')
+            if view.readonly:
+                raise ValueError('S3BufferPool buffers must be writable')
+            if len(view) == 0:
+                raise ValueError('S3BufferPool buffers cannot be empty')
+            self._views[id(buffer)] = view
+            self._free.append(buffer)
+
+        if not self._free:
+            raise ValueError('S3BufferPool needs at least one buffer')
+
+    @property
+    def available(self):
+        """int: Number of buffers currently in the pool"""
+        with self._condition:
+            return len(self._free)
+
+    def acquire(self, timeout=None):
+        """Take a buffer out of the pool, waiting until one is available.
+
+        Args:
+            timeout (Optional[float]): Max seconds to wait. If None, wait forever.
+
+        Returns:
+            Tuple[buffer, memoryview]: The buffer, and a writable byte-wise memoryview over it.
+
+        Raises:
+            TimeoutError: No buffer became available within `timeout`.
+        """
+        with self._condition:
+            if not self._condition.wait_for(lambda: self._free, timeout):
+                raise TimeoutError('No buffer available in S3BufferPool')
+            buffer = self._free.pop()
+            self._outstanding.add(id(buffer))
+            return buffer, self._views[id(buffer)]
+
+    def release(self, buffer):
+        """Give a buffer back to the pool, so further parts can be received into it.
+
+        Args:
+            buffer (Union[buffer, memoryview]): The buffer passed to `on_body`,
+                or the `chunk` memoryview that refers to it.
+
+        Raises:
+            ValueError: The buffer doesn't belong to this pool, or was already released.
+        """
+        if not self._release(buffer):
+            raise ValueError('buffer was already released to this S3BufferPool')
+
+    def _release(self, buffer):
+        # Returns False, rather than raising, if the buffer isn't out of the pool
+        if isinstance(buffer, memoryview) and id(buffer) not in self._views:
+            buffer = buffer.obj
+        if id(buffer) not in self._views:
+            raise ValueError('buffer does not belong to this S3BufferPool')
+        with self._condition:
+            if id(buffer) not in self._outstanding:
+                return False
+            self._outstanding.remove(id(buffer))
+            self._free.append(buffer)
+            self._condition.notify()
+            return True
+
+
 class S3Client(NativeResource):
     """S3 client
 
@@ -81,9 +277,69 @@ class S3Client(NativeResource):
 
         throughput_target_gbps (Optional[float]): Throughput target in Gbps that we are trying to reach.
             (5 Gbps by default)
+
+        buffer_pool (Optional[S3BufferPool]): Optional pool of caller-supplied buffers.
+            If set, the body of :attr:`S3RequestType.GET_OBJECT` requests made with `on_body`
+            (and without `recv_filepath`) is received into buffers from this pool.
+            See `on_body` in :meth:`make_request()` for how the buffers are handed back.
+
+        adaptive (bool): If True, pick the part size and throughput target for each request,
+            instead of using the fixed `part_size` and `throughput_target_gbps` for everything.
+            Bigger objects get bigger parts, so they take fewer requests, and the throughput target
+            (which determines how many connections, and so how many parts, are in flight) is raised
+            while the requests sharing it keep saturating it, and lowered while they fall well short of it.
+            It changes at most every few seconds, since each change opens new connections.
+            `part_size` and `throughput_target_gbps` are the starting point.
+            The size of the object must be known for it to be tuned: uploads use the file size or
+            Content-Length, downloads use `object_size_hint` from :meth:`make_request()`.
+            Each choice is reported as an :class:`S3TuningDecision`, see :attr:`tuning_decisions`.
+            Requests for each part size use their own connections. (False by default)
+
+        enable_read_backpressure (bool): If True, downloads only fetch data that fits in their read window,
+            so memory use is bounded when the body is consumed slower than it arrives.
+            Each request's window starts at `initial_read_window` bytes, and grows as the body is
+            consumed (see `manual_read_window` in :meth:`make_request()`). (False by default)
+
+        initial_read_window (Optional[int]): Size, in bytes, of each request's read window when it starts.
+            Only used if `enable_read_backpressure` is True. (64 MiB by default)
+
+        priority_weights (Optional[Dict[S3RequestPriority, float]]): Weight of each :class:`S3RequestPriority`.
+            If set, at most `max_requests_in_flight` requests are sent at once, and the rest wait for their turn.
+            Each time a request finishes, the next one is picked from the priorities with requests waiting,
+            so that they get turns in proportion to their weights. A priority with nothing waiting
+            doesn't hold any turns back: a lone request, of any priority, gets the whole client
+            (all of `throughput_target_gbps`).
+            Priorities missing from the dict get their weight from :attr:`DEFAULT_PRIORITY_WEIGHTS`.
+            Requests choose their priority with `priority` in :meth:`make_request()`.
+            Can't be used with `adaptive`, or with several `cpu_groups`.
+            If None, requests are all sent as soon as they're made. (None by default)
+
+        max_requests_in_flight (Optional[int]): Most requests sent at once, if `priority_weights` is set.
+            Fewer keeps a waiting high priority request from waiting long behind huge requests,
+            more keeps the connections busy with small requests, each of which only uses one connection.
+            (16 by default)
+
+        cpu_groups (Optional[Sequence[int]]): Processor groups (NUMA nodes) to run the client's
+            event-loops on, see :func:`awscrt.common.get_cpu_group_count()`. Each group gets its own
+            :class:`~awscrt.io.EventLoopGroup`, pinned to it, with a thread per processor in the group.
+            Part buffers are filled by those pinned threads, so with the usual first-touch memory policy
+            they're allocated on the same node as the threads using them.
+            If there are several groups, each request is sent on the group with the fewest requests in flight,
+            and `throughput_target_gbps` is divided between the groups.
+            Pass ``range(get_cpu_group_count())`` to spread over every group.
+            Can't be used with `bootstrap`, or with `adaptive` if there are several groups.
+            If None, the client's event-loops aren't pinned. (None by default)
     """
 
-    __slots__ = ('shutdown_event', '_region')
+    DEFAULT_PRIORITY_WEIGHTS = {
+        S3RequestPriority.LOW: 1.0,
+        S3RequestPriority.NORMAL: 2.0,
+        S3RequestPriority.HIGH: 4.0,
+    }
+    """Weights used for priorities missing from `priority_weights`"""
+
+    __slots__ = ('shutdown_event', '_region', '_part_size', '_buffer_pool', '_config', '_shutdown_tracker', '_tuner',
+                 '_metrics', '_read_backpressure', '_placement', '_scheduler')
 
     def __init__(
             self,
@@ -94,7 +350,14 @@ class S3Client(NativeResource):
             credential_provider=None,
             tls_connection_options=None,
             part_size=None,
-            throughput_target_gbps=None):
+            throughput_target_gbps=None,
+            buffer_pool=None,
+            adaptive=False,
+            enable_read_backpressure=False,
+            initial_read_window=None,
+            priority_weights=None,
+            max_requests_in_flight=None,
+            cpu_groups=None):
         assert isinstance(bootstrap, ClientBootstrap) or bootstrap is None
         assert isinstance(region, str)
         assert isinstance(credential_provider, AwsCredentialsProvider) or credential_provider is None
@@ -105,18 +368,84 @@ class S3Client(NativeResource):
             int) or isinstance(
             throughput_target_gbps,
             float) or throughput_target_gbps is None
+        assert isinstance(buffer_pool, S3BufferPool) or buffer_pool is None
+        assert isinstance(initial_read_window, int) or initial_read_window is None
+        if cpu_groups is not None:
+            cpu_groups = list(cpu_groups)
+            if not cpu_groups:
+                raise ValueError('cpu_groups must not be empty')
+            if bootstrap:
+                raise ValueError('bootstrap can not be used with cpu_groups, each group gets its own bootstrap')
+            if adaptive and len(cpu_groups) > 1:
+                raise ValueError('adaptive can not be used with more than one of cpu_groups')
+            group_count = get_cpu_group_count()
+            for cpu_group in cpu_groups:
+                if not 0 <= cpu_group < group_count:
+                    raise ValueError('cpu_group {} does not exist, there are {}'.format(cpu_group, group_count))
+            bootstrap = _new_pinned_bootstrap(cpu_groups[0])
+            if len(cpu_groups) > 1:
+                # the groups share the throughput target
+                throughput_target_gbps = (throughput_target_gbps or _DEFAULT_THROUGHPUT_TARGET_GBPS) / len(cpu_groups)
+        scheduler = None
+        if priority_weights is not None:
+            if adaptive:
+                raise ValueError('priority_weights can not be used with adaptive')
+            if cpu_groups is not None and len(cpu_groups) > 1:
+                raise ValueError('priority_weights can not be used with more than one of cpu_groups')
+            weights = dict(self.DEFAULT_PRIORITY_WEIGHTS)
+            weights.update(priority_weights)
+            if any(weight <= 0 for weight in weights.values()):
+                raise ValueError('priority_weights must be positive')
+            if max_requests_in_flight is None:
+                max_requests_in_flight = 16
+            if max_requests_in_flight < 1:
+                raise ValueError('max_requests_in_flight must be at least 1')
+            scheduler = _S3PriorityScheduler(weights, max_requests_in_flight)
+        elif max_requests_in_flight is not None:
+            raise ValueError('max_requests_in_flight is only used with priority_weights')
 
         super().__init__()
 
         shutdown_event = threading.Event()
+        # on_shutdown MUST NOT reference the client itself, or it could never be GC'd.
+        shutdown_tracker = _ShutdownTracker(shutdown_event)
 
         def on_shutdown():
-            shutdown_event.set()
+            shutdown_tracker.release()
         self._region = region
+        self._part_size = part_size
+        self._buffer_pool = buffer_pool
+        self._read_backpressure = enable_read_backpressure
+        self._shutdown_tracker = shutdown_tracker
         self.shutdown_event = shutdown_event
 
         if not bootstrap:
             bootstrap = ClientBootstrap.get_or_create_static_default()
+        self._config = dict(
+            bootstrap=bootstrap,
+            region=region,
+            tls_mode=tls_mode,
+            credential_provider=credential_provider,
+            tls_connection_options=tls_connection_options,
+            enable_read_backpressure=enable_read_backpressure,
+            initial_read_window=initial_read_window)
+        self._metrics = _S3ClientMetricsCollector()
+        self._tuner = None
+        if adaptive:
+            self._tuner = _S3AdaptiveTuner(
+                self._config, shutdown_tracker, self._metrics, part_size, throughput_target_gbps)
+        self._placement = None
+        if cpu_groups is not None and len(cpu_groups) > 1:
+            self._placement = _S3CpuGroupPlacement([
+                _new_child_client(
+                    dict(self._config, bootstrap=_new_pinned_bootstrap(cpu_group)),
+                    shutdown_tracker,
+                    self._metrics,
+                    part_size=part_size,
+                    throughput_target_gbps=throughput_target_gbps,
+                    buffer_pool=buffer_pool)
+                for cpu_group in cpu_groups[1:]])
+        self._scheduler = scheduler
         s3_client_core = _S3ClientCore(bootstrap, credential_provider, tls_connection_options)
 
         # C layer uses 0 to indicate defaults
@@ -126,6 +455,8 @@ class S3Client(NativeResource):
             part_size = 0
         if throughput_target_gbps is None:
             throughput_target_gbps = 0
+        if initial_read_window is None:
+            initial_read_window = 64 * 1024 * 1024
 
         self._binding = _awscrt.s3_client_new(
             bootstrap,
@@ -136,8 +467,123 @@ class S3Client(NativeResource):
             tls_mode,
             part_size,
             throughput_target_gbps,
+            enable_read_backpressure,
+            initial_read_window,
             s3_client_core)
 
+    @property
+    def buffer_pool(self):
+        """Optional[S3BufferPool]: Pool that GET_OBJECT bodies are received into, if any"""
+        return self._buffer_pool
+
+    @property
+    def metrics(self):
+        """S3ClientMetrics: Snapshot of the metrics, aggregated over every request made with this client"""
+        return self._metrics.snapshot()
+
+    @property
+    def tuning_decisions(self):
+        """List[S3TuningDecision]: The most recent choices made by `adaptive` tuning, oldest first.
+        Empty if the client isn't adaptive."""
+        if self._tuner is None:
+            return []
+        return self._tuner.recent_decisions()
+
+    def warm_up(self, bucket_endpoints, connections=1, credential_provider=None):
+        """Open connections to S3 ahead of time, so the first real requests start at full speed.
+
+        For each endpoint, `connections` HeadBucket requests are sent at once.
+        Sending them resolves the endpoint's host name with the client's
+        :class:`~awscrt.io.DefaultHostResolver` (which keeps the addresses cached),
+        and opens the TCP and TLS connections, which then stay in the client's pool for later requests.
+
+        Args:
+            bucket_endpoints (Iterable[str]): Host names of the buckets to warm up
+                (ex: "my-bucket.s3.us-west-2.amazonaws.com").
+
+            connections (int): Number of connections to open to each endpoint.
+                The client may keep fewer, if that's more than it allows (see `throughput_target_gbps`).
+                If the client has several sets of connections (see `cpu_groups`), each set gets this many.
+                With `adaptive`, so does the client for each part size used so far. A part size's client
+                that's created (or rebuilt with a new throughput target) later starts without connections.
+                With `priority_weights`, the warm-up requests wait for their turn like any other request,
+                so at most `max_requests_in_flight` connections are opened to each endpoint.
+
+            credential_provider (Optional[AwsCredentialsProvider]): Credentials providers source the
+                :class:`~awscrt.auth.AwsCredentials` needed to sign the requests.
+                If None is provided, the credential provider in the client will be used.
+
+        Returns:
+            concurrent.futures.Future: Future that resolves to None once every warm-up request has finished.
+            A response with an error status (ex: 403, if the credentials may not HeadBucket) still
+            warms up its connection, and doesn't fail the Future. The Future fails if an endpoint
+            couldn't be reached.
+            If a request can't be sent at all, the ones already sent are cancelled, and the exception is raised.
+        """
+        if connections < 1:
+            raise ValueError('connections must be at least 1')
+        bucket_endpoints = list(bucket_endpoints)
+        clients = [self]
+        if self._placement is not None:
+            clients.extend(self._placement.clients())
+        if self._tuner is not None:
+            clients.extend(self._tuner.clients())
+
+        warm_up = _S3WarmUp(len(clients) * len(bucket_endpoints) * connections)
+        try:
+            for client in clients:
+                for endpoint in bucket_endpoints:
+                    for i in range(connections):
+                        warm_up.add(S3Request(
+                            client=client,
+                            request=HttpRequest('HEAD', '/', HttpHeaders([('host', endpoint)])),
+                            type=S3RequestType.DEFAULT,
+                            credential_provider=credential_provider,
+                            on_done=warm_up.on_done,
+                            region=self._region))
+        except BaseException as e:
+            warm_up.fail_to_start(e)
+            raise
+        return warm_up.finished_future
+
+    def _untune(self, tuning, error):
+        # The request tuned with _tune() couldn't be made, so it's not in flight after all
+        if tuning is not None and self._tuner is not None:
+            self._tuner.observe(tuning, error)
+
+    def _tune(self, type, request, send_filepath, object_size_hint, on_headers, on_done):
+        # Returns the client to send the request with, the decision, and callbacks wrapped to observe the request.
+        if self._tuner is None:
+            client = None
+            if self._placement is not None:
+                client, on_done = self._placement.choose(on_done)
+            return client or self, None, on_headers, on_done
+
+        object_size = object_size_hint
+        if object_size is None and type == S3RequestType.PUT_OBJECT:
+            if send_filepath:
+                object_size = os.stat(send_filepath).st_size
+            else:
+                content_length = request.headers.get('Content-Length')
+                object_size = int(content_length) if content_length else None
+
+        client, decision = self._tuner.choose(object_size)
+        if client is None:
+            client = self
+        start_time = time.monotonic()
+
+        def on_headers_tuned(**kwargs):
+            decision.time_to_first_byte = time.monotonic() - start_time
+            if on_headers:
+                on_headers(**kwargs)
+
+        def on_done_tuned(**kwargs):
+            self._tuner.observe(decision, kwargs.get('error'))
+            if on_done:
+                on_done(**kwargs)
+
+        return client, decision, on_headers_tuned, on_done_tuned
+
     def make_request(
             self,
             *,
@@ -149,17 +595,28 @@ class S3Client(NativeResource):
             on_headers=None,
             on_body=None,
             on_done=None,
-            on_progress=None):
+            on_progress=None,
+            reuse_body_buffer=False,
+            object_size_hint=None,
+            on_part=None,
+            progress_interval_bytes=0,
+            progress_interval_ms=1000,
+            manual_read_window=False,
+            send_filepath_mmap=False,
+            checksum_config=None,
+            checkpoint_filepath=None,
+            priority=None):
         """Create the Request to the the S3 server,
-        :attr:`~S3RequestType.GET_OBJECT`/:attr:`~S3RequestType.PUT_OBJECT` requests are split it into multi-part
-        requests under the hood for acceleration.
+        :attr:`~S3RequestType.GET_OBJECT`/:attr:`~S3RequestType.PUT_OBJECT`/:attr:`~S3RequestType.COPY_OBJECT`
+        requests are split it into multi-part requests under the hood for acceleration.
 
         Keyword Args:
             request (HttpRequest): The overall outgoing API request for S3 operation.
                 If the request body is a file, set send_filepath for better performance.
 
             type (S3RequestType): The type of S3 request passed in,
-                :attr:`~S3RequestType.GET_OBJECT`/:attr:`~S3RequestType.PUT_OBJECT` can be accelerated
+                :attr:`~S3RequestType.GET_OBJECT`/:attr:`~S3RequestType.PUT_OBJECT`/:attr:`~S3RequestType.COPY_OBJECT`
+                can be accelerated
 
             credential_provider (Optional[AwsCredentialsProvider]): Credentials providers source the
                 :class:`~awscrt.auth.AwsCredentials` needed to sign an authenticated AWS request, for this request only.
@@ -169,6 +626,9 @@ class S3Client(NativeResource):
                 response body is written directly to a file and the
                 `on_body` callback is not invoked. This should give better
                 performance than writing to file from the `on_body` callback.
+                The file is sized to the response's Content-Length up front,
+                and each part is written at its own offset with positional writes.
+                If `request` has a `Range` header, the file holds just that range.
 
             send_filepath (Optional[str]): Optional file path. If set, the
                 request body is read directly from a file and the
@@ -193,9 +653,16 @@ class S3Client(NativeResource):
 
                     *   `chunk` (buffer): Response body data (not necessarily
                         a whole "chunk" of chunked encoding).
+                        This is a :class:`bytes` object, unless `reuse_body_buffer` is set.
 
                     *   `offset` (int): The offset of the chunk started in the whole body.
 
+                    *   `buffer` (Optional[buffer]): If the client has a `buffer_pool`, and this is a
+                        :attr:`S3RequestType.GET_OBJECT` request, the pooled buffer that `chunk` was
+                        received into, and `chunk` is a memoryview over the start of it.
+                        The buffer belongs to you until you give it back with
+                        :meth:`S3BufferPool.release()`. Otherwise, None.
+
                     *   `**kwargs` (dict): Forward-compatibility kwargs.
 
             on_done: Optional callback invoked when the request has finished the job.
@@ -213,30 +680,510 @@ class S3Client(NativeResource):
                         side sent an unsuccessful response, the body of the response is
                         provided here. Else None will be returned.
 
+                    *   `did_validate_checksum` (bool): True if the response was validated
+                        against a checksum stored by S3. See `checksum_config`.
+
+                    *   `checksum_validation_algorithm` (Optional[S3ChecksumAlgorithm]):
+                        Algorithm of the checksum the response was validated against, or None.
+
+                    *   `object_checksum` (Optional[bytes]): Checksum of the whole object,
+                        computed with the `checksum_config` algorithm, or None if it wasn't computed.
+                        CRCs are 4 bytes, big-endian. S3 reports checksums base64 encoded.
+
                     *   `**kwargs` (dict): Forward-compatibility kwargs.
 
             on_progress: Optional callback invoked when part of the transfer is done to report the progress.
+                Progress is batched up natively, and reported according to `progress_interval_bytes`
+                and `progress_interval_ms`. Whatever is left is reported before the request finishes.
                 The function should take the following arguments and return nothing:
 
                     *   `progress` (int): Number of bytes of data that just get transferred
 
                     *   `**kwargs` (dict): Forward-compatibility kwargs.
 
+            reuse_body_buffer (bool): If True, each part is copied into a buffer that is reused from one part
+                to the next, and the `chunk` passed to `on_body` is a :class:`memoryview` of it,
+                instead of a new :class:`bytes` object. The part is still copied out of native memory,
+                but there's no allocation per part, which matters for high throughput downloads.
+                The memoryview owns its memory, so it's safe to keep it, or anything derived from it
+                (slices, casts, ``numpy.frombuffer(chunk)``). The buffer is only reused once nothing
+                refers to it anymore, so keeping a chunk just costs a new buffer for the next one.
+                Default is False.
+
+            object_size_hint (Optional[int]): Size of the object, if known.
+                Lets an `adaptive` client tune downloads. Ignored otherwise.
+
+            on_part: Optional callback invoked as each part of a download is received,
+                with timing data for the part. See also :attr:`S3Request.metrics`.
+                The function should take the following arguments and return nothing:
+
+                    *   `part` (:class:`S3PartMetrics`): The part that was received.
+
+                    *   `**kwargs` (dict): Forward-compatibility kwargs.
+
+            progress_interval_bytes (int): Only report progress once at least this many bytes
+                have been transferred since it was last reported. Default is 0.
+
+            progress_interval_ms (int): Only report progress once at least this many milliseconds
+                have passed since it was last reported. Default is 1000.
+                Progress is reported when both intervals have been reached.
+                Each report takes the GIL from a native thread, so reporting less often
+                leaves more time for the transfer. Set both to 0 to report every step.
+
+            manual_read_window (bool): Only matters if the client has `enable_read_backpressure`.
+                If False (the default), the read window grows by the size of each chunk of body once
+                it has been handled: written to `recv_filepath`, or `on_body` has returned.
+                If True, the read window only grows when you call :meth:`S3Request.increment_read_window()`,
+                for when the body is consumed after `on_body` returns (ex: on another thread).
+                Once the window is used up, no more data is fetched until it grows.
+
+            send_filepath_mmap (bool): If True, `send_filepath` is memory-mapped and parts are copied
+                straight out of the mapping, with the OS told to read ahead of the upload.
+                The upload still reads the file one part at a time, in order, but each read is a copy
+                out of the page cache instead of a read through stdio, which helps multi-GB uploads from fast disks.
+                The file's size is checked before each read, and the upload fails if the file has shrunk.
+                Don't truncate the file while it's being uploaded: if that happens in the middle of
+                a read, the process can still crash (SIGBUS).
+                Falls back to normal reads if the file can't be mapped, and on Windows.
+                Default is False.
+
+            checksum_config (Optional[S3ChecksumConfig]): How to compute and validate checksums.
+                The checksums are computed as the body streams through, without another pass over the data.
+                If None, no checksums are computed or validated.
+
+            checkpoint_filepath (Optional[str]): Path of a small file to record the progress of
+                a :attr:`S3RequestType.GET_OBJECT` to `recv_filepath` in, so it can be resumed
+                after the process restarts. Only for downloads to `recv_filepath`.
+                If the file exists (and so does `recv_filepath`), only the rest of the object is
+                downloaded, into the existing `recv_filepath`. To do this, `Range` and `If-Match`
+                headers are added to `request`, so the request fails if the object has changed since.
+                The `request` must not have a `Range` header of its own.
+                Progress is saved at most once a second, after the downloaded data is flushed to disk.
+                Only bytes downloaded contiguously from the start of the object count as progress.
+                When resuming with a `checksum_config`, the part of `recv_filepath` that was already
+                downloaded is read back first, so `object_checksum` still covers the whole object.
+                The file is deleted once the download succeeds.
+                To resume uploads, see :meth:`make_streaming_upload()`.
+
+            priority (Optional[S3RequestPriority]): Priority of the request, if the client has
+                `priority_weights`. Ignored otherwise. (:attr:`S3RequestPriority.NORMAL` by default)
+                A request that has to wait for its turn is only sent once its turn comes, so errors that
+                would be raised when sending it (ex: `recv_filepath` can't be opened) are reported through
+                `on_done` and `finished_future` instead.
+
         Returns:
             S3Request
         """
-        return S3Request(
+        client, tuning, on_headers, on_done = self._tune(
+            type, request, send_filepath, object_size_hint, on_headers, on_done)
+        try:
+            return S3Request(
+                client=client,
+                request=request,
+                type=type,
+                credential_provider=credential_provider,
+                recv_filepath=recv_filepath,
+                send_filepath=send_filepath,
+                on_headers=on_headers,
+                on_body=on_body,
+                on_done=on_done,
+                on_progress=on_progress,
+                region=self._region,
+                reuse_body_buffer=reuse_body_buffer,
+                buffer_pool=self._buffer_pool,
+                tuning=tuning,
+                on_part=on_part,
+                progress_interval_bytes=progress_interval_bytes,
+                progress_interval_ms=progress_interval_ms,
+                manual_read_window=manual_read_window,
+                send_filepath_mmap=send_filepath_mmap,
+                checksum_config=checksum_config,
+                checkpoint_filepath=checkpoint_filepath,
+                priority=priority)
+        except BaseException as e:
+            self._untune(tuning, e)
+            raise
+
+    def make_request_async(
+            self,
+            *,
+            request,
+            type,
+            credential_provider=None,
+            recv_filepath=None,
+            send_filepath=None,
+            send_async_source=None,
+            object_size_hint=None,
+            checksum_config=None,
+            priority=None,
+            max_buffered_bytes=64 * 1024 * 1024):
+        """Create a request to the S3 server, for use with asyncio.
+
+        MUST be called from a coroutine or callback running on an asyncio event loop.
+        The returned request's results are delivered on that loop.
+
+        Keyword Args:
+            request, type, credential_provider, recv_filepath, send_filepath:
+                See :meth:`make_request()`.
+
+            object_size_hint, checksum_config, priority:
+                See :meth:`make_request()`.
+
+            send_async_source (Optional[AsyncIterable[bytes]]): Async iterable (ex: an async generator)
+                producing the body to upload, for :attr:`S3RequestType.PUT_OBJECT`.
+                It's iterated on the event loop, up to `max_buffered_bytes` ahead of the upload.
+                This replaces the `request`'s body_stream. The `request` must still have
+                a Content-Length header.
+
+            max_buffered_bytes (int): Most bytes of `send_async_source` to buffer ahead of the upload.
+                (64 MiB by default)
+                A received body is bounded by the read window instead, since the native threads
+                delivering it must never wait: if the client has `enable_read_backpressure`,
+                the window only grows as the body is consumed, so at most the client's
+                `initial_read_window` is buffered. Without it, the body is buffered as fast as it arrives.
+
+        Returns:
+            S3AsyncRequest
+        """
+        return S3AsyncRequest(
             client=self,
             request=request,
             type=type,
             credential_provider=credential_provider,
             recv_filepath=recv_filepath,
             send_filepath=send_filepath,
-            on_headers=on_headers,
+            send_async_source=send_async_source,
+            object_size_hint=object_size_hint,
+            checksum_config=checksum_config,
+            priority=priority,
+            max_buffered_bytes=max_buffered_bytes)
+
+    def make_streaming_upload(
+            self,
+            *,
+            request,
+            source,
+            part_size=None,
+            max_parts_in_flight=4,
+            credential_provider=None,
+            on_done=None,
+            checkpoint_filepath=None):
+        """Upload a body whose length isn't known up front (ex: a pipe, a generator, compressor output).
+
+        The body is uploaded as an S3 multipart upload, reading and buffering one part at a time,
+        so memory use is bounded by about (`max_parts_in_flight` + 2) * `part_size`,
+        no matter how big the body is. A body that fits in one part is uploaded with a single PutObject.
+
+        Keyword Args:
+            request (HttpRequest): PUT request for the object, without Content-Length or body.
+                Its headers (ex: Content-Type, x-amz-meta-*) are sent when the upload is created.
+
+            source: Body to upload. Either a binary file-like object with ``read()``
+                (it doesn't need to be seekable), or an iterable of bytes-like objects.
+
+            part_size (Optional[int]): Size, in bytes, of each part. At least 5 MiB, as required by S3.
+                S3 allows at most 10,000 parts, so this also caps the size of the object.
+                If None, the client's part size is used (8 MiB if the client doesn't set one).
+
+            max_parts_in_flight (int): Most parts being uploaded at once,
+                while the next part is read. (4 by default)
+
+            credential_provider (Optional[AwsCredentialsProvider]): Credentials providers source the
+                :class:`~awscrt.auth.AwsCredentials` needed to sign an authenticated AWS request, for this upload only.
+                If None is provided, the credential provider in the client will be used.
+
+            on_done: Optional callback invoked when the upload has finished or failed.
+                The function should take the following arguments and return nothing:
+
+                    *   `error` (Optional[Exception]): None if the upload succeeded,
+                        or the Exception that made it fail. A failed multipart upload is aborted,
+                        unless it has a `checkpoint_filepath`.
+
+                    *   `**kwargs` (dict): Forward-compatibility kwargs.
+
+            checkpoint_filepath (Optional[str]): Path of a small file to record the multipart upload's
+                ID and finished parts in, so the upload can be resumed after the process restarts.
+                If the file exists, the upload resumes from it: the parts already uploaded are skipped
+                (seeked past, if `source` is seekable, else read and dropped) and aren't sent again.
+                `source` MUST produce the same body as the first time.
+                Only parts finished contiguously from the first part are kept, so up to
+                `max_parts_in_flight` parts may be sent again.
+                The file is deleted once the upload succeeds. If the upload fails or is cancelled,
+                the multipart upload is NOT aborted, so it can be resumed later.
+                Use a bucket lifecycle rule to clean up uploads that are never resumed.
+
+        Returns:
+            S3StreamingUpload
+        """
+        return S3StreamingUpload(
+            client=self,
+            request=request,
+            source=source,
+            part_size=part_size,
+            max_parts_in_flight=max_parts_in_flight,
+            credential_provider=credential_provider,
+            on_done=on_done,
+            checkpoint_filepath=checkpoint_filepath)
+
+    def make_batch_transfer(
+            self,
+            *,
+            type,
+            items,
+            host,
+            max_in_flight=128,
+            credential_provider=None,
+            on_item_done=None,
+            on_done=None):
+        """Transfer many objects between S3 and local files, with bounded concurrency.
+
+        This is the efficient way to move thousands of small objects:
+        items are pulled lazily, at most `max_in_flight` transfers run at once,
+        and there's one aggregate future for the whole batch.
+
+        Keyword Args:
+            type (S3RequestType): :attr:`~S3RequestType.GET_OBJECT` to download each object to its path,
+                or :attr:`~S3RequestType.PUT_OBJECT` to upload each path to its object.
+
+            items (Iterable[Tuple[str, str]]): (key, local path) pairs.
+                May be a lazy iterator, it is consumed on a background thread as the batch progresses.
+
+            host (str): Host of the bucket's endpoint (ex: "my-bucket.s3.us-west-2.amazonaws.com").
+
+            max_in_flight (int): Max number of objects transferred at once. (128 by default)
+
+            credential_provider (Optional[AwsCredentialsProvider]): Credentials providers source the
+                :class:`~awscrt.auth.AwsCredentials` needed to sign each request.
+                If None is provided, the credential provider in the client will be used.
+
+            on_item_done: Optional callback invoked as each item finishes.
+                The function should take the following arguments and return nothing:
+
+                    *   `result` (:class:`S3BatchItemResult`): Result of the item.
+
+                    *   `**kwargs` (dict): Forward-compatibility kwargs.
+
+            on_done: Optional callback invoked when the batch has finished.
+                The function should take the following arguments and return nothing:
+
+                    *   `error` (Optional[Exception]): None, or the exception raised
+                        while pulling items from `items`.
+
+                    *   `results` (List[:class:`S3BatchItemResult`]): Results of every item that started,
+                        ordered by index.
+
+                    *   `**kwargs` (dict): Forward-compatibility kwargs.
+
+        Returns:
+            S3BatchTransfer
+        """
+        return S3BatchTransfer(
+            client=self,
+            type=type,
+            items=items,
+            host=host,
+            max_in_flight=max_in_flight,
+            credential_provider=credential_provider,
+            on_item_done=on_item_done,
+            on_done=on_done)
+
+    def upload_directory(
+            self,
+            *,
+            directory,
+            host,
+            prefix='',
+            skip_unchanged=True,
+            follow_symlinks=False,
+            max_in_flight=128,
+            credential_provider=None,
+            on_item_done=None,
+            on_done=None):
+        """Upload every file under a local directory to objects under a key prefix.
+
+        The directory is walked lazily, and each file starts uploading as soon as it's found,
+        so the first bytes go out before the walk is done and memory stays flat on big trees.
+        If `skip_unchanged` is set, the objects under the prefix are listed concurrently with the walk,
+        and files whose size and ETag match the existing object are skipped.
+        Hashing files to compare ETags also happens while other files are uploading.
+
+        Keyword Args:
+            directory (str): Local directory to upload.
+
+            host (str): Host of the bucket's endpoint (ex: "my-bucket.s3.us-west-2.amazonaws.com").
+
+            prefix (str): Key prefix. A file's key is the prefix, followed by its path relative to
+                `directory` with "/" separators. Include a trailing "/" if you want one.
+
+            skip_unchanged (bool): If True, skip files whose size and ETag already match
+                the object. Note that objects encrypted with SSE-KMS or SSE-C don't
+                have an MD5 ETag, and are always uploaded again. (True by default)
+
+            follow_symlinks (bool): Whether to follow symlinks to files and directories. (False by default)
+
+            max_in_flight, credential_provider, on_item_done, on_done: See :meth:`make_batch_transfer()`.
+                Skipped files are not reported as items.
+
+        Returns:
+            S3BatchTransfer
+        """
+        def items():
+            if not skip_unchanged:
+                for path, key, size in _walk_directory(directory, prefix, follow_symlinks):
+                    yield key, path
+                return
+
+            listing = _S3ListingIndex(self, host, prefix, credential_provider)
+            try:
+                candidates = ((key, path, size, listing.pop(key))
+                              for path, key, size in _walk_directory(directory, prefix, follow_symlinks))
+                yield from _skip_unchanged(candidates, self._part_size)
+            finally:
+                listing.close()
+
+        return self.make_batch_transfer(
+            type=S3RequestType.PUT_OBJECT,
+            items=items(),
+            host=host,
+            max_in_flight=max_in_flight,
+            credential_provider=credential_provider,
+            on_item_done=on_item_done,
+            on_done=on_done)
+
+    def download_directory(
+            self,
+            *,
+            directory,
+            host,
+            prefix='',
+            skip_unchanged=True,
+            max_in_flight=128,
+            credential_provider=None,
+            on_item_done=None,
+            on_done=None):
+        """Download every object under a key prefix to files under a local directory.
+
+        Objects start downloading as soon as their page of the listing arrives,
+        and the next page is requested while the current one is being transferred.
+
+        Keyword Args:
+            directory (str): Local directory to download to. Missing directories are created.
+
+            host (str): Host of the bucket's endpoint (ex: "my-bucket.s3.us-west-2.amazonaws.com").
+
+            prefix (str): Key prefix. An object's path is `directory`, joined with
+                its key relative to the prefix.
+
+            skip_unchanged (bool): If True, skip objects whose local file's size and ETag
+                already match. (True by default)
+
+            max_in_flight, credential_provider, on_item_done, on_done: See :meth:`make_batch_transfer()`.
+                Skipped objects are not reported as items.
+
+        Returns:
+            S3BatchTransfer
+        """
+        def candidates():
+            for remote in _S3ObjectLister(self, host, prefix, credential_provider):
+                relative_key = remote.key[len(prefix):]
+                if not relative_key or relative_key.endswith('/'):
+                    # "directory" placeholder objects
+                    continue
+                path = os.path.join(directory, *relative_key.split('/'))
+                if os.path.commonpath([os.path.abspath(directory), os.path.abspath(path)]) != \
+                        os.path.abspath(directory):
+                    raise ValueError('object key {!r} would be written outside of directory'.format(remote.key))
+
+                os.makedirs(os.path.dirname(path), exist_ok=True)
+                size = None
+                if skip_unchanged:
+                    try:
+                        size = os.stat(path).st_size
+                    except FileNotFoundError:
+                        pass
+                yield remote.key, path, size, remote if size is not None else None
+
+        def items():
+            yield from _skip_unchanged(candidates(), self._part_size)
+
+        return self.make_batch_transfer(
+            type=S3RequestType.GET_OBJECT,
+            items=items(),
+            host=host,
+            max_in_flight=max_in_flight,
+            credential_provider=credential_provider,
+            on_item_done=on_item_done,
+            on_done=on_done)
+
+    def make_ranged_request(
+            self,
+            *,
+            request,
+            ranges,
+            max_coalesce_gap=1024 * 1024,
+            credential_provider=None,
+            on_body=None,
+            on_done=None,
+            reuse_body_buffer=False):
+        """Download several byte ranges of one object.
+
+        Ranges that are close together are coalesced, so they're fetched with a single request,
+        and the bytes between them are dropped. Each coalesced range is fetched as a
+        :attr:`~S3RequestType.GET_OBJECT` with a Range header, which is split into parts
+        of the client's `part_size` and fetched in parallel under the hood.
+        This lets columnar readers (Parquet, ORC, ...) fetch only the bytes they need.
+
+        Keyword Args:
+            request (HttpRequest): GET request for the whole object. It must not have a Range header.
+
+            ranges (Sequence[Tuple[int, int]]): Byte ranges to fetch, as (offset, length) pairs.
+                Ranges may be in any order, and may overlap.
+
+            max_coalesce_gap (int): Ranges separated by this many bytes or fewer are fetched
+                with a single request. Fetching a small gap costs less than the latency of another
+                request. Set 0 to only coalesce ranges that touch or overlap. (1 MiB by default)
+
+            credential_provider (Optional[AwsCredentialsProvider]): Credentials providers source the
+                :class:`~awscrt.auth.AwsCredentials` needed to sign an authenticated AWS request, for this request only.
+                If None is provided, the credential provider in the client will be used.
+
+            on_body: Optional callback invoked 0+ times as data for the requested ranges is received.
+                Data for a given range arrives in order, but data for different ranges may interleave.
+                The function should take the following arguments and return nothing:
+
+                    *   `chunk` (buffer): Data for one of the requested ranges.
+
+                    *   `offset` (int): Offset of the chunk within the whole object.
+
+                    *   `range_index` (int): Index in `ranges` of the range this chunk belongs to.
+                        If ranges overlap, the overlapping data is delivered once for each range.
+
+                    *   `**kwargs` (dict): Forward-compatibility kwargs.
+
+            on_done: Optional callback invoked when every range has been fetched, or one failed.
+                The function should take the following arguments and return nothing:
+
+                    *   `error` (Optional[Exception]): None if every range was fetched successfully,
+                        or the Exception from the first request that failed.
+
+                    *   `**kwargs` (dict): Forward-compatibility kwargs.
+
+            reuse_body_buffer (bool): If True, `chunk` is a :class:`memoryview` of a buffer
+                that parts are copied into, and that's reused while you don't keep it.
+                See :meth:`make_request()`.
+
+        Returns:
+            S3RangedRequest
+        """
+        return S3RangedRequest(
+            client=self,
+            request=request,
+            ranges=ranges,
+            max_coalesce_gap=max_coalesce_gap,
+            credential_provider=credential_provider,
             on_body=on_body,
             on_done=on_done,
-            on_progress=on_progress,
-            region=self._region)
+            reuse_body_buffer=reuse_body_buffer)
 
 
 class S3Request(NativeResource):
@@ -252,8 +1199,12 @@ class S3Request(NativeResource):
         shutdown_event (threading.Event): Signals when underlying threads and
             structures have all finished shutting down. Shutdown begins when the
             S3Request object is destroyed.
+
+        metrics (S3RequestMetrics): Timing and transfer metrics for this request,
+            updated as the request progresses. Final once `finished_future` resolves.
     """
-    __slots__ = ('_finished_future', 'shutdown_event')
+    __slots__ = ('_finished_future', 'shutdown_event', '_tuning', 'metrics',
+                 '_scheduler', '_waiting', '_start_lock', '_started', '_cancelled', '_pending_read_window')
 
     def __init__(
             self,
@@ -268,17 +1219,80 @@ class S3Request(NativeResource):
             on_body=None,
             on_done=None,
             on_progress=None,
-            region=None):
+            region=None,
+            reuse_body_buffer=False,
+            buffer_pool=None,
+            tuning=None,
+            on_part=None,
+            progress_interval_bytes=0,
+            progress_interval_ms=1000,
+            manual_read_window=False,
+            send_filepath_mmap=False,
+            checksum_config=None,
+            checkpoint_filepath=None,
+            priority=None):
         assert isinstance(client, S3Client)
         assert isinstance(request, HttpRequest)
         assert callable(on_headers) or on_headers is None
         assert callable(on_body) or on_body is None
         assert callable(on_done) or on_done is None
+        assert callable(on_part) or on_part is None
+        assert isinstance(checksum_config, S3ChecksumConfig) or checksum_config is None
+        if progress_interval_bytes < 0 or progress_interval_ms < 0:
+            raise ValueError('progress_interval_bytes and progress_interval_ms must not be negative')
+        if type == S3RequestType.COPY_OBJECT:
+            if request.headers.get('x-amz-copy-source') is None:
+                raise ValueError('COPY_OBJECT request must have a x-amz-copy-source header')
+            if recv_filepath or send_filepath:
+                raise ValueError('COPY_OBJECT request has no body to send or receive, '
+                                 'recv_filepath and send_filepath must not be set')
 
         super().__init__()
 
         self._finished_future = Future()
         self.shutdown_event = threading.Event()
+        self._tuning = tuning
+        self.metrics = S3RequestMetrics()
+        self._scheduler = client._scheduler
+        self._waiting = None
+        self._start_lock = None
+        self._started = False
+        self._cancelled = False
+        self._pending_read_window = 0
+
+        if not (buffer_pool and type == S3RequestType.GET_OBJECT and on_body and not recv_filepath):
+            buffer_pool = None
+
+        checksum_algorithm = 0  # 0 means NONE in C
+        checksum_location = 0  # 0 means NONE in C
+        validate_response_checksum = False
+        if checksum_config is not None:
+            if checksum_config.algorithm is not None:
+                checksum_algorithm = checksum_config.algorithm.value
+            if checksum_config.location is not None:
+                checksum_location = checksum_config.location.value
+            validate_response_checksum = checksum_config.validate_response
+
+        resume_recv_file_offset = 0
+        if checkpoint_filepath is not None:
+            if type != S3RequestType.GET_OBJECT or not recv_filepath:
+                raise ValueError('checkpoint_filepath is only for GET_OBJECT requests with recv_filepath')
+            checkpointer = _S3DownloadCheckpointer(
+                checkpoint_filepath, request, recv_filepath, on_headers, on_part, on_done)
+            resume_recv_file_offset = checkpointer.resume_offset
+            on_headers = checkpointer.on_headers
+            on_part = checkpointer.on_part
+            on_done = checkpointer.on_done
+
+        scheduler = self._scheduler
+        if scheduler is not None:
+            # MUST NOT reference the request itself, or the native request would keep it alive forever
+            on_done_scheduled = on_done
+
+            def on_done(**kwargs):
+                scheduler.finished()
+                if on_done_scheduled:
+                    on_done_scheduled(**kwargs)
 
         s3_request_core = _S3RequestCore(
             request,
@@ -288,44 +1302,2042 @@ class S3Request(NativeResource):
             on_headers,
             on_body,
             on_done,
-            on_progress)
-
-        self._binding = _awscrt.s3_client_make_meta_request(
-            self,
-            client,
-            request,
-            type,
-            credential_provider,
-            recv_filepath,
-            send_filepath,
-            region,
-            s3_request_core)
+            on_progress,
+            buffer_pool,
+            self.metrics,
+            client._metrics,
+            on_part)
+
+        def make_meta_request():
+            return _awscrt.s3_client_make_meta_request(
+                self,
+                client,
+                request,
+                type,
+                credential_provider,
+                recv_filepath,
+                send_filepath,
+                region,
+                reuse_body_buffer,
+                buffer_pool is not None,
+                progress_interval_bytes,
+                progress_interval_ms,
+                manual_read_window,
+                send_filepath_mmap,
+                checksum_algorithm,
+                checksum_location,
+                validate_response_checksum,
+                resume_recv_file_offset,
+                on_part is not None,
+                s3_request_core)
+
+        def start():
+            client._metrics.request_started()
+            try:
+                self._start(make_meta_request())
+            except BaseException:
+                client._metrics.request_finished(self.metrics, succeeded=False)
+                raise
+
+        if scheduler is None:
+            start()
+        else:
+            self._start_lock = threading.Lock()
+            if priority is None:
+                priority = S3RequestPriority.NORMAL
+            waiting = scheduler.submit(S3RequestPriority(priority), start, s3_request_core._on_failed_to_start)
+            with self._start_lock:
+                if not self._started:
+                    self._waiting = waiting
+
+    def _start(self, binding):
+        if self._start_lock is None:
+            self._binding = binding
+            return
+        # With priority_weights, the request may have waited for its turn, catch up on what was asked of it meanwhile
+        with self._start_lock:
+            self._binding = binding
+            self._started = True
+            self._waiting = None
+            cancelled = self._cancelled
+            pending_read_window = self._pending_read_window
+        if pending_read_window:
+            _awscrt.s3_meta_request_increment_read_window(self, pending_read_window)
+        if cancelled:
+            _awscrt.s3_meta_request_cancel(self)
 
     @property
     def finished_future(self):
         return self._finished_future
 
+    @property
+    def tuning(self):
+        """Optional[S3TuningDecision]: How an `adaptive` client tuned this request, or None"""
+        return self._tuning
+
     def cancel(self):
+        if self._start_lock is not None:
+            with self._start_lock:
+                started = self._started
+                self._cancelled = True
+                waiting = self._waiting
+            if not started:
+                # Don't wait for its turn just to fail, send it now and it's cancelled as soon as it starts
+                if waiting is not None:
+                    self._scheduler.send_now(waiting)
+                return
         _awscrt.s3_meta_request_cancel(self)
 
+    def increment_read_window(self, size):
+        """Grow the read window, letting `size` more bytes of body be fetched.
 
-class _S3ClientCore:
-    '''
-    Private class to keep all the related Python object alive until C land clean up for S3Client
-    '''
+        Only needed if the client has `enable_read_backpressure`, and the request
+        was made with `manual_read_window`. Safe to call from any thread.
 
-    def __init__(self, bootstrap,
-                 credential_provider=None,
-                 tls_connection_options=None):
-        self._bootstrap = bootstrap
-        self._credential_provider = credential_provider
-        self._tls_connection_options = tls_connection_options
+        Args:
+            size (int): Number of bytes to grow the window by.
+        """
+        if size < 0:
+            raise ValueError('size must not be negative')
+        if self._start_lock is not None:
+            with self._start_lock:
+                if not self._started:
+                    self._pending_read_window += size
+                    return
+        _awscrt.s3_meta_request_increment_read_window(self, size)
 
 
-class _S3RequestCore:
-    '''
-    Private class to keep all the related Python object alive until C land clean up for S3Request
-    '''
+class S3AsyncRequest:
+    """S3 request for use with asyncio.
+    Create a new S3AsyncRequest with :meth:`S3Client.make_request_async()`
+
+    Await the S3AsyncRequest to wait for it to finish. This raises an exception
+    if the request failed. Cancelling the awaiting task cancels the request.
+
+    Use ``async for chunk in s3_async_request`` to receive the body (unless `recv_filepath`
+    was used). Chunks are :class:`bytes`, in order. The iteration ends once the whole body
+    has been received, and raises an exception if the request failed.
+    If the client has `enable_read_backpressure`, the body MUST be consumed,
+    or the request stalls once its read window is used up.
+
+    Callbacks from the native threads are batched into as few event loop wakeups as possible,
+    shared by every request on the loop.
+
+    Attributes:
+        request (S3Request): The underlying request, for its metrics, tuning, etc.
+    """
+    __slots__ = ('request', '_done_future', '_headers_future', '_body_queue')
+
+    def __init__(
+            self,
+            *,
+            client,
+            request,
+            type,
+            credential_provider=None,
+            recv_filepath=None,
+            send_filepath=None,
+            send_async_source=None,
+            object_size_hint=None,
+            checksum_config=None,
+            priority=None,
+            max_buffered_bytes=64 * 1024 * 1024):
+        if max_buffered_bytes <= 0:
+            raise ValueError('max_buffered_bytes must be positive')
+        if send_async_source is not None and (type != S3RequestType.PUT_OBJECT or send_filepath):
+            raise ValueError('send_async_source is only for PUT_OBJECT requests, without send_filepath')
+
+        loop = asyncio.get_running_loop()
+        # Nothing below may reference the S3AsyncRequest itself,
+        # or it would be in a reference cycle with the native S3Request
+        bridge = _LoopBridge.get(loop)
+        done_future = loop.create_future()
+        headers_future = loop.create_future()
+        source_reader = None
+        if send_async_source is not None:
+            source_reader = _AsyncSourceReader(loop, send_async_source, max_buffered_bytes)
+            request.body_stream = source_reader
+
+        def on_headers(status_code, headers, **kwargs):
+            bridge.set_result(headers_future, (status_code, headers))
+
+        def on_body(chunk, **kwargs):
+            body_queue.put(chunk)
+
+        def on_body_consumed(size):
+            # weakly referenced, or the queue would keep the native request alive forever
+            s3_request = s3_request_ref()
+            if s3_request is not None:
+                s3_request.increment_read_window(size)
+
+        # With read backpressure, the window only grows as the body is consumed (or dropped, once closed).
+        # The queue never blocks the native thread delivering the body, the window is the only bound.
+        manual_read_window = client._read_backpressure and not recv_filepath
+        body_queue = None
+        if not recv_filepath:
+            body_queue = _AsyncChunkQueue(loop, on_body_consumed if manual_read_window else None)
+
+        def on_done(error, **kwargs):
+            if source_reader is not None:
+                source_reader.close()
+            if body_queue is not None:
+                body_queue.finish(error)
+            if error is None:
+                bridge.set_result(headers_future, (None, None))
+                bridge.set_result(done_future, None)
+            else:
+                bridge.set_exception(headers_future, error)
+                bridge.set_exception(done_future, error)
+
+        tuned_client, tuning, on_headers, on_done = client._tune(
+            type, request, send_filepath, object_size_hint, on_headers, on_done)
+        try:
+            s3_request = S3Request(
+                client=tuned_client,
+                request=request,
+                type=type,
+                credential_provider=credential_provider,
+                recv_filepath=recv_filepath,
+                send_filepath=send_filepath,
+                on_headers=on_headers,
+                on_body=on_body if body_queue is not None else None,
+                on_done=on_done,
+                region=client._region,
+                tuning=tuning,
+                manual_read_window=manual_read_window,
+                checksum_config=checksum_config,
+                priority=priority)
+        except BaseException as e:
+            client._untune(tuning, e)
+            if source_reader is not None:
+                source_reader.close()
+            raise
+        s3_request_ref = weakref.ref(s3_request)
+
+        def on_done_future_done(future):
+            if future.cancelled():
+                # the awaiting task was cancelled
+                if body_queue is not None:
+                    body_queue.close()
+                s3_request.cancel()
+            else:
+                # mark the exception retrieved, in case nobody awaits the request, only its body
+                future.exception()
+        done_future.add_done_callback(on_done_future_done)
+        headers_future.add_done_callback(lambda future: future.cancelled() or future.exception())
+
+        self.request = s3_request
+        self._done_future = done_future
+        self._headers_future = headers_future
+        self._body_queue = body_queue
+
+    def __await__(self):
+        return self._done_future.__await__()
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        if self._body_queue is None:
+            raise StopAsyncIteration
+        chunk = await self._body_queue.get()
+        if chunk is None:
+            raise StopAsyncIteration
+        return chunk
+
+    @property
+    def status_code(self):
+        """Optional[int]: Response status code, or None until the headers arrive"""
+        if self._headers_future.done() and not self._headers_future.exception():
+            return self._headers_future.result()[0]
+        return None
+
+    @property
+    def headers(self):
+        """Optional[List[Tuple[str, str]]]: Response headers, or None until they arrive"""
+        if self._headers_future.done() and not self._headers_future.exception():
+            return self._headers_future.result()[1]
+        return None
+
+    async def wait_for_headers(self):
+        """Wait for the response headers.
+
+        Returns:
+            Tuple[Optional[int], Optional[List[Tuple[str, str]]]]: The status code and headers.
+            Both are None if the request finished without headers being reported.
+        """
+        return await asyncio.shield(self._headers_future)
+
+    def cancel(self):
+        """Cancel the request, and stop receiving its body"""
+        if self._body_queue is not None:
+            self._body_queue.close()
+        self.request.cancel()
+
+
+class S3StreamingUpload:
+    """Upload of a body whose length isn't known up front.
+    Create a new S3StreamingUpload with :meth:`S3Client.make_streaming_upload()`
+
+    The source is read on a background thread, one part at a time.
+    Each part is uploaded as soon as it's full, while the next part is read.
+
+    Attributes:
+        finished_future (concurrent.futures.Future): Future that will
+            resolve when the object has been uploaded.
+            If the upload fails, the Future will contain an exception
+            indicating why it failed. Note: Future will set before on_done invoked
+    """
+    MIN_PART_SIZE = 5 * 1024 * 1024
+    MAX_PARTS = 10000
+
+    __slots__ = ('_client', '_path', '_headers', '_host', '_part_size', '_credential_provider', '_on_done_cb',
+                 '_finished_future', '_condition', '_slots', '_requests', '_parts', '_in_flight', '_error',
+                 '_canceled', '_upload_id', '_bytes_read', '_bytes_uploaded', '_checkpoint')
+
+    def __init__(
+            self,
+            *,
+            client,
+            request,
+            source,
+            part_size=None,
+            max_parts_in_flight=4,
+            credential_provider=None,
+            on_done=None,
+            checkpoint_filepath=None):
+        assert isinstance(client, S3Client)
+        assert isinstance(request, HttpRequest)
+        assert callable(on_done) or on_done is None
+        host = request.headers.get('host')
+        if not host:
+            raise ValueError('request must have a host header')
+        if request.headers.get('Content-Length') is not None:
+            raise ValueError('request must not have a Content-Length header, the length is not known')
+
+        checkpoint = None
+        if checkpoint_filepath is not None:
+            checkpoint = _S3Checkpoint.load(checkpoint_filepath, 'upload', host, request.path)
+            if checkpoint.resumed:
+                if part_size is not None and part_size != checkpoint.state['part_size']:
+                    raise ValueError('part_size does not match the checkpoint')
+                part_size = checkpoint.state['part_size']
+        if part_size is None:
+            part_size = client._part_size or 8 * 1024 * 1024
+        if part_size < self.MIN_PART_SIZE:
+            raise ValueError('part_size must be at least 5 MiB')
+        if max_parts_in_flight < 1:
+            raise ValueError('max_parts_in_flight must be at least 1')
+
+        self._client = client
+        self._path = request.path
+        self._headers = [(name, value) for name, value in request.headers]
+        self._host = host
+        self._part_size = part_size
+        self._credential_provider = credential_provider
+        self._on_done_cb = on_done
+
+        self._finished_future = Future()
+        self._condition = threading.Condition()
+        self._slots = threading.BoundedSemaphore(max_parts_in_flight)
+        # part number -> S3Request, for parts in flight
+        self._requests = {}
+        # part number -> ETag, for parts that are done
+        self._parts = {}
+        self._in_flight = 0
+        self._error = None
+        self._canceled = False
+        self._upload_id = None
+        self._bytes_read = 0
+        self._bytes_uploaded = 0
+        self._checkpoint = checkpoint
+        if checkpoint is not None and checkpoint.resumed:
+            self._upload_id = checkpoint.state['upload_id']
+            # keep the parts finished contiguously from part 1, later ones are uploaded again
+            uploaded = dict(checkpoint.state['parts'])
+            while len(self._parts) + 1 in uploaded:
+                part_number = len(self._parts) + 1
+                self._parts[part_number] = uploaded[part_number]
+
+        threading.Thread(target=self._run, args=(_PartReader(source),),
+                         name='S3StreamingUpload', daemon=True).start()
+
+    @property
+    def finished_future(self):
+        return self._finished_future
+
+    @property
+    def upload_id(self):
+        """Optional[str]: ID of the multipart upload, once it's created.
+        None if the upload isn't multipart (yet)."""
+        return self._upload_id
+
+    @property
+    def completed_parts(self):
+        """List[Tuple[int, str]]: (part number, ETag) of each part uploaded so far, by part number"""
+        with self._condition:
+            return sorted(self._parts.items())
+
+    @property
+    def bytes_read(self):
+        """int: Bytes read from the source so far"""
+        return self._bytes_read
+
+    @property
+    def bytes_uploaded(self):
+        """int: Bytes of parts that finished uploading so far"""
+        return self._bytes_uploaded
+
+    def cancel(self):
+        """Stop reading the source, cancel the parts in flight, and abort the upload"""
+        with self._condition:
+            self._canceled = True
+            requests = list(self._requests.values())
+        for request in requests:
+            request.cancel()
+
+    def _run(self, reader):
+        error = None
+        try:
+            if self._upload_id is not None:
+                # resuming from the checkpoint, skip what was uploaded before
+                skip = len(self._parts) * self._part_size
+                if reader.skip(skip) < skip:
+                    raise ValueError('source is shorter than the parts already uploaded')
+                part = self._read_part(reader)
+                next_part = self._read_part(reader) if len(part) == self._part_size else b''
+                self._upload_parts(reader, part, next_part, len(self._parts) + 1)
+            else:
+                part = self._read_part(reader)
+                next_part = self._read_part(reader) if len(part) == self._part_size else b''
+                if not next_part:
+                    # the whole body fits in one part
+                    self._put_object(part)
+                else:
+                    self._upload_parts(reader, part, next_part)
+        except Exception as e:
+            error = e
+
+        if self._checkpoint is not None:
+            # keep a failed upload around, to be resumed
+            if error is None:
+                self._checkpoint.discard()
+        elif error is not None and self._upload_id is not None:
+            try:
+                self._send_and_wait('DELETE', self._query(uploadId=self._upload_id))
+            except Exception:
+                # Nothing more to do. A lifecycle rule can clean up the parts.
+                pass
+
+        if error is None:
+            self._finished_future.set_result(None)
+        else:
+            self._finished_future.set_exception(error)
+        if self._on_done_cb:
+            self._on_done_cb(error=error)
+
+    def _read_part(self, reader):
+        part = reader.read(self._part_size)
+        self._bytes_read += len(part)
+        return part
+
+    def _upload_parts(self, reader, part, next_part, part_number=1):
+        if self._upload_id is None:
+            result = self._send_and_wait('POST', self._path + '?uploads', self._headers)[1]
+            root = ElementTree.fromstring(result)
+            self._upload_id = root.findtext(_S3_XML_NS + 'UploadId')
+            if not self._upload_id:
+                raise RuntimeError('CreateMultipartUpload response has no UploadId')
+            if self._checkpoint is not None:
+                self._checkpoint.save(upload_id=self._upload_id, part_size=self._part_size, parts=[])
+
+        try:
+            while part:
+                if part_number > self.MAX_PARTS:
+                    raise ValueError('body needs more than {} parts of part_size'.format(self.MAX_PARTS))
+                self._slots.acquire()
+                with self._condition:
+                    if self._error is None and self._canceled:
+                        self._error = CancelledError()
+                    if self._error is not None:
+                        self._slots.release()
+                        break
+                    self._in_flight += 1
+                self._upload_part(part_number, part)
+                part_number += 1
+                part = next_part
+                next_part = self._read_part(reader) if part else b''
+        except Exception as e:
+            # Cancel the parts in flight, rather than leave them racing the AbortMultipartUpload
+            with self._condition:
+                if self._error is None:
+                    self._error = e
+                requests = list(self._requests.values())
+            for request in requests:
+                request.cancel()
+
+        with self._condition:
+            self._condition.wait_for(lambda: self._in_flight == 0)
+            if self._error is not None:
+                raise self._error
+
+        complete = ElementTree.Element('CompleteMultipartUpload', xmlns=_S3_XML_NS[1:-1])
+        for number, etag in self.completed_parts:
+            part_element = ElementTree.SubElement(complete, 'Part')
+            ElementTree.SubElement(part_element, 'PartNumber').text = str(number)
+            ElementTree.SubElement(part_element, 'ETag').text = etag
+        body = ElementTree.tostring(complete)
+        result = self._send_and_wait('POST', self._query(uploadId=self._upload_id), body=body)[1]
+        # CompleteMultipartUpload can fail after sending a 200 status, with an Error in the body
+        if ElementTree.fromstring(result).tag.endswith('Error'):
+            raise RuntimeError('CompleteMultipartUpload failed: ' + result.decode('utf-8', 'replace'))
+
+    def _upload_part(self, part_number, part):
+        etag = []
+        finished = []
+
+        def on_headers(headers, **kwargs):
+            etag.extend(value for name, value in headers if name.lower() == 'etag')
+
+        def on_done(error, **kwargs):
+            with self._condition:
+                if self._requests.pop(part_number, None) is None:
+                    # finished before it was stored in self._requests
+                    finished.append(True)
+                self._in_flight -= 1
+                if error is None and not etag:
+                    error = RuntimeError('UploadPart response has no ETag')
+                if error is None:
+                    self._parts[part_number] = etag[0]
+                    self._bytes_uploaded += len(part)
+                    parts = sorted(self._parts.items())
+                elif self._error is None:
+                    self._error = error
+                    requests = list(self._requests.values())
+                else:
+                    requests = []
+                self._condition.notify_all()
+            if error is None and self._checkpoint is not None:
+                try:
+                    self._checkpoint.save(parts=parts)
+                except OSError:
+                    # the part is still uploaded, it just isn't recorded yet
+                    pass
+            self._slots.release()
+            if error is not None:
+                for request in requests:
+                    request.cancel()
+
+        try:
+            request = self._client.make_request(
+                request=self._new_request(
+                    'PUT',
+                    self._query(partNumber=part_number, uploadId=self._upload_id),
+                    body=part),
+                type=S3RequestType.DEFAULT,
+                credential_provider=self._credential_provider,
+                on_headers=on_headers,
+                on_done=on_done)
+        except BaseException:
+            # on_done will never be called, give back what _upload_parts() took for this part
+            with self._condition:
+                self._in_flight -= 1
+                self._condition.notify_all()
+            self._slots.release()
+            raise
+        with self._condition:
+            if finished:
+                return
+            self._requests[part_number] = request
+            canceled = self._canceled or self._error is not None
+        if canceled:
+            request.cancel()
+
+    def _put_object(self, body):
+        headers = HttpHeaders(self._headers)
+        headers.set('Content-Length', str(len(body)))
+        request = HttpRequest('PUT', self._path, headers, io.BytesIO(body))
+        with self._condition:
+            if self._canceled:
+                raise CancelledError()
+        s3_request = self._client.make_request(
+            request=request,
+            type=S3RequestType.PUT_OBJECT,
+            credential_provider=self._credential_provider)
+        with self._condition:
+            self._requests[0] = s3_request
+            if self._canceled:
+                s3_request.cancel()
+        try:
+            s3_request.finished_future.result()
+        finally:
+            with self._condition:
+                self._requests.pop(0, None)
+        self._bytes_uploaded = len(body)
+
+    def _query(self, **params):
+        return self._path + '?' + urlencode(sorted(params.items()), quote_via=quote)
+
+    def _new_request(self, method, path, headers=None, body=None):
+        headers = HttpHeaders(headers if headers is not None else [('host', self._host)])
+        if body is not None:
+            headers.set('Content-Length', str(len(body)))
+            body = io.BytesIO(body)
+        return HttpRequest(method, path, headers, body)
+
+    def _send_and_wait(self, method, path, headers=None, body=None):
+        # Send a request and wait for it. Returns its response headers and body.
+        response_headers = []
+        response_body = bytearray()
+
+        def on_headers(headers, **kwargs):
+            response_headers.extend(headers)
+
+        def on_body(chunk, **kwargs):
+            response_body.extend(chunk)
+
+        s3_request = self._client.make_request(
+            request=self._new_request(method, path, headers, body),
+            type=S3RequestType.DEFAULT,
+            credential_provider=self._credential_provider,
+            on_headers=on_headers,
+            on_body=on_body)
+        s3_request.finished_future.result()
+        return response_headers, bytes(response_body)
+
+
+class _PartReader:
+    '''
+    Private class to read fixed size parts from a file-like object or an iterable of bytes-like objects.
+    Short reads (ex: from a pipe) are retried until the part is full, or the source ends.
+    '''
+
+    def __init__(self, source):
+        if callable(getattr(source, 'read', None)):
+            self._read = source.read
+            self._chunks = None
+        else:
+            self._read = None
+            self._chunks = iter(source)
+        self._source = source
+        self._leftover = b''
+
+    def skip(self, size):
+        # Skips up to size bytes, seeking past them if possible. Returns how many were skipped.
+        seekable = getattr(self._source, 'seekable', None)
+        if self._read is not None and not self._leftover and callable(seekable) and seekable():
+            position = self._source.tell()
+            end = self._source.seek(0, io.SEEK_END)
+            target = min(position + size, end)
+            self._source.seek(target)
+            return target - position
+        skipped = 0
+        while skipped < size:
+            data = self.read(min(size - skipped, 8 * 1024 * 1024))
+            if not data:
+                break
+            skipped += len(data)
+        return skipped
+
+    def read(self, size):
+        # Returns up to size bytes. Less than size only at the end of the source.
+        if not self._leftover and self._read is not None:
+            # common case: the whole part in one read, without copying it again
+            part = self._read(size)
+            if not part or len(part) == size:
+                return bytes(part) if not isinstance(part, bytes) else part
+            self._leftover = bytes(part)
+        part = bytearray(self._leftover[:size])
+        self._leftover = self._leftover[size:]
+        while len(part) < size:
+            if self._read is not None:
+                data = self._read(size - len(part))
+            else:
+                data = next(self._chunks, b'')
+            if not data:
+                break
+            data = memoryview(data).cast('B')
+            needed = size - len(part)
+            part += data[:needed]
+            if len(data) > needed:
+                self._leftover = bytes(data[needed:])
+        return bytes(part)
+
+
+class _S3Checkpoint:
+    '''
+    Private class holding the state of a resumable transfer, saved as a small JSON file.
+    The file is replaced atomically, so a crash while saving leaves the previous state behind.
+    '''
+    VERSION = 1
+
+    def __init__(self, filepath, state, resumed):
+        self.filepath = filepath
+        self.state = state
+        # True if the state was loaded from an existing file
+        self.resumed = resumed
+        self._lock = threading.Lock()
+
+    @classmethod
+    def load(cls, filepath, kind, host, path):
+        # Returns the checkpoint saved at filepath, or a new one if there's no file yet
+        try:
+            with open(filepath, 'r', encoding='utf-8') as f:
+                state = json.load(f)
+        except FileNotFoundError:
+            return cls(filepath, {'version': cls.VERSION, 'type': kind, 'host': host, 'path': path}, False)
+        if not isinstance(state, dict) or state.get('version') != cls.VERSION:
+            raise ValueError('checkpoint {} is not a valid checkpoint'.format(filepath))
+        if state.get('type') != kind or state.get('host') != host or state.get('path') != path:
+            raise ValueError('checkpoint {} is for a different transfer'.format(filepath))
+        return cls(filepath, state, True)
+
+    def save(self, **changes):
+        with self._lock:
+            self.state.update(changes)
+            temp_filepath = self.filepath + '.tmp'
+            with open(temp_filepath, 'w', encoding='utf-8') as f:
+                json.dump(self.state, f)
+            os.replace(temp_filepath, self.filepath)
+
+    def discard(self):
+        with self._lock:
+            try:
+                os.remove(self.filepath)
+            except FileNotFoundError:
+                pass
+
+
+class _S3DownloadCheckpointer:
+    '''
+    Private class to record the progress of a GET_OBJECT to recv_filepath in a checkpoint, and to resume from it.
+    Only bytes downloaded contiguously from the start of the object count as progress,
+    so parts that finished beyond a gap are downloaded again when resuming.
+    '''
+    SAVE_INTERVAL_SECS = 1.0
+
+    def __init__(self, checkpoint_filepath, request, recv_filepath, on_headers=None, on_part=None, on_done=None):
+        if request.headers.get('Range') is not None:
+            raise ValueError('checkpoint_filepath can not be used with a Range header')
+        self._checkpoint = _S3Checkpoint.load(
+            checkpoint_filepath, 'download', request.headers.get('host'), request.path)
+        self._recv_filepath = recv_filepath
+        self._on_headers_cb = on_headers
+        self._on_part_cb = on_part
+        self._on_done_cb = on_done
+
+        state = self._checkpoint.state
+        # Offset to resume the download from, or 0 to start over
+        self.resume_offset = 0
+        self._bytes_done = 0
+        if self._checkpoint.resumed and state.get('etag') and os.path.exists(recv_filepath):
+            # Always fetch at least the last byte, a range starting past the end would fail
+            self._bytes_done = min(state['bytes_done'], state['object_size'] - 1)
+            if self._bytes_done > 0:
+                request.headers.set('Range', 'bytes={}-'.format(self._bytes_done))
+                request.headers.set('If-Match', state['etag'])
+                self.resume_offset = self._bytes_done
+        if not self.resume_offset:
+            self._bytes_done = 0
+            state.update(etag=None, object_size=None, bytes_done=0)
+
+        # offset -> end of parts that finished beyond self._bytes_done
+        self._part_ends = {}
+        self._last_save = time.monotonic()
+        self._fd = None
+
+    def on_headers(self, status_code, headers, **kwargs):
+        if status_code == 200:
+            etag = None
+            object_size = None
+            for name, value in headers:
+                name = name.lower()
+                if name == 'etag':
+                    etag = value
+                elif name == 'content-length':
+                    object_size = int(value)
+            if etag and object_size is not None:
+                self._save(etag=etag, object_size=object_size)
+        if self._on_headers_cb:
+            self._on_headers_cb(status_code=status_code, headers=headers, **kwargs)
+
+    def on_part(self, part, **kwargs):
+        self._part_ends[part.offset] = part.offset + part.size
+        while self._bytes_done in self._part_ends:
+            self._bytes_done = self._part_ends.pop(self._bytes_done)
+        if time.monotonic() - self._last_save >= self.SAVE_INTERVAL_SECS:
+            try:
+                self._save_progress()
+            except OSError:
+                # don't fail the download over it, progress is saved again on the next part
+                pass
+        if self._on_part_cb:
+            self._on_part_cb(part=part, **kwargs)
+
+    def on_done(self, error=None, **kwargs):
+        try:
+            if error is None:
+                self._checkpoint.discard()
+            else:
+                self._save_progress()
+        except OSError:
+            # the checkpoint is just behind, the download can still be resumed from it
+            pass
+        finally:
+            if self._fd is not None:
+                os.close(self._fd)
+                self._fd = None
+        if self._on_done_cb:
+            self._on_done_cb(error=error, **kwargs)
+
+    def _save_progress(self):
+        if not self._checkpoint.state.get('etag'):
+            # the response never started, there's no progress to save
+            return
+        # Make sure the data is on disk before the checkpoint says it is
+        if self._fd is None:
+            self._fd = os.open(self._recv_filepath, os.O_RDWR)
+        os.fsync(self._fd)
+        self._save(bytes_done=self._bytes_done)
+
+    def _save(self, **changes):
+        self._last_save = time.monotonic()
+        self._checkpoint.save(**changes)
+
+
+class S3BatchItemResult:
+    """Result of transferring one object in an :class:`S3BatchTransfer`.
+
+    Attributes:
+        index (int): Position of the item in the batch's `items`.
+
+        key (str): Object key.
+
+        path (str): Local file path.
+
+        error (Optional[Exception]): None if the object was transferred successfully,
+            or an exception indicating why it failed.
+    """
+    __slots__ = ('index', 'key', 'path', 'error')
+
+    def __init__(self, index, key, path, error=None):
+        self.index = index
+        self.key = key
+        self.path = path
+        self.error = error
+
+    def __repr__(self):
+        return 'S3BatchItemResult(index={}, key={!r}, path={!r}, error={!r})'.format(
+            self.index, self.key, self.path, self.error)
+
+
+class S3BatchTransfer:
+    """Transfer of many objects between S3 and local files.
+    Create a new S3BatchTransfer with :meth:`S3Client.make_batch_transfer()`
+
+    Items are pulled from the iterable lazily, on a background thread,
+    so building the items overlaps with transferring them.
+    At most `max_in_flight` objects are transferred at once.
+
+    Attributes:
+        finished_future (concurrent.futures.Future): Future that will
+            resolve when every item has been transferred or failed.
+            Its result is a list of :class:`S3BatchItemResult`, ordered by index.
+            Failure of an individual item does not fail the Future, check each result's `error`.
+            If pulling the next item from `items` raises, the Future contains that exception.
+            Note: Future will set before on_done invoked
+    """
+    __slots__ = ('_client', '_type', '_host', '_credential_provider', '_on_item_done_cb', '_on_done_cb',
+                 '_finished_future', '_lock', '_slots', '_requests', '_early_done', '_results',
+                 '_in_flight', '_feeding', '_canceled', '_feed_error', '_start_time', '_end_time')
+
+    # Largest interval the native side accepts, so progress is only reported as each object finishes
+    _PROGRESS_INTERVAL_BYTES = 2 ** 64 - 1
+
+    def __init__(
+            self,
+            *,
+            client,
+            type,
+            items,
+            host,
+            max_in_flight=128,
+            credential_provider=None,
+            on_item_done=None,
+            on_done=None):
+        assert isinstance(client, S3Client)
+        assert type in (S3RequestType.GET_OBJECT, S3RequestType.PUT_OBJECT)
+        assert isinstance(host, str)
+        assert callable(on_item_done) or on_item_done is None
+        assert callable(on_done) or on_done is None
+        if max_in_flight < 1:
+            raise ValueError('max_in_flight must be at least 1')
+
+        self._client = client
+        self._type = type
+        self._host = host
+        self._credential_provider = credential_provider
+        self._on_item_done_cb = on_item_done
+        self._on_done_cb = on_done
+
+        self._finished_future = Future()
+        self._lock = threading.Lock()
+        self._slots = threading.BoundedSemaphore(max_in_flight)
+        self._requests = {}
+        self._early_done = set()
+        self._results = []
+        self._in_flight = 0
+        self._feeding = True
+        self._canceled = False
+        self._feed_error = None
+        self._start_time = time.monotonic()
+        self._end_time = None
+
+        threading.Thread(target=self._feed, args=(iter(items),), name='S3BatchTransfer', daemon=True).start()
+
+    @property
+    def finished_future(self):
+        return self._finished_future
+
+    @property
+    def completed_count(self):
+        """int: Number of items that finished, successfully or not"""
+        with self._lock:
+            return len(self._results)
+
+    @property
+    def failed_count(self):
+        """int: Number of items that failed"""
+        with self._lock:
+            return sum(1 for result in self._results if result.error is not None)
+
+    @property
+    def objects_per_second(self):
+        """float: Rate that items have finished at, from the start of the batch until now
+        (or until the batch finished)."""
+        with self._lock:
+            end_time = self._end_time if self._end_time is not None else time.monotonic()
+            elapsed = end_time - self._start_time
+            return len(self._results) / elapsed if elapsed > 0 else 0.0
+
+    def cancel(self):
+        """Stop pulling new items, and cancel the transfers in flight.
+        Items that never started are not reported in the results."""
+        with self._lock:
+            self._canceled = True
+            requests = list(self._requests.values())
+        for request in requests:
+            request.cancel()
+
+    def _feed(self, items):
+        try:
+            index = 0
+            for key, path in items:
+                self._slots.acquire()
+                with self._lock:
+                    if self._canceled:
+                        self._slots.release()
+                        break
+                    self._in_flight += 1
+
+                try:
+                    request = self._make_item_request(index, key, path)
+                except Exception as e:
+                    # the request never started, so the feeder won't be looking for it in _early_done
+                    self._item_finished(S3BatchItemResult(index, key, path, e), started=False)
+                else:
+                    with self._lock:
+                        if index in self._early_done:
+                            self._early_done.discard(index)
+                        else:
+                            self._requests[index] = request
+                index += 1
+        except Exception as e:
+            self._feed_error = e
+
+        with self._lock:
+            self._feeding = False
+            done = self._in_flight == 0
+        if done:
+            self._finish()
+
+    def _make_item_request(self, index, key, path):
+        headers = HttpHeaders([('host', self._host)])
+        recv_filepath = None
+        send_filepath = None
+        if self._type == S3RequestType.PUT_OBJECT:
+            headers.add('Content-Length', str(os.stat(path).st_size))
+            send_filepath = path
+            method = 'PUT'
+        else:
+            recv_filepath = path
+            method = 'GET'
+        request = HttpRequest(method, '/' + quote(key, safe='/~'), headers)
+        # Nothing here needs progress, so it's only reported once, as the object finishes
+        return self._client.make_request(
+            request=request,
+            type=self._type,
+            credential_provider=self._credential_provider,
+            recv_filepath=recv_filepath,
+            send_filepath=send_filepath,
+            progress_interval_bytes=self._PROGRESS_INTERVAL_BYTES,
+            on_done=functools.partial(self._on_item_done, index, key, path))
+
+    def _on_item_done(self, index, key, path, error=None, **kwargs):
+        self._item_finished(S3BatchItemResult(index, key, path, error), started=True)
+
+    def _item_finished(self, result, started):
+        with self._lock:
+            if started and self._requests.pop(result.index, None) is None:
+                # finished before the feeder stored the request
+                self._early_done.add(result.index)
+            self._results.append(result)
+            self._in_flight -= 1
+            done = self._in_flight == 0 and not self._feeding
+        self._slots.release()
+
+        if self._on_item_done_cb:
+            self._on_item_done_cb(result=result)
+        if done:
+            self._finish()
+
+    def _finish(self):
+        with self._lock:
+            self._end_time = time.monotonic()
+            self._early_done.clear()
+            results = sorted(self._results, key=lambda result: result.index)
+        if self._feed_error:
+            self._finished_future.set_exception(self._feed_error)
+        else:
+            self._finished_future.set_result(results)
+        if self._on_done_cb:
+            self._on_done_cb(error=self._feed_error, results=results)
+
+
+def _walk_directory(directory, key_prefix, follow_symlinks):
+    # Lazily yield (path, key, size) for every file under directory.
+    # Files are yielded in key order, which is the order S3 lists keys in.
+    with os.scandir(directory) as it:
+        entries = []
+        for entry in it:
+            if entry.is_dir(follow_symlinks=follow_symlinks):
+                entries.append((key_prefix + entry.name + '/', entry, True))
+            elif entry.is_file(follow_symlinks=follow_symlinks):
+                entries.append((key_prefix + entry.name, entry, False))
+    entries.sort(key=lambda item: item[0].encode('utf-8'))
+    for key, entry, is_dir in entries:
+        if is_dir:
+            yield from _walk_directory(entry.path, key, follow_symlinks)
+        else:
+            yield entry.path, key, entry.stat(follow_symlinks=follow_symlinks).st_size
+
+
+def _skip_unchanged(candidates, part_size, max_workers=4):
+    # Lazily yield (key, path) for each candidate (key, path, size, remote) whose file doesn't match
+    # the remote object (which may be None). Files are hashed on a pool of threads, so comparing
+    # big files doesn't hold up the items behind them. Items that need hashing may be yielded out of order.
+    pending = set()
+
+    def take(futures):
+        for future in futures:
+            pending.discard(future)
+            item = future.result()
+            if item is not None:
+                yield item
+
+    with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='S3CompareETag') as executor:
+        for key, path, size, remote in candidates:
+            if remote is None or remote.size != size:
+                yield key, path
+                continue
+            pending.add(executor.submit(_item_if_changed, key, path, size, remote, part_size))
+            if len(pending) >= 2 * max_workers:
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            else:
+                done = [future for future in pending if future.done()]
+            yield from take(done)
+        while pending:
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            yield from take(done)
+
+
+def _item_if_changed(key, path, size, remote, part_size):
+    return None if _is_unchanged(path, size, remote, part_size) else (key, path)
+
+
+def _is_unchanged(path, size, remote, part_size):
+    # Returns whether the local file matches the remote object's size and ETag
+    if size != remote.size:
+        return False
+    etag = remote.etag
+    if '-' in etag:
+        # multipart ETag is the MD5 of the parts' MD5s, followed by the part count
+        try:
+            num_parts = int(etag.rsplit('-', 1)[1])
+        except ValueError:
+            return False
+        part_size = _guess_part_size(size, num_parts, part_size)
+        if part_size is None:
+            return False
+        return _compute_etag(path, part_size, multipart=True) == etag
+    return _compute_etag(path, size, multipart=False) == etag
+
+
+def _guess_part_size(size, num_parts, part_size):
+    # Find a part size that splits the object into exactly num_parts.
+    # Several sizes usually fit, so try the client's part size first, then sizes that uploaders commonly use.
+    def splits_into(candidate):
+        return candidate > 0 and -(-size // candidate) == num_parts
+
+    mib = 1024 * 1024
+    common_sizes = [part_size, 8 * mib, 5 * mib] + [(1 << shift) * mib for shift in range(4, 13)]
+    for candidate in common_sizes:
+        if candidate and splits_into(candidate):
+            return candidate
+    for candidate_mib in range(max(1, size // num_parts // mib), size // max(num_parts - 1, 1) // mib + 2):
+        if splits_into(candidate_mib * mib):
+            return candidate_mib * mib
+    return None
+
+
+def _compute_etag(path, part_size, multipart):
+    # Compute the ETag S3 would report for this file's content
+    read_size = 1024 * 1024
+    part_digests = []
+    with open(path, 'rb') as f:
+        while True:
+            part_hash = hashlib.md5()
+            remaining = part_size
+            while remaining > 0:
+                data = f.read(min(read_size, remaining))
+                if not data:
+                    break
+                part_hash.update(data)
+                remaining -= len(data)
+            if remaining == part_size and part_digests:
+                break
+            part_digests.append(part_hash.digest())
+            if remaining > 0 or not multipart:
+                break
+    if not multipart:
+        return part_digests[0].hex()
+    return '{}-{}'.format(hashlib.md5(b''.join(part_digests)).hexdigest(), len(part_digests))
+
+
+class _S3ObjectSummary:
+    '''
+    Private class for one entry of a ListObjectsV2 response
+    '''
+    __slots__ = ('key', 'size', 'etag')
+
+    def __init__(self, key, size, etag):
+        self.key = key
+        self.size = size
+        self.etag = etag
+
+
+_S3_XML_NS = '{http://s3.amazonaws.com/doc/2006-03-01/}'
+
+
+class _S3ObjectLister:
+    '''
+    Private iterator over every object under a prefix, using ListObjectsV2.
+    The next page is requested as soon as the current page arrives,
+    so it's in flight while the current page is being consumed.
+    '''
+
+    def __init__(self, client, host, prefix, credential_provider=None):
+        self._client = client
+        self._host = host
+        self._prefix = prefix
+        self._credential_provider = credential_provider
+
+    def __iter__(self):
+        page = self._request_page(None)
+        while page is not None:
+            objects, continuation_token = self._parse_page(page)
+            page = self._request_page(continuation_token) if continuation_token else None
+            yield from objects
+
+    def _request_page(self, continuation_token):
+        query = [('list-type', '2'), ('prefix', self._prefix)]
+        if continuation_token:
+            query.append(('continuation-token', continuation_token))
+        request = HttpRequest('GET', '/?' + urlencode(query, quote_via=quote), HttpHeaders([('host', self._host)]))
+        body = bytearray()
+
+        def on_body(chunk, **kwargs):
+            body.extend(chunk)
+
+        s3_request = self._client.make_request(
+            request=request,
+            type=S3RequestType.DEFAULT,
+            credential_provider=self._credential_provider,
+            on_body=on_body)
+        return s3_request.finished_future, body
+
+    def _parse_page(self, page):
+        finished_future, body = page
+        finished_future.result()
+        root = ElementTree.fromstring(bytes(body))
+        objects = []
+        for contents in root.iter(_S3_XML_NS + 'Contents'):
+            objects.append(_S3ObjectSummary(
+                contents.findtext(_S3_XML_NS + 'Key'),
+                int(contents.findtext(_S3_XML_NS + 'Size')),
+                contents.findtext(_S3_XML_NS + 'ETag', '').strip('"')))
+        continuation_token = None
+        if root.findtext(_S3_XML_NS + 'IsTruncated') == 'true':
+            continuation_token = root.findtext(_S3_XML_NS + 'NextContinuationToken')
+        return objects, continuation_token
+
+
+class _S3ListingIndex:
+    '''
+    Private class that lists a prefix on a background thread, while keys are looked up.
+    S3 lists keys in order, so a key that's not listed by the time
+    the listing has moved past it doesn't exist.
+    Keys must be looked up in that same order, so entries for keys that were passed over can be dropped,
+    and the listing is kept at most MAX_BUFFERED entries ahead of the lookups.
+    '''
+    MAX_BUFFERED = 10000
+
+    def __init__(self, client, host, prefix, credential_provider=None):
+        self._condition = threading.Condition()
+        # (key_bytes, summary) in listing order
+        self._objects = deque()
+        self._done = False
+        self._closed = False
+        self._error = None
+        lister = _S3ObjectLister(client, host, prefix, credential_provider)
+        threading.Thread(target=self._run, args=(lister,), name='S3ListingIndex', daemon=True).start()
+
+    def _run(self, lister):
+        try:
+            for remote in lister:
+                key_bytes = remote.key.encode('utf-8')
+                with self._condition:
+                    self._condition.wait_for(lambda: self._closed or len(self._objects) < self.MAX_BUFFERED)
+                    if self._closed:
+                        break
+                    self._objects.append((key_bytes, remote))
+                    self._condition.notify_all()
+        except Exception as e:
+            self._error = e
+        with self._condition:
+            self._done = True
+            self._condition.notify_all()
+
+    def pop(self, key):
+        # Wait until it's known whether the key exists, then return its summary, or None.
+        # S3 orders keys by their UTF-8 bytes.
+        key_bytes = key.encode('utf-8')
+        with self._condition:
+            while True:
+                # drop the keys we've passed, nothing will look them up again
+                while self._objects and self._objects[0][0] < key_bytes:
+                    self._objects.popleft()
+                    self._condition.notify_all()
+                if self._objects or self._done:
+                    break
+                self._condition.wait()
+            if self._error:
+                raise self._error
+            if self._objects and self._objects[0][0] == key_bytes:
+                return self._objects.popleft()[1]
+            return None
+
+    def close(self):
+        # Stop listing, if the lookups end early
+        with self._condition:
+            self._closed = True
+            self._objects.clear()
+            self._condition.notify_all()
+
+
+class S3RangedRequest:
+    """Download of several byte ranges of one object.
+    Create a new S3RangedRequest with :meth:`S3Client.make_ranged_request()`
+
+    Attributes:
+        finished_future (concurrent.futures.Future): Future that will
+            resolve when every range has been fetched.
+            If a range fails, the Future will contain an exception
+            indicating why it failed, and the remaining ranges are canceled.
+            Note: Future will set before on_done invoked
+
+        fetched_ranges (List[Tuple[int, int]]): The coalesced (offset, length)
+            ranges that are actually requested from S3.
+    """
+    __slots__ = ('_finished_future', '_lock', '_requests', '_remaining', '_error', '_on_done_cb', 'fetched_ranges')
+
+    def __init__(
+            self,
+            *,
+            client,
+            request,
+            ranges,
+            max_coalesce_gap=1024 * 1024,
+            credential_provider=None,
+            on_body=None,
+            on_done=None,
+            reuse_body_buffer=False):
+        assert isinstance(client, S3Client)
+        assert isinstance(request, HttpRequest)
+        assert callable(on_body) or on_body is None
+        assert callable(on_done) or on_done is None
+        if request.headers.get('Range') is not None:
+            raise ValueError('request must not have a Range header, pass the ranges instead')
+        if max_coalesce_gap < 0:
+            raise ValueError('max_coalesce_gap cannot be negative')
+        for offset, length in ranges:
+            if offset < 0 or length <= 0:
+                raise ValueError('invalid range (offset={}, length={})'.format(offset, length))
+
+        self._finished_future = Future()
+        self._lock = threading.Lock()
+        self._error = None
+        self._on_done_cb = on_done
+
+        groups = _coalesce_ranges(ranges, max_coalesce_gap)
+        self.fetched_ranges = [(start, end - start) for start, end, _ in groups]
+        self._remaining = len(groups)
+        self._requests = []
+        if not groups:
+            self._finish()
+            return
+
+        tuning = None
+        try:
+            for start, end, range_indices in groups:
+                headers = HttpHeaders(request.headers)
+                headers.set('Range', 'bytes={}-{}'.format(start, end - 1))
+                group_request = HttpRequest(request.method, request.path, headers)
+                group_client, tuning, _, on_group_done = client._tune(
+                    S3RequestType.GET_OBJECT, group_request, None, end - start, None, self._on_request_done)
+                # The buffer pool isn't used, since one chunk may be handed out for several ranges
+                self._requests.append(S3Request(
+                    client=group_client,
+                    request=group_request,
+                    type=S3RequestType.GET_OBJECT,
+                    credential_provider=credential_provider,
+                    on_body=_RangeDemux(ranges, range_indices, on_body) if on_body else None,
+                    on_done=on_group_done,
+                    region=client._region,
+                    reuse_body_buffer=reuse_body_buffer,
+                    tuning=tuning))
+                tuning = None
+        except BaseException as e:
+            client._untune(tuning, e)
+            # Nobody could cancel or wait for the ranges already started, so cancel them here.
+            # The caller gets the exception instead of on_done.
+            with self._lock:
+                self._remaining -= len(groups) - len(self._requests)
+                if self._error is None:
+                    self._error = e
+                self._on_done_cb = None
+                done = self._remaining == 0
+            self.cancel()
+            if done:
+                self._finish()
+            raise
+
+        with self._lock:
+            failed_early = self._error is not None
+        if failed_early:
+            # a range failed while the others were still being created
+            self.cancel()
+
+    @property
+    def finished_future(self):
+        return self._finished_future
+
+    def cancel(self):
+        """Cancel every range still being fetched"""
+        with self._lock:
+            requests = list(self._requests)
+        for request in requests:
+            request.cancel()
+
+    def _on_request_done(self, error=None, **kwargs):
+        with self._lock:
+            self._remaining -= 1
+            first_error = error is not None and self._error is None
+            if first_error:
+                self._error = error
+            done = self._remaining == 0
+
+        if first_error:
+            self.cancel()
+        if done:
+            self._finish()
+
+    def _finish(self):
+        with self._lock:
+            # drop the requests, so they can shut down
+            self._requests = []
+        if self._error:
+            self._finished_future.set_exception(self._error)
+        else:
+            self._finished_future.set_result(None)
+        if self._on_done_cb:
+            self._on_done_cb(error=self._error)
+
+
+def _coalesce_ranges(ranges, max_gap):
+    # Returns list of [start, end, range_indices], sorted by start, with exclusive end.
+    groups = []
+    for i in sorted(range(len(ranges)), key=lambda i: ranges[i][0]):
+        start, length = ranges[i]
+        end = start + length
+        if groups and start - groups[-1][1] <= max_gap:
+            group = groups[-1]
+            group[1] = max(group[1], end)
+            group[2].append(i)
+        else:
+            groups.append([start, end, [i]])
+    return groups
+
+
+class _RangeDemux:
+    '''
+    Private class to split the body of one coalesced request between the ranges it covers
+    '''
+
+    def __init__(self, ranges, range_indices, on_body):
+        self._ranges = [(i, ranges[i][0], ranges[i][0] + ranges[i][1]) for i in range_indices]
+        self._on_body_cb = on_body
+
+    def __call__(self, chunk, offset, **kwargs):
+        chunk_end = offset + len(chunk)
+        for range_index, range_start, range_end in self._ranges:
+            start = max(offset, range_start)
+            end = min(chunk_end, range_end)
+            if start >= end:
+                continue
+            if start == offset and end == chunk_end:
+                data = chunk
+            else:
+                data = chunk[start - offset:end - offset]
+            self._on_body_cb(chunk=data, offset=start, range_index=range_index)
+
+
+class S3PartMetrics:
+    """Timing data for one part of a download, passed to the `on_part` callback.
+
+    Attributes:
+        offset (int): Offset of the part within the object.
+
+        size (int): Size of the part in bytes.
+
+        elapsed (float): Seconds from making the request until this part was received.
+
+        since_previous (float): Seconds since the previous part was received, or since the
+            response headers arrived for the first part. Parts are received in order, so a
+            large value means this part (or the network) was slow, while values near zero mean
+            the part was already waiting while Python was busy with the previous one.
+    """
+    __slots__ = ('offset', 'size', 'elapsed', 'since_previous')
+
+    def __init__(self, offset, size, elapsed, since_previous):
+        self.offset = offset
+        self.size = size
+        self.elapsed = elapsed
+        self.since_previous = since_previous
+
+    def __repr__(self):
+        return 'S3PartMetrics(offset={}, size={}, elapsed={}, since_previous={})'.format(
+            self.offset, self.size, self.elapsed, self.since_previous)
+
+
+class S3RequestMetrics:
+    """Timing and transfer metrics for one :class:`S3Request`.
+
+    Times are from :func:`time.monotonic()`.
+
+    Attributes:
+        start_time (float): When the request was made.
+
+        time_to_first_byte (Optional[float]): Seconds from making the request until
+            the response headers arrived. None until then.
+
+        end_time (Optional[float]): When the request finished. None until then.
+
+        bytes_transferred (int): Bytes of body sent or received, as of the last progress report.
+
+        parts_received (int): Number of parts of a download received so far.
+            For a download to `recv_filepath` without `on_part`, parts are counted natively
+            (so no part takes the GIL), and only added here as the request finishes.
+
+        max_part_interval (float): Longest time in seconds between receiving
+            consecutive parts (or the headers and the first part).
+            Like `parts_received`, only updated as the request finishes in that case.
+    """
+    __slots__ = ('start_time', 'time_to_first_byte', 'end_time', 'bytes_transferred',
+                 'parts_received', 'max_part_interval', '_last_event_time')
+
+    def __init__(self):
+        self.start_time = time.monotonic()
+        self.time_to_first_byte = None
+        self.end_time = None
+        self.bytes_transferred = 0
+        self.parts_received = 0
+        self.max_part_interval = 0.0
+        self._last_event_time = self.start_time
+
+    @property
+    def duration(self):
+        """Optional[float]: Seconds from making the request until it finished. None until then."""
+        if self.end_time is None:
+            return None
+        return self.end_time - self.start_time
+
+    @property
+    def throughput_gbps(self):
+        """Optional[float]: Average throughput of the whole request in Gbps. None until it finishes."""
+        duration = self.duration
+        if not duration:
+            return None
+        return self.bytes_transferred * 8 / duration / 1e9
+
+    def __repr__(self):
+        return ('S3RequestMetrics(time_to_first_byte={}, duration={}, bytes_transferred={}, '
+                'parts_received={}, max_part_interval={})').format(
+            self.time_to_first_byte, self.duration, self.bytes_transferred,
+            self.parts_received, self.max_part_interval)
+
+    def _on_headers(self):
+        now = time.monotonic()
+        if self.time_to_first_byte is None:
+            self.time_to_first_byte = now - self.start_time
+        self._last_event_time = now
+
+    def _on_part(self, offset, size):
+        now = time.monotonic()
+        since_previous = now - self._last_event_time
+        self._last_event_time = now
+        self.parts_received += 1
+        self.max_part_interval = max(self.max_part_interval, since_previous)
+        return S3PartMetrics(offset, size, now - self.start_time, since_previous)
+
+    def _on_parts_counted(self, count, max_interval):
+        self.parts_received += count
+        self.max_part_interval = max(self.max_part_interval, max_interval)
+
+
+class S3ClientMetrics:
+    """Metrics aggregated over every request made with an :class:`S3Client`.
+    Get a snapshot from :attr:`S3Client.metrics`.
+
+    Attributes:
+        requests_started (int): Number of requests made.
+
+        requests_in_flight (int): Number of requests that haven't finished yet.
+
+        max_requests_in_flight (int): Most requests that were in flight at once.
+
+        requests_succeeded (int): Number of requests that finished successfully.
+
+        requests_failed (int): Number of requests that failed or were canceled.
+
+        bytes_transferred (int): Bytes of body sent or received, by all requests.
+
+        parts_received (int): Number of parts of downloads received, by all requests.
+
+        average_time_to_first_byte (Optional[float]): Average seconds from making a request
+            until its response headers arrived. None if no headers arrived yet.
+    """
+    __slots__ = ('requests_started', 'requests_in_flight', 'max_requests_in_flight', 'requests_succeeded',
+                 'requests_failed', 'bytes_transferred', 'parts_received', 'average_time_to_first_byte')
+
+    def __init__(self):
+        self.requests_started = 0
+        self.requests_in_flight = 0
+        self.max_requests_in_flight = 0
+        self.requests_succeeded = 0
+        self.requests_failed = 0
+        self.bytes_transferred = 0
+        self.parts_received = 0
+        self.average_time_to_first_byte = None
+
+    def __repr__(self):
+        return 'S3ClientMetrics({})'.format(
+            ', '.join('{}={}'.format(name, getattr(self, name)) for name in self.__slots__))
+
+
+class _S3ClientMetricsCollector:
+    '''
+    Private class that aggregates metrics from the requests of a S3Client, from any thread
+    '''
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._metrics = S3ClientMetrics()
+        self._total_time_to_first_byte = 0.0
+        self._time_to_first_byte_count = 0
+
+    def snapshot(self):
+        snapshot = S3ClientMetrics()
+        with self._lock:
+            for name in S3ClientMetrics.__slots__:
+                setattr(snapshot, name, getattr(self._metrics, name))
+            if self._time_to_first_byte_count:
+                snapshot.average_time_to_first_byte = self._total_time_to_first_byte / self._time_to_first_byte_count
+        return snapshot
+
+    def request_started(self):
+        with self._lock:
+            self._metrics.requests_started += 1
+            self._metrics.requests_in_flight += 1
+            self._metrics.max_requests_in_flight = max(
+                self._metrics.max_requests_in_flight, self._metrics.requests_in_flight)
+
+    def add(self, bytes_transferred=0, parts_received=0, time_to_first_byte=None):
+        with self._lock:
+            self._metrics.bytes_transferred += bytes_transferred
+            self._metrics.parts_received += parts_received
+            if time_to_first_byte is not None:
+                self._total_time_to_first_byte += time_to_first_byte
+                self._time_to_first_byte_count += 1
+
+    def request_finished(self, request_metrics, succeeded):
+        request_metrics.end_time = time.monotonic()
+        with self._lock:
+            self._metrics.requests_in_flight -= 1
+            if succeeded:
+                self._metrics.requests_succeeded += 1
+            else:
+                self._metrics.requests_failed += 1
+
+
+class S3TuningDecision:
+    """The part size and throughput target an `adaptive` :class:`S3Client` picked for one request.
+
+    Attributes:
+        object_size (Optional[int]): Size of the object in bytes, or None if it wasn't known.
+
+        part_size (int): Part size the request was split into, in bytes.
+
+        throughput_target_gbps (float): Throughput target of the connections the request used.
+            The client keeps more connections, and so more parts in flight, for a higher target.
+
+        reason (str): Why this part size and throughput target were picked.
+
+        time_to_first_byte (Optional[float]): Seconds from making the request until
+            the response headers arrived. None until then.
+
+        observed_gbps (Optional[float]): Throughput the request achieved, in Gbps.
+            None until the request finishes successfully.
+    """
+    __slots__ = ('object_size', 'part_size', 'throughput_target_gbps', 'reason',
+                 'time_to_first_byte', 'observed_gbps', '_tier', '_start')
+
+    def __init__(self, object_size, part_size, throughput_target_gbps, reason):
+        self.object_size = object_size
+        self.part_size = part_size
+        self.throughput_target_gbps = throughput_target_gbps
+        self.reason = reason
+        self.time_to_first_byte = None
+        self.observed_gbps = None
+        # While the request is in flight: its _S3TuningTier, and (time, in-flight seconds) of the tier when it started
+        self._tier = None
+        self._start = None
+
+    def __repr__(self):
+        return ('S3TuningDecision(object_size={}, part_size={}, throughput_target_gbps={}, reason={!r}, '
+                'time_to_first_byte={}, observed_gbps={})').format(
+            self.object_size, self.part_size, self.throughput_target_gbps, self.reason,
+            self.time_to_first_byte, self.observed_gbps)
+
+
+class _S3AdaptiveTuner:
+    '''
+    Private class that picks part size and throughput target per request, for an adaptive S3Client.
+    aws-c-s3 fixes both for the lifetime of a client, so each part size gets its own client ("tier"),
+    and a tier is replaced by a new client when its throughput target should change.
+    '''
+
+    DEFAULT_PART_SIZE = 8 * 1024 * 1024
+    MAX_PART_SIZE = 256 * 1024 * 1024
+    MIN_THROUGHPUT_TARGET_GBPS = 1.0
+    MAX_THROUGHPUT_TARGET_GBPS = 100.0
+    # Aim for this many parts per object, so huge objects don't take 10,000s of requests
+    TARGET_PARTS_PER_OBJECT = 1000
+    # Only objects with this many parts say anything about the throughput target
+    MIN_PARTS_TO_OBSERVE = 4
+    # Weight of the newest observation in the moving average of throughput
+    OBSERVATION_WEIGHT = 0.3
+    # Each change of target builds a new client, with new connections, so don't change more often than this
+    MIN_SECONDS_BETWEEN_CHANGES = 10.0
+    MAX_RECENT_DECISIONS = 1000
+
+    def __init__(self, client_config, shutdown_tracker, client_metrics, part_size, throughput_target_gbps):
+        # Holds the owning client's config rather than the client itself, so there's no reference cycle
+        self._client_config = client_config
+        self._shutdown_tracker = shutdown_tracker
+        self._client_metrics = client_metrics
+        self._base_part_size = part_size or self.DEFAULT_PART_SIZE
+        self._base_target_gbps = float(throughput_target_gbps or _DEFAULT_THROUGHPUT_TARGET_GBPS)
+        self._lock = threading.Lock()
+        # part_size -> _S3TuningTier
+        self._tiers = {}
+        self._recent_decisions = deque(maxlen=self.MAX_RECENT_DECISIONS)
+        self._clock = time.monotonic
+
+    def recent_decisions(self):
+        with self._lock:
+            return list(self._recent_decisions)
+
+    def clients(self):
+        # The current client of each tier
+        with self._lock:
+            return [tier.client for tier in self._tiers.values()]
+
+    def choose(self, object_size):
+        if object_size is None:
+            decision = S3TuningDecision(None, self._base_part_size, self._base_target_gbps,
+                                        'object size unknown, using client defaults')
+            with self._lock:
+                self._recent_decisions.append(decision)
+            # None means: use the owning client
+            return None, decision
+
+        part_size = self._base_part_size
+        while object_size > part_size * self.TARGET_PARTS_PER_OBJECT and part_size * 2 <= self.MAX_PART_SIZE:
+            part_size *= 2
+
+        with self._lock:
+            now = self._clock()
+            tier = self._tiers.get(part_size)
+            if tier is None:
+                tier = _S3TuningTier(self._new_tier_client(part_size, self._base_target_gbps),
+                                     self._base_target_gbps, 'starting target', now)
+                self._tiers[part_size] = tier
+            reason = 'part size for {} parts per object; throughput target: {}'.format(
+                -(-object_size // part_size), tier.reason)
+            decision = S3TuningDecision(object_size, part_size, tier.target_gbps, reason)
+            decision._tier = tier
+            decision._start = (now, tier.add_in_flight(now, 1))
+            self._recent_decisions.append(decision)
+            return tier.client, decision
+
+    def _new_tier_client(self, part_size, throughput_target_gbps):
+        return _new_child_client(self._client_config, self._shutdown_tracker, self._client_metrics,
+                                 part_size=part_size, throughput_target_gbps=throughput_target_gbps)
+
+    def observe(self, decision, error):
+        # Called once for every decision with a tier, when its request is done, or couldn't be made
+        tier = decision._tier
+        if tier is None:
+            return
+        decision._tier = None
+        start_time, start_in_flight_seconds = decision._start
+        with self._lock:
+            now = self._clock()
+            in_flight_seconds = tier.add_in_flight(now, -1) - start_in_flight_seconds
+        elapsed = now - start_time
+        if error is not None or elapsed <= 0:
+            return
+        decision.observed_gbps = decision.object_size * 8 / elapsed / 1e9
+        if decision.object_size < decision.part_size * self.MIN_PARTS_TO_OBSERVE:
+            return
+
+        # Requests in flight at the same time share the tier's target, so scale this request's throughput
+        # by how many were in flight, on average, while it was
+        tier_gbps = decision.observed_gbps * in_flight_seconds / elapsed
+        with self._lock:
+            if self._tiers.get(decision.part_size) is not tier:
+                # tier already replaced, this observation is stale
+                return
+            if tier.average_gbps is None:
+                tier.average_gbps = tier_gbps
+            else:
+                tier.average_gbps += self.OBSERVATION_WEIGHT * (tier_gbps - tier.average_gbps)
+            if now - tier.created_time < self.MIN_SECONDS_BETWEEN_CHANGES:
+                return
+
+            new_target = None
+            if tier.average_gbps >= 0.8 * tier.target_gbps:
+                new_target = min(tier.target_gbps * 2, self.MAX_THROUGHPUT_TARGET_GBPS)
+                reason = 'raised from {:g} Gbps, requests reached {:.2f} Gbps'
+            elif tier.average_gbps < 0.25 * tier.target_gbps:
+                new_target = max(tier.target_gbps / 2, self.MIN_THROUGHPUT_TARGET_GBPS)
+                reason = 'lowered from {:g} Gbps, requests only reached {:.2f} Gbps'
+            if new_target is None or new_target == tier.target_gbps:
+                return
+
+            # requests in flight keep the old client alive until they finish
+            self._tiers[decision.part_size] = _S3TuningTier(
+                self._new_tier_client(decision.part_size, new_target),
+                new_target,
+                reason.format(tier.target_gbps, tier.average_gbps),
+                now)
+
+
+class _S3TuningTier:
+    '''
+    Private class for the client used for one part size by _S3AdaptiveTuner.
+    Its in-flight request count is integrated over time, so a request can tell how many others it ran alongside.
+    The tuner's lock MUST be held to use it.
+    '''
+    __slots__ = ('client', 'target_gbps', 'reason', 'average_gbps', 'created_time',
+                 'in_flight', 'in_flight_seconds', 'in_flight_since')
+
+    def __init__(self, client, target_gbps, reason, created_time):
+        self.client = client
+        self.target_gbps = target_gbps
+        self.reason = reason
+        self.average_gbps = None
+        self.created_time = created_time
+        self.in_flight = 0
+        self.in_flight_seconds = 0.0
+        self.in_flight_since = created_time
+
+    def add_in_flight(self, now, count):
+        # Returns the in-flight seconds so far, including requests in flight until now
+        self.in_flight_seconds += self.in_flight * (now - self.in_flight_since)
+        self.in_flight_since = now
+        self.in_flight += count
+        return self.in_flight_seconds
+
+
+class _S3CpuGroupPlacement:
+    '''
+    Private class that spreads requests over the clients for each of a S3Client's cpu_groups.
+    Each request goes to the client with the fewest requests in flight, taking turns when they're tied.
+    '''
+
+    def __init__(self, clients):
+        # None stands for the owning client (which runs on the first group), so there's no reference cycle
+        self._clients = [None] + clients
+        self._in_flight = [0] * len(self._clients)
+        self._next = 0
+        self._lock = threading.Lock()
+
+    def choose(self, on_done):
+        # Returns the client to use (None for the owning client), and on_done wrapped to count the request
+        with self._lock:
+            count = len(self._clients)
+            order = [(self._next + i) % count for i in range(count)]
+            index = min(order, key=self._in_flight.__getitem__)
+            self._in_flight[index] += 1
+            self._next = (index + 1) % count
+
+        def on_done_placed(**kwargs):
+            with self._lock:
+                self._in_flight[index] -= 1
+            if on_done:
+                on_done(**kwargs)
+
+        return self._clients[index], on_done_placed
+
+    def clients(self):
+        # The clients for each group but the first, which is the owning client
+        return self._clients[1:]
+
+
+class _S3PriorityScheduler:
+    '''
+    Private class that decides when the requests of a S3Client with priority_weights are sent.
+    At most max_in_flight are in flight, the rest wait for their turn. Each time one finishes, the next one is
+    picked by smooth weighted round-robin over the priorities with requests waiting: each of those priorities
+    earns its weight in credit, the one with the most credit goes, and pays back the weight of them all.
+    So under contention, each priority gets turns in proportion to its weight, evenly spread out.
+    '''
+
+    def __init__(self, weights, max_in_flight):
+        # highest priority first, so it wins ties
+        self._weights = {priority: weights[priority] for priority in sorted(weights, reverse=True)}
+        self._max_in_flight = max_in_flight
+        self._lock = threading.Lock()
+        self._in_flight = 0
+        self._waiting = {priority: deque() for priority in self._weights}
+        self._credit = dict.fromkeys(self._weights, 0.0)
+
+    def submit(self, priority, start, fail):
+        # If there's room, calls start() to send the request now, and returns None. start() may raise.
+        # Otherwise the request waits for its turn, and the entry it waits as is returned, for send_now().
+        # If start() raises when the turn comes, fail(error) reports it, and MUST call finished().
+        entry = (start, fail)
+        with self._lock:
+            if self._in_flight >= self._max_in_flight:
+                self._waiting[priority].append(entry)
+                return entry
+            self._in_flight += 1
+        try:
+            start()
+        except BaseException:
+            self.finished()
+            raise
+        return None
+
+    def send_now(self, entry):
+        # Sends a waiting request without waiting for its turn (ex: it was cancelled).
+        # Returns False if its turn already came.
+        with self._lock:
+            for waiting in self._waiting.values():
+                if entry in waiting:
+                    waiting.remove(entry)
+                    break
+            else:
+                return False
+            self._in_flight += 1
+        self._send(entry)
+        return True
+
+    def finished(self):
+        # A request that was sent has finished, its turn goes to the next request waiting
+        with self._lock:
+            entry = self._next()
+            if entry is None:
+                self._in_flight -= 1
+                return
+        self._send(entry)
+
+    def _send(self, entry):
+        start, fail = entry
+        try:
+            start()
+        except Exception as e:
+            fail(e)
+
+    def _next(self):
+        chosen = None
+        total_weight = 0.0
+        for priority, waiting in self._waiting.items():
+            if not waiting:
+                # credit isn't saved up while there's nothing waiting
+                self._credit[priority] = 0.0
+                continue
+            self._credit[priority] += self._weights[priority]
+            total_weight += self._weights[priority]
+            if chosen is None or self._credit[priority] > self._credit[chosen]:
+                chosen = priority
+        if chosen is None:
+            return None
+        self._credit[chosen] -= total_weight
+        return self._waiting[chosen].popleft()
+
+
+class _S3WarmUp:
+    '''
+    Private class that tracks the requests sent by S3Client.warm_up(), and keeps them alive until they're done
+    '''
+
+    def __init__(self, count):
+        self.finished_future = Future()
+        self._lock = threading.Lock()
+        self._count = count
+        self._started = 0
+        self._remaining = count
+        self._requests = []
+        self._error = None
+        if count == 0:
+            self.finished_future.set_result(None)
+
+    def add(self, s3_request):
+        with self._lock:
+            self._started += 1
+            if self._remaining:
+                self._requests.append(s3_request)
+
+    def fail_to_start(self, error):
+        # A request couldn't be made, so the rest never will be. Nobody can cancel or wait for
+        # the ones already started, so cancel them here. The caller gets the exception instead of the Future.
+        with self._lock:
+            self._remaining -= self._count - self._started
+            if self._error is None:
+                self._error = error
+            requests = list(self._requests)
+            done = self._remaining == 0
+        for s3_request in requests:
+            s3_request.cancel()
+        if done:
+            self._finish()
+
+    def on_done(self, error=None, error_headers=None, **kwargs):
+        with self._lock:
+            # An error response still means the connection was made
+            if error is not None and error_headers is None and self._error is None:
+                self._error = error
+            self._remaining -= 1
+            if self._remaining:
+                return
+        self._finish()
+
+    def _finish(self):
+        with self._lock:
+            # break the cycle of requests referencing this, through their callbacks
+            self._requests = []
+            error = self._error
+        if error is None:
+            self.finished_future.set_result(None)
+        else:
+            self.finished_future.set_exception(error)
+
+
+def _new_child_client(client_config, shutdown_tracker, client_metrics, **kwargs):
+    # A S3Client with the same configuration as its owner, whose shutdown_event also waits for this one,
+    # and whose metrics include requests made with this one
+    child_client = S3Client(**kwargs, **client_config)
+    shutdown_tracker.acquire()
+    child_client._shutdown_tracker.chain(shutdown_tracker)
+    child_client._metrics = client_metrics
+    return child_client
+
+
+def _new_pinned_bootstrap(cpu_group):
+    event_loop_group = EventLoopGroup(cpu_group=cpu_group)
+    host_resolver = DefaultHostResolver(event_loop_group)
+    return ClientBootstrap(event_loop_group, host_resolver)
+
+
+class _ShutdownTracker:
+    '''
+    Private class that sets an event once every native client that a S3Client owns has shut down
+    '''
+
+    def __init__(self, shutdown_event):
+        self._lock = threading.Lock()
+        self._count = 1
+        self._shutdown_event = shutdown_event
+        self._parent = None
+
+    def acquire(self):
+        with self._lock:
+            self._count += 1
+
+    def chain(self, parent):
+        # Release parent too, once this tracker is done
+        self._parent = parent
+
+    def release(self):
+        with self._lock:
+            self._count -= 1
+            done = self._count == 0
+        if done:
+            self._shutdown_event.set()
+            if self._parent:
+                self._parent.release()
+
+
+class _S3ClientCore:
+    '''
+    Private class to keep all the related Python object alive until C land clean up for S3Client
+    '''
+
+    def __init__(self, bootstrap,
+                 credential_provider=None,
+                 tls_connection_options=None):
+        self._bootstrap = bootstrap
+        self._credential_provider = credential_provider
+        self._tls_connection_options = tls_connection_options
+
+
+class _S3RequestCore:
+    '''
+    Private class to keep all the related Python object alive until C land clean up for S3Request
+    '''
 
     def __init__(
             self,
@@ -336,10 +3348,18 @@ class _S3RequestCore:
             on_headers=None,
             on_body=None,
             on_done=None,
-            on_progress=None):
+            on_progress=None,
+            buffer_pool=None,
+            metrics=None,
+            client_metrics=None,
+            on_part=None):
 
         self._request = request
         self._credential_provider = credential_provider
+        self._buffer_pool = buffer_pool
+        self._metrics = metrics
+        self._client_metrics = client_metrics
+        self._on_part_cb = on_part
 
         self._on_headers_cb = on_headers
         self._on_body_cb = on_body
@@ -350,17 +3370,64 @@ class _S3RequestCore:
         self._shutdown_event = shutdown_event
 
     def _on_headers(self, status_code, headers):
+        if self._metrics is not None:
+            first = self._metrics.time_to_first_byte is None
+            self._metrics._on_headers()
+            if first:
+                self._client_metrics.add(time_to_first_byte=self._metrics.time_to_first_byte)
         if self._on_headers_cb:
             self._on_headers_cb(status_code=status_code, headers=headers)
 
+    def _on_part(self, offset, size):
+        # Each delivery of body from C is one part
+        if self._metrics is not None:
+            part = self._metrics._on_part(offset, size)
+            self._client_metrics.add(parts_received=1)
+            if self._on_part_cb:
+                self._on_part_cb(part=part)
+
+    def _on_parts_counted(self, count, max_interval_ns):
+        # Parts written to recv_filepath, when nobody wanted to hear about each one
+        if self._metrics is not None:
+            self._metrics._on_parts_counted(count, max_interval_ns / 1e9)
+            self._client_metrics.add(parts_received=count)
+
     def _on_body(self, chunk, offset):
+        self._on_part(offset, len(chunk))
         if self._on_body_cb:
-            self._on_body_cb(chunk=chunk, offset=offset)
+            self._on_body_cb(chunk=chunk, offset=offset, buffer=None)
+
+    def _acquire_pool_buffer(self):
+        # With a buffer pool, C copies the body into the view returned here. None if the pool is empty.
+        try:
+            # this is an event-loop thread, never wait for a buffer
+            return self._buffer_pool.acquire(timeout=0)[1]
+        except TimeoutError:
+            return None
+
+    def _on_body_pooled(self, view, size, offset):
+        # C copied size bytes of body into the start of view, from _acquire_pool_buffer()
+        try:
+            self._on_body_cb(chunk=view[:size], offset=offset, buffer=view.obj)
+        except BaseException:
+            # the callback may have released it before raising
+            self._buffer_pool._release(view)
+            raise
+
+    def _on_body_unpooled(self, chunk, offset):
+        # The pool was empty, so C delivers the rest of the part as bytes
+        self._on_body_cb(chunk=chunk, offset=offset, buffer=None)
+
+    def _release_pool_buffer(self, view):
+        self._buffer_pool._release(view)
 
     def _on_shutdown(self):
         self._shutdown_event.set()
 
-    def _on_finish(self, error_code, error_headers, error_body):
+    def _on_finish(self, error_code, error_headers, error_body, did_validate_checksum,
+                   checksum_validation_algorithm, object_checksum):
+        if self._metrics is not None:
+            self._client_metrics.request_finished(self._metrics, succeeded=not error_code)
         error = None
         if error_code:
             error = awscrt.exceptions.from_code(error_code)
@@ -372,8 +3439,33 @@ class _S3RequestCore:
         else:
             self._finished_future.set_result(None)
         if self._on_done_cb:
-            self._on_done_cb(error=error, error_headers=error_headers, error_body=error_body)
+            self._on_done_cb(
+                error=error,
+                error_headers=error_headers,
+                error_body=error_body,
+                did_validate_checksum=did_validate_checksum,
+                checksum_validation_algorithm=S3ChecksumAlgorithm(
+                    checksum_validation_algorithm) if did_validate_checksum else None,
+                object_checksum=object_checksum)
+
+    def _on_failed_to_start(self, error):
+        # The request waited for its turn, and couldn't be sent when it came, so C never knew about it
+        if self._metrics is not None:
+            self._client_metrics.request_finished(self._metrics, succeeded=False)
+        self._finished_future.set_exception(error)
+        if self._on_done_cb:
+            self._on_done_cb(
+                error=error,
+                error_headers=None,
+                error_body=None,
+                did_validate_checksum=False,
+                checksum_validation_algorithm=None,
+                object_checksum=None)
+        self._shutdown_event.set()
 
     def _on_progress(self, progress):
+        if self._metrics is not None:
+            self._metrics.bytes_transferred += progress
+            self._client_metrics.add(bytes_transferred=progress)
         if self._on_progress_cb:
             self._on_progress_cb(progress)
@@ -0,0 +1,239 @@
+"""
+Throughput benchmark suite for awscrt.s3.S3Client.
+
+Measures throughput, CPU time per GB, and peak RSS of S3Client uploads and downloads,
+across part sizes and concurrency levels. By default it runs offline, against an
+in-process S3 stand-in, so it can catch performance regressions in CI:
+
+    python s3_benchmark_suite.py --object-size 256MiB --part-sizes 8MiB,16MiB --concurrency 1,4 \\
+        --output results.json --baseline previous-results.json
+
+Each case runs in its own process, so its CPU time and peak RSS are the client's alone
+(the stand-in runs in the parent process). The stand-in is written in Python, so throughput
+against it is far below what real S3 sustains: compare runs against each other, not against S3.
+Pass --bucket and --region to run against real S3.
+"""
+
+# Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.
+# SPDX-License-Identifier: Apache-2.0.
+
+import argparse
+import io
+import json
+import subprocess
+import sys
+import threading
+import time
+
+GB = 1000 * 1000 * 1000
+SIZE_SUFFIXES = {'KiB': 1024, 'MiB': 1024 ** 2, 'GiB': 1024 ** 3, 'KB': 1000, 'MB': 1000 ** 2, 'GB': 1000 ** 3}
+
+
+def parse_size(text):
+    for suffix, multiplier in SIZE_SUFFIXES.items():
+        if text.endswith(suffix):
+            return int(float(text[:-len(suffix)]) * multiplier)
+    return int(text)
+
+
+def parse_list(text, parse):
+    return [parse(item) for item in text.split(',') if item]
+
+
+def peak_rss_bytes():
+    try:
+        import resource
+    except ImportError:
+        # not available on Windows
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # kilobytes on Linux, bytes on macOS
+    return peak if sys.platform == 'darwin' else peak * 1024
+
+
+def run_case(case):
+    """Run one case in this process and return its measurements"""
+    from awscrt.http import HttpHeaders, HttpRequest
+    from awscrt.s3 import S3Client, S3RequestTlsMode, S3RequestType
+
+    client_kwargs = dict(
+        bootstrap=None,
+        region=case['region'],
+        part_size=case['part_size'],
+        throughput_target_gbps=case['throughput_target_gbps'])
+    if case['local']:
+        client_kwargs['tls_mode'] = S3RequestTlsMode.DISABLED
+    else:
+        from awscrt.auth import AwsCredentialsProvider
+        from awscrt.io import ClientBootstrap
+        client_kwargs['credential_provider'] = AwsCredentialsProvider.new_default_chain(
+            ClientBootstrap.get_or_create_static_default())
+    s3_client = S3Client(**client_kwargs)
+
+    object_size = case['object_size']
+    upload_body = bytes(object_size) if case['operation'] == 'upload' else None
+    received = [0]
+    lock = threading.Lock()
+
+    def on_body(chunk, **kwargs):
+        with lock:
+            received[0] += len(chunk)
+
+    def new_request(i):
+        headers = HttpHeaders([('host', case['host'])])
+        if case['operation'] == 'upload':
+            headers.set('Content-Length', str(object_size))
+            return HttpRequest('PUT', '{}-{}'.format(case['key'], i), headers, io.BytesIO(upload_body))
+        return HttpRequest('GET', case['key'], headers)
+
+    start_cpu = time.process_time()
+    start_time = time.perf_counter()
+    s3_requests = []
+    for i in range(case['concurrency']):
+        if case['operation'] == 'upload':
+            s3_requests.append(s3_client.make_request(
+                request=new_request(i), type=S3RequestType.PUT_OBJECT))
+        else:
+            s3_requests.append(s3_client.make_request(
+                request=new_request(i), type=S3RequestType.GET_OBJECT, on_body=on_body, reuse_body_buffer=True))
+    failed = 0
+    for s3_request in s3_requests:
+        try:
+            s3_request.finished_future.result()
+        except Exception:
+            failed += 1
+    elapsed = time.perf_counter() - start_time
+    cpu = time.process_time() - start_cpu
+
+    total_bytes = object_size * (case['concurrency'] - failed)
+    return {
+        'seconds': elapsed,
+        'gbps': total_bytes * 8 / GB / elapsed if elapsed else 0.0,
+        'cpu_seconds_per_gb': cpu / (total_bytes / GB) if total_bytes else None,
+        'peak_rss_bytes': peak_rss_bytes(),
+        'failed': failed,
+    }
+
+
+def run_case_in_subprocess(case):
+    result = subprocess.run(
+        [sys.executable, __file__, '--run-case', json.dumps(case)],
+        stdout=subprocess.PIPE, check=True)
+    return json.loads(result.stdout.decode().splitlines()[-1])
+
+
+def compare_to_baseline(results, baseline, tolerance):
+    """Returns descriptions of cases whose throughput dropped more than `tolerance` below the baseline"""
+    def case_key(result):
+        case = result['case']
+        return (case['operation'], case['part_size'], case['concurrency'])
+
+    baseline_by_case = {case_key(result): result for result in baseline}
+    regressions = []
+    for result in results:
+        previous = baseline_by_case.get(case_key(result))
+        if previous is None or not previous['gbps']:
+            continue
+        if result['gbps'] < previous['gbps'] * (1.0 - tolerance):
+            regressions.append('{} part_size={} concurrency={}: {:.2f} Gbps, was {:.2f} Gbps'.format(
+                *case_key(result), result['gbps'], previous['gbps']))
+    return regressions
+
+
+def format_row(result):
+    case = result['case']
+    peak_rss = result['peak_rss_bytes']
+    cpu_per_gb = result['cpu_seconds_per_gb']
+    return '{:<9}{:>12}{:>13}{:>10.2f}{:>14}{:>15}{:>8}'.format(
+        case['operation'],
+        case['part_size'] // (1024 * 1024),
+        case['concurrency'],
+        result['gbps'],
+        '{:.3f}'.format(cpu_per_gb) if cpu_per_gb is not None else '-',
+        '{:.0f}'.format(peak_rss / (1024 * 1024)) if peak_rss is not None else '-',
+        result['failed'])
+
+
+def main():
+    parser = argparse.ArgumentParser(description='S3Client throughput benchmark suite')
+    parser.add_argument('--operations', default='download,upload',
+                        help='comma separated: download, upload (default: %(default)s)')
+    parser.add_argument('--object-size', default='128MiB', help='size of each object (default: %(default)s)')
+    parser.add_argument('--part-sizes', default='8MiB,16MiB',
+                        help='comma separated part sizes (default: %(default)s)')
+    parser.add_argument('--concurrency', default='1,4',
+                        help='comma separated numbers of requests in flight at once (default: %(default)s)')
+    parser.add_argument('--throughput-target-gbps', type=float, default=10.0,
+                        help="client's throughput target (default: %(default)s)")
+    parser.add_argument('--latency', type=float, default=0.0,
+                        help='seconds the stand-in waits before each response (default: %(default)s)')
+    parser.add_argument('--error-rate', type=float, default=0.0,
+                        help='fraction of stand-in responses that are a 503 SlowDown (default: %(default)s)')
+    parser.add_argument('--bucket', help='benchmark against this real S3 bucket, instead of the stand-in')
+    parser.add_argument('--region', default='us-west-2', help='region of --bucket (default: %(default)s)')
+    parser.add_argument('--key', default='/s3_benchmark_suite_object',
+                        help='key of the object to download, and prefix of the uploaded objects')
+    parser.add_argument('--output', help='write the results to this JSON file')
+    parser.add_argument('--baseline', help='JSON file from a previous --output, to compare throughput against')
+    parser.add_argument('--tolerance', type=float, default=0.2,
+                        help='fail if throughput drops more than this fraction below --baseline (default: %(default)s)')
+    parser.add_argument('--run-case', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.run_case:
+        print(json.dumps(run_case(json.loads(args.run_case))))
+        return 0
+
+    object_size = parse_size(args.object_size)
+    stand_in = None
+    if args.bucket:
+        host = '{}.s3.{}.amazonaws.com'.format(args.bucket, args.region)
+    else:
+        from test.s3_stand_in import S3StandIn
+        stand_in = S3StandIn(latency=args.latency, error_rate=args.error_rate, seed=0).start()
+        stand_in.put_object(args.key, bytes(object_size))
+        host = stand_in.endpoint
+
+    results = []
+    print('{:<9}{:>12}{:>13}{:>10}{:>14}{:>15}{:>8}'.format(
+        'op', 'part (MiB)', 'concurrency', 'Gbps', 'CPU s/GB', 'peak RSS (MiB)', 'failed'))
+    try:
+        for operation in parse_list(args.operations, str):
+            for part_size in parse_list(args.part_sizes, parse_size):
+                for concurrency in parse_list(args.concurrency, int):
+                    case = {
+                        'operation': operation,
+                        'object_size': object_size,
+                        'part_size': part_size,
+                        'concurrency': concurrency,
+                        'throughput_target_gbps': args.throughput_target_gbps,
+                        'host': host,
+                        'key': args.key,
+                        'region': args.region,
+                        'local': stand_in is not None,
+                    }
+                    result = run_case_in_subprocess(case)
+                    result['case'] = case
+                    results.append(result)
+                    print(format_row(result))
+                    sys.stdout.flush()
+    finally:
+        if stand_in is not None:
+            stand_in.close()
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(results, f, indent=2)
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            regressions = compare_to_baseline(results, json.load(f), args.tolerance)
+        for regression in regressions:
+            print('REGRESSION:', regression)
+        if regressions:
+            return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -36,10 +36,56 @@ PyObject *aws_py_http_connection_is_open(PyObject *self, PyObject *args);
  */
 PyObject *aws_py_http_client_connection_new(PyObject *self, PyObject *args);
 
+/**
+ * Change local HTTP/2 settings. The on_complete callback is invoked once the peer acknowledges them.
+ */
+PyObject *aws_py_http2_connection_change_settings(PyObject *self, PyObject *args);
+
+/**
+ * Send HTTP/2 PING. The on_complete callback is invoked with the round-trip time once the peer replies.
+ */
+PyObject *aws_py_http2_connection_ping(PyObject *self, PyObject *args);
+
+/**
+ * Increment the HTTP/2 connection's flow-control window.
+ */
+PyObject *aws_py_http2_connection_update_window(PyObject *self, PyObject *args);
+
+/**
+ * Returns local or remote HTTP/2 settings, as a list of (id, value) tuples.
+ */
+PyObject *aws_py_http2_connection_get_settings(PyObject *self, PyObject *args);
+
+/**
+ * Create a new connection manager (connection pool), returns capsule.
+ */
+PyObject *aws_py_http_connection_manager_new(PyObject *self, PyObject *args);
+
+/**
+ * Acquire a connection from the manager. returns void. The on_setup callback will be invoked
+ * upon either success or failure, just like connections made with aws_py_http_client_connection_new().
+ */
+PyObject *aws_py_http_connection_manager_acquire_connection(PyObject *self, PyObject *args);
+
+/**
+ * Release a connection back to the manager it was acquired from.
+ */
+PyObject *aws_py_http_connection_manager_release_connection(PyObject *self, PyObject *args);
+
+/**
+ * Returns (idle, leased, pending) connection counts.
+ */
+PyObject *aws_py_http_connection_manager_fetch_metrics(PyObject *self, PyObject *args);
+
 PyObject *aws_py_http_client_stream_new(PyObject *self, PyObject *args);
 
 PyObject *aws_py_http_client_stream_activate(PyObject *self, PyObject *args);
 
+/**
+ * Increment the stream's flow-control window.
+ */
+PyObject *aws_py_http_stream_update_window(PyObject *self, PyObject *args);
+
 /* Create capsule around new request-style aws_http_message struct */
 PyObject *aws_py_http_message_new_request(PyObject *self, PyObject *args);
 
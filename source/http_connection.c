@@ -8,17 +8,21 @@
 
 #include <aws/common/array_list.h>
 #include <aws/http/connection.h>
+#include <aws/http/connection_manager.h>
 #include <aws/http/proxy.h>
 #include <aws/http/request_response.h>
 #include <aws/io/socket.h>
 
 static const char *s_capsule_name_http_connection = "aws_http_connection";
+static const char *s_capsule_name_http_connection_manager = "aws_http_connection_manager";
 
 /**
  * Lifetime notes:
  * - If connect() reports immediate failure, binding can be destroyed.
  * - If on_connection_setup reports failure, binding can be destroyed.
  * - Otherwise, binding cannot be destroyed until BOTH release() has been called AND on_connection_shutdown has fired.
+ * - If the connection was acquired from a connection manager, on_connection_shutdown never fires
+ *   (the manager owns the connection's shutdown), so binding is destroyed as soon as release() is called.
  */
 struct http_connection_binding {
     struct aws_http_connection *native;
@@ -32,16 +36,29 @@ struct http_connection_binding {
     /* Shutdown callback, reference cleared after setting result */
     PyObject *on_shutdown;
 
+    /* If true, connection setup fails unless HTTP/2 is negotiated */
+    bool expect_http2;
+
+    /* HTTP/2 remote settings callback, may be NULL */
+    PyObject *on_remote_settings_changed;
+
+    /* Manager this connection was acquired from, NULL if connection was made with connect().
+     * native is set NULL once the connection is released back to its manager. */
+    struct aws_http_connection_manager *manager;
+
     /* Dependencies that must outlive this */
     PyObject *bootstrap;
     PyObject *tls_ctx;
+    PyObject *manager_capsule;
 };
 
 static void s_connection_destroy(struct http_connection_binding *connection) {
     Py_XDECREF(connection->on_setup);
     Py_XDECREF(connection->on_shutdown);
+    Py_XDECREF(connection->on_remote_settings_changed);
     Py_XDECREF(connection->bootstrap);
     Py_XDECREF(connection->tls_ctx);
+    Py_XDECREF(connection->manager_capsule);
 
     aws_mem_release(aws_py_get_allocator(), connection);
 }
@@ -55,6 +72,15 @@ static void s_connection_release(struct http_connection_binding *connection) {
     AWS_FATAL_ASSERT(!connection->release_called);
     connection->release_called = true;
 
+    if (connection->manager) {
+        /* Return connection to its manager, unless that was already done explicitly */
+        if (connection->native) {
+            aws_http_connection_manager_release_connection(connection->manager, connection->native);
+        }
+        s_connection_destroy(connection);
+        return;
+    }
+
     bool destroy_after_release = connection->shutdown_called;
 
     aws_http_connection_release(connection->native);
@@ -119,11 +145,16 @@ static void s_on_client_connection_setup(
     /* If setup was successful, encapsulate binding so we can pass it to python */
     PyObject *capsule = NULL;
     if (!error_code) {
-        capsule = PyCapsule_New(connection, s_capsule_name_http_connection, s_connection_capsule_destructor);
-        if (!capsule) {
-            error_code = AWS_ERROR_UNKNOWN;
-        }
         http_version = aws_http_connection_get_version(native_connection);
+        if (connection->expect_http2 && http_version != AWS_HTTP_VERSION_2) {
+            /* Peer didn't agree to HTTP/2, connection is released below */
+            error_code = AWS_ERROR_HTTP_UNSUPPORTED_PROTOCOL;
+        } else {
+            capsule = PyCapsule_New(connection, s_capsule_name_http_connection, s_connection_capsule_destructor);
+            if (!capsule) {
+                error_code = AWS_ERROR_UNKNOWN;
+            }
+        }
     }
 
     /* Invoke on_setup, then clear our reference to it */
@@ -153,6 +184,112 @@ static void s_on_client_connection_setup(
     PyGILState_Release(state);
 }
 
+/**
+ * Init array of aws_http2_setting from python sequence of (id, value) tuples, or None.
+ * Returns false and sets python exception if error occurred.
+ * On success, caller must release the array (which is NULL if there were no settings).
+ */
+static bool s_http2_settings_init(PyObject *settings_py, struct aws_http2_setting **out_array, size_t *out_count) {
+    struct aws_allocator *allocator = aws_py_get_allocator();
+    *out_array = NULL;
+    *out_count = 0;
+
+    if (settings_py == Py_None) {
+        return true;
+    }
+
+    PyObject *sequence = PySequence_Fast(settings_py, "Expected sequence of (id, value) tuples");
+    if (!sequence) {
+        return false;
+    }
+
+    bool success = false;
+    Py_ssize_t count = PySequence_Fast_GET_SIZE(sequence);
+    if (count > 0) {
+        *out_array = aws_mem_calloc(allocator, (size_t)count, sizeof(struct aws_http2_setting));
+        if (!*out_array) {
+            PyErr_SetAwsLastError();
+            goto done;
+        }
+    }
+
+    for (Py_ssize_t i = 0; i < count; ++i) {
+        int id;
+        unsigned long long value;
+        if (!PyArg_ParseTuple(PySequence_Fast_GET_ITEM(sequence, i), "iK", &id, &value)) {
+            goto done;
+        }
+
+        if (value > UINT32_MAX) {
+            PyErr_SetString(PyExc_OverflowError, "HTTP/2 setting value must fit in 32 bits");
+            goto done;
+        }
+
+        (*out_array)[i].id = id;
+        (*out_array)[i].value = (uint32_t)value;
+    }
+
+    *out_count = (size_t)count;
+    success = true;
+
+done:
+    Py_DECREF(sequence);
+    if (!success) {
+        aws_mem_release(allocator, *out_array);
+        *out_array = NULL;
+    }
+    return success;
+}
+
+/* Returns new python list of (id, value) tuples, or NULL with python exception set */
+static PyObject *s_http2_settings_to_list(const struct aws_http2_setting *settings, size_t count) {
+    PyObject *list = PyList_New((Py_ssize_t)count);
+    if (!list) {
+        return NULL;
+    }
+
+    for (size_t i = 0; i < count; ++i) {
+        PyObject *tuple = Py_BuildValue("(iI)", (int)settings[i].id, (unsigned int)settings[i].value);
+        if (!tuple) {
+            Py_DECREF(list);
+            return NULL;
+        }
+        PyList_SET_ITEM(list, (Py_ssize_t)i, tuple); /* steals reference to tuple */
+    }
+
+    return list;
+}
+
+static void s_on_remote_settings_change(
+    struct aws_http_connection *native_connection,
+    const struct aws_http2_setting *settings_array,
+    size_t num_settings,
+    void *user_data) {
+
+    (void)native_connection;
+    struct http_connection_binding *connection = user_data;
+
+    PyGILState_STATE state;
+    if (aws_py_gilstate_ensure(&state)) {
+        return; /* Python has shut down. Nothing matters anymore, but don't crash */
+    }
+
+    PyObject *settings_list = s_http2_settings_to_list(settings_array, num_settings);
+    if (settings_list) {
+        PyObject *result = PyObject_CallFunction(connection->on_remote_settings_changed, "(O)", settings_list);
+        if (result) {
+            Py_DECREF(result);
+        } else {
+            PyErr_WriteUnraisable(PyErr_Occurred());
+        }
+        Py_DECREF(settings_list);
+    } else {
+        PyErr_WriteUnraisable(PyErr_Occurred());
+    }
+
+    PyGILState_Release(state);
+}
+
 PyObject *aws_py_http_client_connection_new(PyObject *self, PyObject *args) {
     (void)self;
 
@@ -167,10 +304,16 @@ PyObject *aws_py_http_client_connection_new(PyObject *self, PyObject *args) {
     PyObject *socket_options_py;
     PyObject *tls_options_py;
     PyObject *proxy_options_py;
+    int manual_window_management;
+    unsigned long long initial_window_size;
+    int expect_http2;
+    int prior_knowledge_http2;
+    PyObject *initial_settings_py;
+    PyObject *on_remote_settings_changed_py;
 
     if (!PyArg_ParseTuple(
             args,
-            "OOOs#HOOO",
+            "OOOs#HOOOpKppOO",
             &bootstrap_py,
             &on_connection_setup_py,
             &on_shutdown_py,
@@ -179,7 +322,13 @@ PyObject *aws_py_http_client_connection_new(PyObject *self, PyObject *args) {
             &port_number,
             &socket_options_py,
             &tls_options_py,
-            &proxy_options_py)) {
+            &proxy_options_py,
+            &manual_window_management,
+            &initial_window_size,
+            &expect_http2,
+            &prior_knowledge_http2,
+            &initial_settings_py,
+            &on_remote_settings_changed_py)) {
         return NULL;
     }
 
@@ -195,6 +344,9 @@ PyObject *aws_py_http_client_connection_new(PyObject *self, PyObject *args) {
 
     /* From hereon, we need to clean up if errors occur */
 
+    struct aws_http2_setting *initial_settings = NULL;
+    size_t num_initial_settings = 0;
+
     struct aws_tls_connection_options *tls_options = NULL;
     if (tls_options_py != Py_None) {
         tls_options = aws_py_get_tls_connection_options(tls_options_py);
@@ -224,6 +376,18 @@ PyObject *aws_py_http_client_connection_new(PyObject *self, PyObject *args) {
         }
     }
 
+    if (!s_http2_settings_init(initial_settings_py, &initial_settings, &num_initial_settings)) {
+        goto error;
+    }
+
+    /* Only used if HTTP/2 is negotiated */
+    struct aws_http2_connection_options http2_options = {
+        .initial_settings_array = initial_settings,
+        .num_initial_settings = num_initial_settings,
+        .on_remote_settings_change = on_remote_settings_changed_py != Py_None ? s_on_remote_settings_change : NULL,
+        .conn_manual_window_management = manual_window_management,
+    };
+
     struct aws_http_client_connection_options http_options = {
         .self_size = sizeof(http_options),
         .bootstrap = bootstrap,
@@ -233,12 +397,22 @@ PyObject *aws_py_http_client_connection_new(PyObject *self, PyObject *args) {
         .user_data = connection,
         .host_name = aws_byte_cursor_from_array((const uint8_t *)host_name, host_name_len),
         .port = port_number,
-        .initial_window_size = SIZE_MAX,
+        /* Window only matters with manual window management, otherwise it's updated automatically */
+        .initial_window_size = manual_window_management ? (size_t)initial_window_size : SIZE_MAX,
         .socket_options = &socket_options,
         .on_setup = s_on_client_connection_setup,
         .on_shutdown = s_on_connection_shutdown,
+        .manual_window_management = manual_window_management,
+        .prior_knowledge_http2 = prior_knowledge_http2,
+        .http2_options = &http2_options,
     };
 
+    connection->expect_http2 = expect_http2;
+    if (on_remote_settings_changed_py != Py_None) {
+        connection->on_remote_settings_changed = on_remote_settings_changed_py;
+        Py_INCREF(connection->on_remote_settings_changed);
+    }
+
     connection->on_setup = on_connection_setup_py;
     Py_INCREF(connection->on_setup);
     connection->on_shutdown = on_shutdown_py;
@@ -251,9 +425,12 @@ PyObject *aws_py_http_client_connection_new(PyObject *self, PyObject *args) {
         goto error;
     }
 
+    /* Settings were copied during connect() */
+    aws_mem_release(allocator, initial_settings);
     Py_RETURN_NONE;
 
 error:
+    aws_mem_release(allocator, initial_settings);
     s_connection_destroy(connection);
     return NULL;
 }
@@ -270,7 +447,10 @@ PyObject *aws_py_http_connection_close(PyObject *self, PyObject *args) {
         return NULL;
     }
 
-    aws_http_connection_close(connection->native);
+    /* native is NULL if connection was already released back to its manager */
+    if (connection->native) {
+        aws_http_connection_close(connection->native);
+    }
     Py_RETURN_NONE;
 }
 
@@ -286,8 +466,458 @@ PyObject *aws_py_http_connection_is_open(PyObject *self, PyObject *args) {
         return NULL;
     }
 
-    if (aws_http_connection_is_open(connection->native)) {
+    if (connection->native && aws_http_connection_is_open(connection->native)) {
         Py_RETURN_TRUE;
     }
     Py_RETURN_FALSE;
 }
+
+/* Returns native HTTP/2 connection from capsule, or NULL with python exception set */
+static struct aws_http_connection *s_get_http2_connection(PyObject *capsule) {
+    struct http_connection_binding *connection = PyCapsule_GetPointer(capsule, s_capsule_name_http_connection);
+    if (!connection) {
+        return NULL;
+    }
+
+    if (!connection->native || aws_http_connection_get_version(connection->native) != AWS_HTTP_VERSION_2) {
+        PyErr_SetString(PyExc_TypeError, "Expected valid HTTP/2 connection");
+        return NULL;
+    }
+
+    return connection->native;
+}
+
+static void s_on_http2_settings_complete(
+    struct aws_http_connection *native_connection,
+    int error_code,
+    void *user_data) {
+
+    (void)native_connection;
+    PyObject *on_complete = user_data;
+
+    PyGILState_STATE state;
+    if (aws_py_gilstate_ensure(&state)) {
+        return; /* Python has shut down. Nothing matters anymore, but don't crash */
+    }
+
+    PyObject *result = PyObject_CallFunction(on_complete, "(i)", error_code);
+    if (result) {
+        Py_DECREF(result);
+    } else {
+        PyErr_WriteUnraisable(PyErr_Occurred());
+    }
+    Py_DECREF(on_complete);
+
+    PyGILState_Release(state);
+}
+
+PyObject *aws_py_http2_connection_change_settings(PyObject *self, PyObject *args) {
+    (void)self;
+    PyObject *capsule;
+    PyObject *settings_py;
+    PyObject *on_complete_py;
+    if (!PyArg_ParseTuple(args, "OOO", &capsule, &settings_py, &on_complete_py)) {
+        return NULL;
+    }
+
+    struct aws_http_connection *native = s_get_http2_connection(capsule);
+    if (!native) {
+        return NULL;
+    }
+
+    struct aws_http2_setting *settings;
+    size_t num_settings;
+    if (!s_http2_settings_init(settings_py, &settings, &num_settings)) {
+        return NULL;
+    }
+
+    /* Reference is released by the completion callback */
+    Py_INCREF(on_complete_py);
+    if (aws_http2_connection_change_settings(
+            native, settings, num_settings, s_on_http2_settings_complete, on_complete_py)) {
+        Py_DECREF(on_complete_py);
+        aws_mem_release(aws_py_get_allocator(), settings);
+        return PyErr_AwsLastError();
+    }
+
+    aws_mem_release(aws_py_get_allocator(), settings);
+    Py_RETURN_NONE;
+}
+
+static void s_on_http2_ping_complete(
+    struct aws_http_connection *native_connection,
+    uint64_t round_trip_time_ns,
+    int error_code,
+    void *user_data) {
+
+    (void)native_connection;
+    PyObject *on_complete = user_data;
+
+    PyGILState_STATE state;
+    if (aws_py_gilstate_ensure(&state)) {
+        return; /* Python has shut down. Nothing matters anymore, but don't crash */
+    }
+
+    PyObject *result =
+        PyObject_CallFunction(on_complete, "(Ki)", (unsigned long long)round_trip_time_ns, error_code);
+    if (result) {
+        Py_DECREF(result);
+    } else {
+        PyErr_WriteUnraisable(PyErr_Occurred());
+    }
+    Py_DECREF(on_complete);
+
+    PyGILState_Release(state);
+}
+
+PyObject *aws_py_http2_connection_ping(PyObject *self, PyObject *args) {
+    (void)self;
+    PyObject *capsule;
+    const char *data;
+    Py_ssize_t data_len;
+    PyObject *on_complete_py;
+    if (!PyArg_ParseTuple(args, "Oz#O", &capsule, &data, &data_len, &on_complete_py)) {
+        return NULL;
+    }
+
+    struct aws_http_connection *native = s_get_http2_connection(capsule);
+    if (!native) {
+        return NULL;
+    }
+
+    struct aws_byte_cursor data_cursor;
+    struct aws_byte_cursor *optional_data = NULL;
+    if (data) {
+        data_cursor = aws_byte_cursor_from_array((const uint8_t *)data, (size_t)data_len);
+        optional_data = &data_cursor;
+    }
+
+    /* Reference is released by the completion callback */
+    Py_INCREF(on_complete_py);
+    if (aws_http2_connection_ping(native, optional_data, s_on_http2_ping_complete, on_complete_py)) {
+        Py_DECREF(on_complete_py);
+        return PyErr_AwsLastError();
+    }
+
+    Py_RETURN_NONE;
+}
+
+PyObject *aws_py_http2_connection_update_window(PyObject *self, PyObject *args) {
+    (void)self;
+    PyObject *capsule;
+    unsigned int increment_size;
+    if (!PyArg_ParseTuple(args, "OI", &capsule, &increment_size)) {
+        return NULL;
+    }
+
+    struct aws_http_connection *native = s_get_http2_connection(capsule);
+    if (!native) {
+        return NULL;
+    }
+
+    aws_http2_connection_update_window(native, (uint32_t)increment_size);
+    Py_RETURN_NONE;
+}
+
+PyObject *aws_py_http2_connection_get_settings(PyObject *self, PyObject *args) {
+    (void)self;
+    PyObject *capsule;
+    int remote;
+    if (!PyArg_ParseTuple(args, "Op", &capsule, &remote)) {
+        return NULL;
+    }
+
+    struct aws_http_connection *native = s_get_http2_connection(capsule);
+    if (!native) {
+        return NULL;
+    }
+
+    struct aws_http2_setting settings[AWS_HTTP2_SETTINGS_COUNT];
+    if (remote) {
+        aws_http2_connection_get_remote_settings(native, settings);
+    } else {
+        aws_http2_connection_get_local_settings(native, settings);
+    }
+
+    return s_http2_settings_to_list(settings, AWS_HTTP2_SETTINGS_COUNT);
+}
+
+/**
+ * Lifetime notes:
+ * - If aws_http_connection_manager_new() fails, binding is destroyed immediately.
+ * - Otherwise, binding is destroyed from the manager's shutdown_complete callback,
+ *   which fires after the capsule is destroyed and every acquired connection is released.
+ * - Each acquired connection keeps a reference to the capsule, so the manager outlives its connections.
+ */
+struct http_connection_manager_binding {
+    struct aws_http_connection_manager *native;
+
+    /* Shutdown callback, reference cleared after invoking */
+    PyObject *on_shutdown;
+
+    /* Dependencies that must outlive this */
+    PyObject *bootstrap;
+    PyObject *tls_ctx;
+};
+
+static void s_connection_manager_destroy(struct http_connection_manager_binding *manager) {
+    Py_XDECREF(manager->on_shutdown);
+    Py_XDECREF(manager->bootstrap);
+    Py_XDECREF(manager->tls_ctx);
+
+    aws_mem_release(aws_py_get_allocator(), manager);
+}
+
+static void s_connection_manager_capsule_destructor(PyObject *capsule) {
+    struct http_connection_manager_binding *manager =
+        PyCapsule_GetPointer(capsule, s_capsule_name_http_connection_manager);
+
+    /* Binding is destroyed once the manager finishes shutting down */
+    aws_http_connection_manager_release(manager->native);
+}
+
+static void s_on_connection_manager_shutdown_complete(void *user_data) {
+    struct http_connection_manager_binding *manager = user_data;
+
+    PyGILState_STATE state;
+    if (aws_py_gilstate_ensure(&state)) {
+        return; /* Python has shut down. Nothing matters anymore, but don't crash */
+    }
+
+    PyObject *result = PyObject_CallFunction(manager->on_shutdown, NULL);
+    if (result) {
+        Py_DECREF(result);
+    } else {
+        /* Callback might fail during application shutdown */
+        PyErr_WriteUnraisable(PyErr_Occurred());
+    }
+
+    s_connection_manager_destroy(manager);
+
+    PyGILState_Release(state);
+}
+
+PyObject *aws_py_http_connection_manager_new(PyObject *self, PyObject *args) {
+    (void)self;
+
+    struct aws_allocator *allocator = aws_py_get_allocator();
+
+    PyObject *bootstrap_py;
+    PyObject *on_shutdown_py;
+    const char *host_name;
+    Py_ssize_t host_name_len;
+    uint16_t port_number;
+    PyObject *socket_options_py;
+    PyObject *tls_options_py;
+    PyObject *proxy_options_py;
+    Py_ssize_t max_connections;
+    unsigned long long max_connection_idle_in_milliseconds;
+    int manual_window_management;
+    unsigned long long initial_window_size;
+
+    if (!PyArg_ParseTuple(
+            args,
+            "OOs#HOOOnKpK",
+            &bootstrap_py,
+            &on_shutdown_py,
+            &host_name,
+            &host_name_len,
+            &port_number,
+            &socket_options_py,
+            &tls_options_py,
+            &proxy_options_py,
+            &max_connections,
+            &max_connection_idle_in_milliseconds,
+            &manual_window_management,
+            &initial_window_size)) {
+        return NULL;
+    }
+
+    if (max_connections <= 0) {
+        PyErr_SetString(PyExc_ValueError, "max_connections must be positive");
+        return NULL;
+    }
+
+    struct aws_client_bootstrap *bootstrap = aws_py_get_client_bootstrap(bootstrap_py);
+    if (!bootstrap) {
+        return NULL;
+    }
+
+    struct http_connection_manager_binding *manager =
+        aws_mem_calloc(allocator, 1, sizeof(struct http_connection_manager_binding));
+    if (!manager) {
+        return PyErr_AwsLastError();
+    }
+
+    /* From hereon, we need to clean up if errors occur */
+
+    struct aws_tls_connection_options *tls_options = NULL;
+    if (tls_options_py != Py_None) {
+        tls_options = aws_py_get_tls_connection_options(tls_options_py);
+        if (!tls_options) {
+            goto error;
+        }
+
+        manager->tls_ctx = PyObject_GetAttrString(tls_options_py, "tls_ctx"); /* Creates new reference */
+        if (!manager->tls_ctx || manager->tls_ctx == Py_None) {
+            PyErr_SetString(PyExc_TypeError, "tls_connection_options.tls_ctx is invalid");
+            goto error;
+        }
+    }
+
+    struct aws_socket_options socket_options;
+    if (!aws_py_socket_options_init(&socket_options, socket_options_py)) {
+        goto error;
+    }
+
+    /* proxy options are optional */
+    struct aws_http_proxy_options proxy_options_storage;
+    struct aws_http_proxy_options *proxy_options = NULL;
+    if (proxy_options_py != Py_None) {
+        proxy_options = &proxy_options_storage;
+        if (!aws_py_http_proxy_options_init(proxy_options, proxy_options_py)) {
+            goto error;
+        }
+    }
+
+    struct aws_http_connection_manager_options manager_options = {
+        .bootstrap = bootstrap,
+        /* Window only matters with manual window management, otherwise it's updated automatically */
+        .initial_window_size = manual_window_management ? (size_t)initial_window_size : SIZE_MAX,
+        .enable_read_back_pressure = manual_window_management,
+        .socket_options = &socket_options,
+        .tls_connection_options = tls_options,
+        .proxy_options = proxy_options,
+        .host = aws_byte_cursor_from_array((const uint8_t *)host_name, host_name_len),
+        .port = port_number,
+        .max_connections = (size_t)max_connections,
+        .max_connection_idle_in_milliseconds = max_connection_idle_in_milliseconds,
+        .shutdown_complete_user_data = manager,
+        .shutdown_complete_callback = s_on_connection_manager_shutdown_complete,
+    };
+
+    manager->native = aws_http_connection_manager_new(allocator, &manager_options);
+    if (!manager->native) {
+        PyErr_SetAwsLastError();
+        goto error;
+    }
+
+    manager->on_shutdown = on_shutdown_py;
+    Py_INCREF(manager->on_shutdown);
+    manager->bootstrap = bootstrap_py;
+    Py_INCREF(manager->bootstrap);
+
+    PyObject *capsule =
+        PyCapsule_New(manager, s_capsule_name_http_connection_manager, s_connection_manager_capsule_destructor);
+    if (!capsule) {
+        /* Binding is destroyed once the manager finishes shutting down */
+        aws_http_connection_manager_release(manager->native);
+        return NULL;
+    }
+
+    return capsule;
+
+error:
+    s_connection_manager_destroy(manager);
+    return NULL;
+}
+
+PyObject *aws_py_http_connection_manager_acquire_connection(PyObject *self, PyObject *args) {
+    (void)self;
+
+    PyObject *manager_capsule;
+    PyObject *on_connection_setup_py;
+    if (!PyArg_ParseTuple(args, "OO", &manager_capsule, &on_connection_setup_py)) {
+        return NULL;
+    }
+
+    struct http_connection_manager_binding *manager =
+        PyCapsule_GetPointer(manager_capsule, s_capsule_name_http_connection_manager);
+    if (!manager) {
+        return NULL;
+    }
+
+    struct http_connection_binding *connection =
+        aws_mem_calloc(aws_py_get_allocator(), 1, sizeof(struct http_connection_binding));
+    if (!connection) {
+        return PyErr_AwsLastError();
+    }
+
+    connection->manager = manager->native;
+    connection->on_setup = on_connection_setup_py;
+    Py_INCREF(connection->on_setup);
+    connection->manager_capsule = manager_capsule;
+    Py_INCREF(connection->manager_capsule);
+
+    /* Acquired connections go through the same setup path as connections made with connect() */
+    aws_http_connection_manager_acquire_connection(manager->native, s_on_client_connection_setup, connection);
+
+    Py_RETURN_NONE;
+}
+
+PyObject *aws_py_http_connection_manager_release_connection(PyObject *self, PyObject *args) {
+    (void)self;
+
+    PyObject *manager_capsule;
+    PyObject *connection_capsule;
+    if (!PyArg_ParseTuple(args, "OO", &manager_capsule, &connection_capsule)) {
+        return NULL;
+    }
+
+    struct http_connection_manager_binding *manager =
+        PyCapsule_GetPointer(manager_capsule, s_capsule_name_http_connection_manager);
+    if (!manager) {
+        return NULL;
+    }
+
+    struct http_connection_binding *connection =
+        PyCapsule_GetPointer(connection_capsule, s_capsule_name_http_connection);
+    if (!connection) {
+        return NULL;
+    }
+
+    if (connection->manager != manager->native) {
+        PyErr_SetString(PyExc_ValueError, "Connection was not acquired from this manager");
+        return NULL;
+    }
+
+    if (!connection->native) {
+        PyErr_SetString(PyExc_ValueError, "Connection was already released");
+        return NULL;
+    }
+
+    /* Binding itself is destroyed later, by the connection's capsule destructor */
+    struct aws_http_connection *native = connection->native;
+    connection->native = NULL;
+    if (aws_http_connection_manager_release_connection(manager->native, native)) {
+        return PyErr_AwsLastError();
+    }
+
+    Py_RETURN_NONE;
+}
+
+PyObject *aws_py_http_connection_manager_fetch_metrics(PyObject *self, PyObject *args) {
+    (void)self;
+
+    PyObject *manager_capsule;
+    if (!PyArg_ParseTuple(args, "O", &manager_capsule)) {
+        return NULL;
+    }
+
+    struct http_connection_manager_binding *manager =
+        PyCapsule_GetPointer(manager_capsule, s_capsule_name_http_connection_manager);
+    if (!manager) {
+        return NULL;
+    }
+
+    struct aws_http_manager_metrics metrics;
+    AWS_ZERO_STRUCT(metrics);
+    aws_http_connection_manager_fetch_metrics(manager->native, &metrics);
+
+    /* (idle, leased, pending) */
+    return Py_BuildValue(
+        "(nnn)",
+        (Py_ssize_t)metrics.available_concurrency,
+        (Py_ssize_t)metrics.leased_concurrency,
+        (Py_ssize_t)metrics.pending_concurrency_acquires);
+}
@@ -27,6 +27,12 @@ struct http_stream_binding {
     struct aws_byte_buf received_headers;
     size_t received_headers_count; /* Buffer contains 2x strings per header */
 
+    /* If true, each chunk is copied into body_buffer, and _on_body receives a memoryview of it,
+     * instead of a new bytes object per chunk. */
+    bool reuse_body_buffer;
+    /* bytearray each chunk is copied into when reuse_body_buffer is set. Reused while the user doesn't keep it. */
+    PyObject *body_buffer;
+
     /* Dependencies that must outlive this */
     PyObject *connection;
 };
@@ -170,7 +176,19 @@ static int s_on_incoming_body(
         return AWS_OP_ERR; /* Python has shut down. Nothing matters anymore, but don't crash */
     }
 
-    PyObject *result = PyObject_CallMethod(stream->self_proxy, "_on_body", "(y#)", (const char *)data->ptr, data_len);
+    PyObject *result = NULL;
+    if (stream->reuse_body_buffer) {
+        /* The memoryview owns its memory, so it's fine if the user keeps it */
+        PyObject *chunk = aws_py_memory_view_from_reusable_copy(&stream->body_buffer, *data);
+        if (!chunk) {
+            aws_result = aws_py_raise_error();
+            goto done;
+        }
+        result = PyObject_CallMethod(stream->self_proxy, "_on_body", "(O)", chunk);
+        Py_DECREF(chunk);
+    } else {
+        result = PyObject_CallMethod(stream->self_proxy, "_on_body", "(y#)", (const char *)data->ptr, data_len);
+    }
     if (!result) {
         aws_result = aws_py_raise_error();
         goto done;
@@ -219,6 +237,7 @@ static void s_stream_capsule_destructor(PyObject *http_stream_capsule) {
     aws_http_stream_release(stream->native);
     Py_XDECREF(stream->self_proxy);
     aws_byte_buf_clean_up(&stream->received_headers);
+    Py_XDECREF(stream->body_buffer);
     Py_XDECREF(stream->connection);
 
     aws_mem_release(aws_py_get_allocator(), stream);
@@ -232,7 +251,8 @@ PyObject *aws_py_http_client_stream_new(PyObject *self, PyObject *args) {
     PyObject *py_stream = NULL;
     PyObject *py_connection = NULL;
     PyObject *py_request = NULL;
-    if (!PyArg_ParseTuple(args, "OOO", &py_stream, &py_connection, &py_request)) {
+    int reuse_body_buffer = 0;
+    if (!PyArg_ParseTuple(args, "OOOp", &py_stream, &py_connection, &py_request, &reuse_body_buffer)) {
         return NULL;
     }
 
@@ -262,6 +282,8 @@ PyObject *aws_py_http_client_stream_new(PyObject *self, PyObject *args) {
     stream->connection = py_connection;
     Py_INCREF(stream->connection);
 
+    stream->reuse_body_buffer = reuse_body_buffer;
+
     stream->self_proxy = PyWeakref_NewProxy(py_stream, NULL);
     if (!stream->self_proxy) {
         goto error;
@@ -320,3 +342,26 @@ PyObject *aws_py_http_client_stream_activate(PyObject *self, PyObject *args) {
 
     Py_RETURN_NONE;
 }
+
+PyObject *aws_py_http_stream_update_window(PyObject *self, PyObject *args) {
+    (void)self;
+
+    PyObject *py_stream = NULL;
+    Py_ssize_t increment_size;
+    if (!PyArg_ParseTuple(args, "On", &py_stream, &increment_size)) {
+        return NULL;
+    }
+
+    if (increment_size < 0) {
+        PyErr_SetString(PyExc_ValueError, "increment_size cannot be negative");
+        return NULL;
+    }
+
+    struct aws_http_stream *native_stream = aws_py_get_http_stream(py_stream);
+    if (!native_stream) {
+        return NULL;
+    }
+
+    aws_http_stream_update_window(native_stream, (size_t)increment_size);
+    Py_RETURN_NONE;
+}
@@ -515,6 +515,33 @@ PyObject *aws_py_memory_view_from_byte_buffer(struct aws_byte_buf *buf) {
     return PyMemoryView_FromMemory(mem_start, mem_size, PyBUF_WRITE);
 }
 
+PyObject *aws_py_memory_view_from_reusable_copy(PyObject **reusable_buffer, struct aws_byte_cursor data) {
+    if (data.len > PY_SSIZE_T_MAX) {
+        PyErr_SetString(PyExc_OverflowError, "Buffer exceeds PY_SSIZE_T_MAX");
+        return NULL;
+    }
+
+    /* Anything still using a previous view (the memoryview itself, a slice, numpy.frombuffer(), ...)
+     * holds a reference to the bytearray, so it's only safe to overwrite when ours is the only one.
+     * Otherwise the old bytearray now belongs to whoever kept it, and we start a new one. */
+    if (*reusable_buffer && Py_REFCNT(*reusable_buffer) == 1) {
+        if (PyByteArray_Resize(*reusable_buffer, (Py_ssize_t)data.len)) {
+            return NULL;
+        }
+    } else {
+        Py_XDECREF(*reusable_buffer);
+        *reusable_buffer = PyByteArray_FromStringAndSize(NULL, (Py_ssize_t)data.len);
+        if (!*reusable_buffer) {
+            return NULL;
+        }
+    }
+
+    if (data.len > 0) {
+        memcpy(PyByteArray_AS_STRING(*reusable_buffer), data.ptr, data.len);
+    }
+    return PyMemoryView_FromObject(*reusable_buffer);
+}
+
 int aws_py_gilstate_ensure(PyGILState_STATE *out_state) {
     if (AWS_LIKELY(Py_IsInitialized())) {
         *out_state = PyGILState_Ensure();
@@ -736,8 +763,17 @@ static PyMethodDef s_module_methods[] = {
     AWS_PY_METHOD_DEF(http_connection_close, METH_VARARGS),
     AWS_PY_METHOD_DEF(http_connection_is_open, METH_VARARGS),
     AWS_PY_METHOD_DEF(http_client_connection_new, METH_VARARGS),
+    AWS_PY_METHOD_DEF(http2_connection_change_settings, METH_VARARGS),
+    AWS_PY_METHOD_DEF(http2_connection_ping, METH_VARARGS),
+    AWS_PY_METHOD_DEF(http2_connection_update_window, METH_VARARGS),
+    AWS_PY_METHOD_DEF(http2_connection_get_settings, METH_VARARGS),
+    AWS_PY_METHOD_DEF(http_connection_manager_new, METH_VARARGS),
+    AWS_PY_METHOD_DEF(http_connection_manager_acquire_connection, METH_VARARGS),
+    AWS_PY_METHOD_DEF(http_connection_manager_release_connection, METH_VARARGS),
+    AWS_PY_METHOD_DEF(http_connection_manager_fetch_metrics, METH_VARARGS),
     AWS_PY_METHOD_DEF(http_client_stream_new, METH_VARARGS),
     AWS_PY_METHOD_DEF(http_client_stream_activate, METH_VARARGS),
+    AWS_PY_METHOD_DEF(http_stream_update_window, METH_VARARGS),
     AWS_PY_METHOD_DEF(http_message_new_request, METH_VARARGS),
     AWS_PY_METHOD_DEF(http_message_get_request_method, METH_VARARGS),
     AWS_PY_METHOD_DEF(http_message_set_request_method, METH_VARARGS),
@@ -800,6 +836,7 @@ static PyMethodDef s_module_methods[] = {
     AWS_PY_METHOD_DEF(s3_client_new, METH_VARARGS),
     AWS_PY_METHOD_DEF(s3_client_make_meta_request, METH_VARARGS),
     AWS_PY_METHOD_DEF(s3_meta_request_cancel, METH_VARARGS),
+    AWS_PY_METHOD_DEF(s3_meta_request_increment_read_window, METH_VARARGS),
 
     /* WebSocket */
     AWS_PY_METHOD_DEF(websocket_client_connect, METH_VARARGS),
@@ -106,6 +106,14 @@ PyObject *aws_py_get_error_message(PyObject *self, PyObject *args);
 /* Create a write-only memoryview from the remaining free space in an aws_byte_buf */
 PyObject *aws_py_memory_view_from_byte_buffer(struct aws_byte_buf *buf);
 
+/**
+ * Copy data into *reusable_buffer (a bytearray, created if NULL) and return a memoryview of it.
+ * The bytearray is only overwritten if nothing else references it, so views from previous calls stay valid.
+ * Avoids an allocation per call in the common case where the caller doesn't keep the data.
+ * The GIL MUST be held. *reusable_buffer must be Py_XDECREF'd when done.
+ */
+PyObject *aws_py_memory_view_from_reusable_copy(PyObject **reusable_buffer, struct aws_byte_cursor data);
+
 /* Allocator that calls into PyObject_[Malloc|Free|Realloc] */
 struct aws_allocator *aws_py_get_allocator(void);
 
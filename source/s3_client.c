@@ -80,10 +80,12 @@ PyObject *aws_py_s3_client_new(PyObject *self, PyObject *args) {
     Py_ssize_t region_len;
     uint64_t part_size = 0;
     double throughput_target_gbps = 0;
+    int enable_read_backpressure = 0;
+    unsigned long long initial_read_window = 0;
     int tls_mode;
     if (!PyArg_ParseTuple(
             args,
-            "OOOOs#iKdO",
+            "OOOOs#iKdpKO",
             &bootstrap_py,
             &credential_provider_py,
             &tls_options_py,
@@ -93,6 +95,8 @@ PyObject *aws_py_s3_client_new(PyObject *self, PyObject *args) {
             &tls_mode,
             &part_size,
             &throughput_target_gbps,
+            &enable_read_backpressure,
+            &initial_read_window,
             &py_core)) {
         return NULL;
     }
@@ -154,6 +158,8 @@ PyObject *aws_py_s3_client_new(PyObject *self, PyObject *args) {
         .part_size = part_size,
         .tls_connection_options = tls_options,
         .throughput_target_gbps = throughput_target_gbps,
+        .enable_read_backpressure = enable_read_backpressure != 0,
+        .initial_read_window = (size_t)initial_read_window,
         .shutdown_callback = s_s3_client_shutdown,
         .shutdown_callback_user_data = s3_client,
     };
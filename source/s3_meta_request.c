@@ -9,6 +9,8 @@
 #include "io.h"
 #include <errno.h>
 
+#include <aws/cal/hash.h>
+#include <aws/checksums/crc.h>
 #include <aws/common/clock.h>
 #include <aws/common/file.h>
 #include <aws/http/request_response.h>
@@ -16,6 +18,16 @@
 #include <aws/io/stream.h>
 #include <aws/s3/s3_client.h>
 
+#if defined(_WIN32)
+#    include <io.h>
+#    include <windows.h>
+#else
+#    include <fcntl.h>
+#    include <sys/mman.h>
+#    include <sys/stat.h>
+#    include <unistd.h>
+#endif
+
 static const char *s_capsule_name_s3_meta_request = "aws_s3_meta_request";
 
 struct s3_meta_request_binding {
@@ -29,15 +41,274 @@ struct s3_meta_request_binding {
      * passing chunks from C into python. One for recv/writing, the other for send/reading
      **/
     FILE *recv_file;
+    /* True if recv_file already holds the start of the object, and the response continues it */
+    bool recv_file_resumed;
+    /* Offset in the object of the byte at the start of recv_file. Non-zero if the request has a Range header. */
+    uint64_t recv_file_object_offset;
 
     struct aws_http_message *copied_message;
 
-    /* Batch up the transferred size in one sec. */
+    /* If true, each chunk is copied into body_buffer, and on_body receives a memoryview of it,
+     * instead of a new bytes object per chunk. */
+    bool reuse_body_buffer;
+    /* bytearray each chunk is copied into when reuse_body_buffer is set. Reused while the user doesn't keep it. */
+    PyObject *body_buffer;
+    /* If true, each chunk is copied straight into buffers from the request's S3BufferPool. */
+    bool use_buffer_pool;
+
+    /* Batch up the transferred size until it's reported. */
     uint64_t size_transferred;
     /* The time stamp when the progress reported */
     uint64_t last_sampled_time;
+    /* Progress is only reported to python once this many bytes have been batched up... */
+    uint64_t progress_interval_bytes;
+    /* ...and this many nanoseconds have passed since it was last reported. */
+    uint64_t progress_interval_ns;
+
+    /* If true, each part written to recv_file is reported to python as it arrives (someone wants on_part).
+     * Otherwise parts are only counted here, and reported once as the request finishes, without taking the GIL. */
+    bool report_parts;
+    /* Parts counted but not yet reported to python */
+    uint64_t parts_received;
+    /* Longest time between consecutive parts (or the headers and the first part) */
+    uint64_t max_part_interval_ns;
+    /* When the headers or the last part arrived */
+    uint64_t last_part_time_ns;
+
+    /* If true, grow the read window by each chunk of body once it's been handled.
+     * Otherwise, python grows it by calling increment_read_window().
+     * Does nothing unless the client has read backpressure enabled. */
+    bool auto_increment_read_window;
+
+    /* Checksum of the whole object, computed as the body streams through (received, or read from send_filepath).
+     * AWS_SCA_NONE if not computed. */
+    enum aws_s3_checksum_algorithm object_checksum_algorithm;
+    /* Running CRC, for the CRC algorithms */
+    uint32_t object_crc;
+    /* Running hash, for the SHA algorithms */
+    struct aws_hash *object_hash;
+    /* Offset the next chunk of body must start at, for the checksum to stay valid */
+    uint64_t object_checksum_offset;
+    /* Set false if the body didn't stream through in order, from the start. Then there's no checksum to report. */
+    bool object_checksum_valid;
+
+    /* Copied into the meta request options */
+    struct aws_s3_checksum_config checksum_config;
 };
 
+static int s_object_checksum_reset(struct s3_meta_request_binding *request_binding) {
+    struct aws_allocator *allocator = aws_py_get_allocator();
+    if (request_binding->object_hash) {
+        aws_hash_destroy(request_binding->object_hash);
+        request_binding->object_hash = NULL;
+    }
+    request_binding->object_crc = 0;
+    request_binding->object_checksum_offset = 0;
+    request_binding->object_checksum_valid = true;
+
+    switch (request_binding->object_checksum_algorithm) {
+        case AWS_SCA_SHA1:
+            request_binding->object_hash = aws_sha1_new(allocator);
+            break;
+        case AWS_SCA_SHA256:
+            request_binding->object_hash = aws_sha256_new(allocator);
+            break;
+        default:
+            return AWS_OP_SUCCESS;
+    }
+    return request_binding->object_hash ? AWS_OP_SUCCESS : AWS_OP_ERR;
+}
+
+/* Add a chunk of body, which starts at offset within the object, to the object's checksum */
+static int s_object_checksum_update(
+    struct s3_meta_request_binding *request_binding,
+    struct aws_byte_cursor data,
+    uint64_t offset) {
+
+    if (request_binding->object_checksum_algorithm == AWS_SCA_NONE || !request_binding->object_checksum_valid) {
+        return AWS_OP_SUCCESS;
+    }
+    if (offset != request_binding->object_checksum_offset) {
+        /* Out of order. Give up on the checksum, rather than report a wrong one. */
+        request_binding->object_checksum_valid = false;
+        return AWS_OP_SUCCESS;
+    }
+    request_binding->object_checksum_offset += data.len;
+
+    switch (request_binding->object_checksum_algorithm) {
+        case AWS_SCA_CRC32C:
+        case AWS_SCA_CRC32: {
+            bool is_crc32c = request_binding->object_checksum_algorithm == AWS_SCA_CRC32C;
+            uint32_t (*crc_fn)(const uint8_t *, int, uint32_t) = is_crc32c ? aws_checksums_crc32c : aws_checksums_crc32;
+            /* crc functions take the length as an int */
+            while (data.len > INT_MAX) {
+                request_binding->object_crc = crc_fn(data.ptr, INT_MAX, request_binding->object_crc);
+                aws_byte_cursor_advance(&data, INT_MAX);
+            }
+            request_binding->object_crc = crc_fn(data.ptr, (int)data.len, request_binding->object_crc);
+            return AWS_OP_SUCCESS;
+        }
+        default:
+            return aws_hash_update(request_binding->object_hash, &data);
+    }
+}
+
+/**
+ * Add the first `length` bytes of a file to the object's checksum, for a download resuming after them.
+ * If the file is shorter than that, there's no checksum to report, but that's not an error.
+ * The GIL MUST be held when calling this function, it's released while reading.
+ * Returns AWS_OP_ERR and raises AWS error if reading fails.
+ */
+static int s_object_checksum_update_from_file(
+    struct s3_meta_request_binding *request_binding,
+    FILE *file,
+    uint64_t length) {
+
+    if (request_binding->object_checksum_algorithm == AWS_SCA_NONE || length == 0) {
+        return AWS_OP_SUCCESS;
+    }
+
+    struct aws_byte_buf buffer;
+    if (aws_byte_buf_init(&buffer, aws_py_get_allocator(), 1024 * 1024)) {
+        return AWS_OP_ERR;
+    }
+    int result = AWS_OP_SUCCESS;
+
+    /* clang-format off */
+    Py_BEGIN_ALLOW_THREADS
+        if (fseek(file, 0, SEEK_SET)) {
+            result = aws_translate_and_raise_io_error(errno);
+        }
+        while (result == AWS_OP_SUCCESS && request_binding->object_checksum_offset < length) {
+            uint64_t remaining = length - request_binding->object_checksum_offset;
+            size_t to_read = (size_t)aws_min_u64(remaining, buffer.capacity);
+            size_t actually_read = fread(buffer.buffer, 1, to_read, file);
+            if (actually_read == 0) {
+                if (ferror(file)) {
+                    result = aws_translate_and_raise_io_error(errno);
+                } else {
+                    /* The file is shorter than the download's progress says */
+                    request_binding->object_checksum_valid = false;
+                }
+                break;
+            }
+            result = s_object_checksum_update(
+                request_binding,
+                aws_byte_cursor_from_array(buffer.buffer, actually_read),
+                request_binding->object_checksum_offset);
+        }
+    Py_END_ALLOW_THREADS
+    /* clang-format on */
+
+    aws_byte_buf_clean_up(&buffer);
+    return result;
+}
+
+/* Returns a new reference to bytes with the object's checksum (big-endian for the CRCs, as S3 reports them),
+ * or None if there's no checksum. Returns NULL with python error set if something went wrong.
+ * The GIL MUST be held when calling this function. */
+static PyObject *s_object_checksum_finalize(struct s3_meta_request_binding *request_binding) {
+    if (request_binding->object_checksum_algorithm == AWS_SCA_NONE || !request_binding->object_checksum_valid) {
+        Py_RETURN_NONE;
+    }
+    request_binding->object_checksum_valid = false;
+
+    uint8_t digest[AWS_SHA256_LEN];
+    struct aws_byte_buf digest_buf = aws_byte_buf_from_empty_array(digest, sizeof(digest));
+    if (request_binding->object_hash) {
+        if (aws_hash_finalize(request_binding->object_hash, &digest_buf, 0)) {
+            return PyErr_AwsLastError();
+        }
+    } else {
+        aws_byte_buf_write_be32(&digest_buf, request_binding->object_crc);
+    }
+    return PyBytes_FromStringAndSize((const char *)digest_buf.buffer, (Py_ssize_t)digest_buf.len);
+}
+
+/**
+ * Write all of data at the given offset of the file, without moving the file position (pwrite()).
+ * Parts land where they belong, regardless of the order they're delivered in,
+ * and nothing is buffered or copied by stdio along the way.
+ * Returns AWS_OP_ERR and raises AWS error if the write fails.
+ */
+static int s_file_write_at(FILE *file, struct aws_byte_cursor data, uint64_t offset) {
+#if defined(_WIN32)
+    HANDLE handle = (HANDLE)_get_osfhandle(_fileno(file));
+    if (handle == INVALID_HANDLE_VALUE) {
+        return aws_raise_error(AWS_ERROR_INVALID_ARGUMENT);
+    }
+    while (data.len > 0) {
+        DWORD to_write = data.len > MAXDWORD ? MAXDWORD : (DWORD)data.len;
+        DWORD written = 0;
+        OVERLAPPED overlapped;
+        AWS_ZERO_STRUCT(overlapped);
+        overlapped.Offset = (DWORD)(offset & 0xFFFFFFFF);
+        overlapped.OffsetHigh = (DWORD)(offset >> 32);
+        if (!WriteFile(handle, data.ptr, to_write, &written, &overlapped)) {
+            return aws_raise_error(AWS_ERROR_SYS_CALL_FAILURE);
+        }
+        aws_byte_cursor_advance(&data, written);
+        offset += written;
+    }
+#else
+    int fd = fileno(file);
+    while (data.len > 0) {
+        ssize_t written = pwrite(fd, data.ptr, data.len, (off_t)offset);
+        if (written < 0) {
+            if (errno == EINTR) {
+                continue;
+            }
+            return aws_translate_and_raise_io_error(errno);
+        }
+        aws_byte_cursor_advance(&data, (size_t)written);
+        offset += (uint64_t)written;
+    }
+#endif
+    return AWS_OP_SUCCESS;
+}
+
+/**
+ * Grow the file to at least `size` bytes, reserving the space up front where the platform allows.
+ * The file is never shrunk.
+ * Returns AWS_OP_ERR and raises AWS error if it fails.
+ */
+static int s_file_preallocate(FILE *file, uint64_t size) {
+#if defined(_WIN32)
+    int fd = _fileno(file);
+    __int64 current_size = _filelengthi64(fd);
+    if (current_size < 0) {
+        return aws_translate_and_raise_io_error(errno);
+    }
+    if ((uint64_t)current_size >= size) {
+        return AWS_OP_SUCCESS;
+    }
+    errno_t err = _chsize_s(fd, (__int64)size);
+    if (err) {
+        return aws_translate_and_raise_io_error(err);
+    }
+#else
+    int fd = fileno(file);
+    struct stat file_stat;
+    if (fstat(fd, &file_stat)) {
+        return aws_translate_and_raise_io_error(errno);
+    }
+    if ((uint64_t)file_stat.st_size >= size) {
+        return AWS_OP_SUCCESS;
+    }
+#    if defined(__linux__)
+    /* Reserve the blocks, so the disk can't fill up halfway through the download.
+     * Not every file system supports this, fall back to a sparse file if it fails. */
+    if (posix_fallocate(fd, 0, (off_t)size) == 0) {
+        return AWS_OP_SUCCESS;
+    }
+#    endif
+    if (ftruncate(fd, (off_t)size)) {
+        return aws_translate_and_raise_io_error(errno);
+    }
+#endif
+    return AWS_OP_SUCCESS;
+}
+
 struct aws_s3_meta_request *aws_py_get_s3_meta_request(PyObject *meta_request) {
     AWS_PY_RETURN_NATIVE_FROM_BINDING(
         meta_request, s_capsule_name_s3_meta_request, "S3Request", s3_meta_request_binding);
@@ -47,6 +318,10 @@ static void s_destroy(struct s3_meta_request_binding *meta_request) {
     if (meta_request->copied_message) {
         aws_http_message_release(meta_request->copied_message);
     }
+    if (meta_request->object_hash) {
+        aws_hash_destroy(meta_request->object_hash);
+    }
+    Py_XDECREF(meta_request->body_buffer);
     Py_XDECREF(meta_request->py_core);
     aws_mem_release(aws_py_get_allocator(), meta_request);
 }
@@ -77,6 +352,27 @@ error:
     return NULL;
 }
 
+/**
+ * Parse the first byte's offset out of a Content-Range header (ex: "bytes 100-199/1000").
+ * Returns AWS_OP_ERR and raises AWS error if it's missing or malformed.
+ */
+static int s_get_content_range_start(const struct aws_http_headers *headers, uint64_t *out_start) {
+    struct aws_byte_cursor value;
+    if (aws_http_headers_get(headers, aws_byte_cursor_from_c_str("Content-Range"), &value)) {
+        return AWS_OP_ERR;
+    }
+    struct aws_byte_cursor prefix = aws_byte_cursor_from_c_str("bytes ");
+    if (!aws_byte_cursor_starts_with(&value, &prefix)) {
+        return aws_raise_error(AWS_ERROR_INVALID_ARGUMENT);
+    }
+    aws_byte_cursor_advance(&value, prefix.len);
+    struct aws_byte_cursor start = {.ptr = value.ptr, .len = 0};
+    while (start.len < value.len && value.ptr[start.len] != '-') {
+        start.len++;
+    }
+    return aws_byte_cursor_utf8_parse_u64(start, out_start);
+}
+
 static int s_s3_request_on_headers(
     struct aws_s3_meta_request *meta_request,
     const struct aws_http_headers *headers,
@@ -85,6 +381,34 @@ static int s_s3_request_on_headers(
     (void)meta_request;
     struct s3_meta_request_binding *request_binding = user_data;
 
+    if (aws_high_res_clock_get_ticks(&request_binding->last_part_time_ns)) {
+        return AWS_OP_ERR;
+    }
+
+    if (request_binding->recv_file && (response_status == 200 || response_status == 206)) {
+        /* Body offsets are offsets in the object. For a Range request, the file starts at the range's first byte,
+         * unless resuming, where the file already holds the object from its start. */
+        uint64_t response_offset = 0;
+        if (response_status == 206 && s_get_content_range_start(headers, &response_offset)) {
+            return AWS_OP_ERR;
+        }
+        if (!request_binding->recv_file_resumed) {
+            request_binding->recv_file_object_offset = response_offset;
+        }
+
+        /* Size the file for the whole body up front, parts are then written in place */
+        struct aws_byte_cursor content_length_cursor;
+        uint64_t content_length = 0;
+        if (aws_http_headers_get(headers, aws_byte_cursor_from_c_str("Content-Length"), &content_length_cursor) ==
+                AWS_OP_SUCCESS &&
+            aws_byte_cursor_utf8_parse_u64(content_length_cursor, &content_length) == AWS_OP_SUCCESS) {
+            uint64_t file_size = response_offset - request_binding->recv_file_object_offset + content_length;
+            if (s_file_preallocate(request_binding->recv_file, file_size)) {
+                return AWS_OP_ERR;
+            }
+        }
+    }
+
     /*************** GIL ACQUIRE ***************/
     bool error = true;
     PyGILState_STATE state;
@@ -124,6 +448,11 @@ static int s_record_progress(struct s3_meta_request_binding *request_binding, ui
         /* Wow */
         return AWS_OP_ERR;
     }
+    *report_progress = false;
+    if (request_binding->size_transferred < request_binding->progress_interval_bytes) {
+        /* Not enough batched up yet, don't even bother checking the clock */
+        return AWS_OP_SUCCESS;
+    }
     uint64_t now;
     if (aws_high_res_clock_get_ticks(&now)) {
         return AWS_OP_ERR;
@@ -132,33 +461,159 @@ static int s_record_progress(struct s3_meta_request_binding *request_binding, ui
     if (aws_sub_u64_checked(now, request_binding->last_sampled_time, &nanos)) {
         return AWS_OP_ERR;
     }
-    uint64_t sec = aws_timestamp_convert(nanos, AWS_TIMESTAMP_NANOS, AWS_TIMESTAMP_SECS, NULL);
-    *report_progress = (sec >= 1);
+    *report_progress = (nanos >= request_binding->progress_interval_ns);
     if (*report_progress) {
         request_binding->last_sampled_time = now;
     }
     return AWS_OP_SUCCESS;
 }
 
+/**
+ * Invoke _on_body with a memoryview of the chunk, copied into request_binding->body_buffer.
+ * The memoryview owns its memory, so it stays valid if the user keeps it (or anything derived from it).
+ * The GIL MUST be held when calling this function.
+ * Returns AWS_OP_ERR if anything failed, with the python error already reported. */
+static int s_deliver_body_memoryview(
+    struct s3_meta_request_binding *request_binding,
+    const struct aws_byte_cursor *body,
+    uint64_t range_start) {
+
+    PyObject *chunk = aws_py_memory_view_from_reusable_copy(&request_binding->body_buffer, *body);
+    if (!chunk) {
+        PyErr_WriteUnraisable(request_binding->py_core);
+        return AWS_OP_ERR;
+    }
+
+    PyObject *result = PyObject_CallMethod(request_binding->py_core, "_on_body", "(OK)", chunk, range_start);
+    Py_DECREF(chunk);
+    if (!result) {
+        PyErr_WriteUnraisable(request_binding->py_core);
+        return AWS_OP_ERR;
+    }
+    Py_DECREF(result);
+    return AWS_OP_SUCCESS;
+}
+
+/**
+ * Deliver the chunk through _on_body_pooled, copied straight from native memory into buffers acquired from the
+ * request's S3BufferPool, one buffer at a time. If the pool runs out, the rest goes to _on_body_unpooled as bytes.
+ * The GIL MUST be held when calling this function.
+ * Returns AWS_OP_ERR if anything failed, with the python error already reported. */
+static int s_deliver_body_into_pool(
+    struct s3_meta_request_binding *request_binding,
+    const struct aws_byte_cursor *body,
+    uint64_t range_start) {
+
+    PyObject *py_core = request_binding->py_core;
+    PyObject *result = PyObject_CallMethod(py_core, "_on_part", "(KK)", range_start, (unsigned long long)body->len);
+    if (!result) {
+        goto error;
+    }
+    Py_DECREF(result);
+
+    struct aws_byte_cursor remaining = *body;
+    uint64_t offset = range_start;
+    while (remaining.len > 0) {
+        /* memoryview of a pooled buffer, or None if every buffer is out of the pool */
+        PyObject *view = PyObject_CallMethod(py_core, "_acquire_pool_buffer", NULL);
+        if (!view) {
+            goto error;
+        }
+        if (view == Py_None) {
+            Py_DECREF(view);
+            result = PyObject_CallMethod(
+                py_core,
+                "_on_body_unpooled",
+                "(y#K)",
+                (const char *)remaining.ptr,
+                (Py_ssize_t)remaining.len,
+                offset);
+            if (!result) {
+                goto error;
+            }
+            Py_DECREF(result);
+            return AWS_OP_SUCCESS;
+        }
+
+        Py_buffer py_buffer;
+        if (PyObject_GetBuffer(view, &py_buffer, PyBUF_WRITABLE | PyBUF_C_CONTIGUOUS)) {
+            PyErr_WriteUnraisable(py_core);
+            /* give the buffer back, nobody else will */
+            result = PyObject_CallMethod(py_core, "_release_pool_buffer", "(O)", view);
+            Py_DECREF(view);
+            if (!result) {
+                goto error;
+            }
+            Py_DECREF(result);
+            return AWS_OP_ERR;
+        }
+        size_t size = aws_min_size(remaining.len, (size_t)py_buffer.len);
+        memcpy(py_buffer.buf, remaining.ptr, size);
+        PyBuffer_Release(&py_buffer);
+
+        result = PyObject_CallMethod(py_core, "_on_body_pooled", "(OnK)", view, (Py_ssize_t)size, offset);
+        Py_DECREF(view);
+        if (!result) {
+            goto error;
+        }
+        Py_DECREF(result);
+        aws_byte_cursor_advance(&remaining, size);
+        offset += size;
+    }
+    return AWS_OP_SUCCESS;
+
+error:
+    PyErr_WriteUnraisable(py_core);
+    return AWS_OP_ERR;
+}
+
+/* Count a part natively, to report it to python once the request finishes */
+static int s_count_part(struct s3_meta_request_binding *request_binding) {
+    uint64_t now;
+    if (aws_high_res_clock_get_ticks(&now)) {
+        return AWS_OP_ERR;
+    }
+    uint64_t interval = now > request_binding->last_part_time_ns ? now - request_binding->last_part_time_ns : 0;
+    request_binding->max_part_interval_ns = aws_max_u64(request_binding->max_part_interval_ns, interval);
+    request_binding->last_part_time_ns = now;
+    request_binding->parts_received++;
+    return AWS_OP_SUCCESS;
+}
+
 static int s_s3_request_on_body(
     struct aws_s3_meta_request *meta_request,
     const struct aws_byte_cursor *body,
     uint64_t range_start,
     void *user_data) {
-    (void)meta_request;
     struct s3_meta_request_binding *request_binding = user_data;
 
     bool report_progress;
     if (s_record_progress(request_binding, (uint64_t)body->len, &report_progress)) {
         return AWS_OP_ERR;
     }
+    if (s_object_checksum_update(request_binding, *body, range_start)) {
+        return AWS_OP_ERR;
+    }
     if (request_binding->recv_file) {
-        /* The callback will be invoked with the right order, so we don't need to seek first. */
-        if (fwrite((void *)body->ptr, body->len, 1, request_binding->recv_file) < 1) {
-            return aws_translate_and_raise_io_error(errno);
+        /* Write each part at its own offset, so the file doesn't depend on delivery order */
+        if (range_start < request_binding->recv_file_object_offset) {
+            return aws_raise_error(AWS_ERROR_INVALID_ARGUMENT);
         }
-        if (!report_progress) {
-            return AWS_OP_SUCCESS;
+        if (s_file_write_at(
+                request_binding->recv_file, *body, range_start - request_binding->recv_file_object_offset)) {
+            return AWS_OP_ERR;
+        }
+        if (!request_binding->report_parts) {
+            if (s_count_part(request_binding)) {
+                return AWS_OP_ERR;
+            }
+            if (!report_progress) {
+                /* Nothing for python to do with this part, don't take the GIL */
+                if (request_binding->auto_increment_read_window) {
+                    aws_s3_meta_request_increment_read_window(meta_request, body->len);
+                }
+                return AWS_OP_SUCCESS;
+            }
         }
     }
     bool error = true;
@@ -169,14 +624,33 @@ static int s_s3_request_on_body(
         return AWS_OP_ERR; /* Python has shut down. Nothing matters anymore, but don't crash */
     }
     if (!request_binding->recv_file) {
+        if (request_binding->use_buffer_pool) {
+            if (s_deliver_body_into_pool(request_binding, body, range_start)) {
+                goto done;
+            }
+        } else if (request_binding->reuse_body_buffer) {
+            if (s_deliver_body_memoryview(request_binding, body, range_start)) {
+                goto done;
+            }
+        } else {
+            result = PyObject_CallMethod(
+                request_binding->py_core,
+                "_on_body",
+                "(y#K)",
+                (const char *)(body->ptr),
+                (Py_ssize_t)body->len,
+                range_start);
+
+            if (!result) {
+                PyErr_WriteUnraisable(request_binding->py_core);
+                goto done;
+            }
+            Py_DECREF(result);
+        }
+    } else if (request_binding->report_parts) {
+        /* The body went straight to the file, but the user wants to hear about each part */
         result = PyObject_CallMethod(
-            request_binding->py_core,
-            "_on_body",
-            "(y#K)",
-            (const char *)(body->ptr),
-            (Py_ssize_t)body->len,
-            range_start);
-
+            request_binding->py_core, "_on_part", "(KK)", range_start, (unsigned long long)body->len);
         if (!result) {
             PyErr_WriteUnraisable(request_binding->py_core);
             goto done;
@@ -200,9 +674,12 @@ done:
     /*************** GIL RELEASE ***************/
     if (error) {
         return aws_raise_error(AWS_ERROR_CRT_CALLBACK_EXCEPTION);
-    } else {
-        return AWS_OP_SUCCESS;
     }
+    if (request_binding->auto_increment_read_window) {
+        /* The chunk has been consumed, let another chunk's worth be fetched */
+        aws_s3_meta_request_increment_read_window(meta_request, body->len);
+    }
+    return AWS_OP_SUCCESS;
 }
 
 static void s_s3_request_on_finish(
@@ -223,6 +700,7 @@ static void s_s3_request_on_finish(
     }
 
     PyObject *header_list = NULL;
+    PyObject *object_checksum = NULL;
     PyObject *result = NULL;
 
     request_binding->copied_message = aws_http_message_release(request_binding->copied_message);
@@ -238,6 +716,21 @@ static void s_s3_request_on_finish(
         }
         request_binding->size_transferred = 0;
     }
+    if (request_binding->parts_received) {
+        /* report the parts that were only counted natively */
+        result = PyObject_CallMethod(
+            request_binding->py_core,
+            "_on_parts_counted",
+            "(KK)",
+            request_binding->parts_received,
+            request_binding->max_part_interval_ns);
+        if (!result) {
+            PyErr_WriteUnraisable(request_binding->py_core);
+        } else {
+            Py_DECREF(result);
+        }
+        request_binding->parts_received = 0;
+    }
     struct aws_byte_buf error_body;
     AWS_ZERO_STRUCT(error_body);
     /* Get the header and body of the error */
@@ -251,14 +744,27 @@ static void s_s3_request_on_finish(
     if (meta_request_result->error_response_body) {
         error_body = *(meta_request_result->error_response_body);
     }
+    if (meta_request_result->error_code) {
+        object_checksum = Py_None;
+        Py_INCREF(object_checksum);
+    } else {
+        object_checksum = s_object_checksum_finalize(request_binding);
+        if (!object_checksum) {
+            PyErr_WriteUnraisable(request_binding->py_core);
+            goto done;
+        }
+    }
     result = PyObject_CallMethod(
         request_binding->py_core,
         "_on_finish",
-        "(iOy#)",
+        "(iOy#OiO)",
         meta_request_result->error_code,
         header_list ? header_list : Py_None,
         (const char *)(error_body.buffer),
-        (Py_ssize_t)error_body.len);
+        (Py_ssize_t)error_body.len,
+        meta_request_result->did_validate ? Py_True : Py_False,
+        (int)meta_request_result->validation_algorithm,
+        object_checksum);
 
     if (result) {
         Py_DECREF(result);
@@ -268,6 +774,7 @@ static void s_s3_request_on_finish(
     }
 done:
     Py_XDECREF(header_list);
+    Py_XDECREF(object_checksum);
     PyGILState_Release(state);
     /*************** GIL RELEASE ***************/
 }
@@ -325,21 +832,15 @@ struct aws_input_py_stream_file_impl {
     struct s3_meta_request_binding *binding;
 };
 
-static int s_aws_input_stream_file_read(struct aws_input_stream *stream, struct aws_byte_buf *dest) {
-    struct aws_input_py_stream_file_impl *impl = AWS_CONTAINER_OF(stream, struct aws_input_py_stream_file_impl, base);
-    size_t pre_len = dest->len;
-
-    if (aws_input_stream_read(impl->actual_stream, dest)) {
-        return AWS_OP_ERR;
-    }
-
-    size_t actually_read = 0;
-    if (aws_sub_size_checked(dest->len, pre_len, &actually_read)) {
+/* Record bytes read from an upload file, add them to the object's checksum,
+ * and report the progress to python if it's time to */
+static int s_record_read(struct s3_meta_request_binding *request_binding, struct aws_byte_cursor data) {
+    if (s_object_checksum_update(request_binding, data, request_binding->object_checksum_offset)) {
         return AWS_OP_ERR;
     }
 
+    size_t actually_read = data.len;
     bool report_progress;
-    struct s3_meta_request_binding *request_binding = impl->binding;
     if (s_record_progress(request_binding, (uint64_t)actually_read, &report_progress)) {
         return AWS_OP_ERR;
     }
@@ -364,12 +865,44 @@ static int s_aws_input_stream_file_read(struct aws_input_stream *stream, struct
     }
     return AWS_OP_SUCCESS;
 }
+
+static int s_aws_input_stream_file_read(struct aws_input_stream *stream, struct aws_byte_buf *dest) {
+    struct aws_input_py_stream_file_impl *impl = AWS_CONTAINER_OF(stream, struct aws_input_py_stream_file_impl, base);
+    size_t pre_len = dest->len;
+
+    if (aws_input_stream_read(impl->actual_stream, dest)) {
+        return AWS_OP_ERR;
+    }
+
+    size_t actually_read = 0;
+    if (aws_sub_size_checked(dest->len, pre_len, &actually_read)) {
+        return AWS_OP_ERR;
+    }
+
+    return s_record_read(impl->binding, aws_byte_cursor_from_array(dest->buffer + pre_len, actually_read));
+}
+
+/* An upload stream was seeked. Keep the object's checksum only if reading starts over from the beginning. */
+static int s_record_seek(
+    struct s3_meta_request_binding *request_binding,
+    int64_t offset,
+    enum aws_stream_seek_basis basis) {
+    if (offset == 0 && basis == AWS_SSB_BEGIN) {
+        return s_object_checksum_reset(request_binding);
+    }
+    request_binding->object_checksum_valid = false;
+    return AWS_OP_SUCCESS;
+}
+
 static int s_aws_input_stream_file_seek(
     struct aws_input_stream *stream,
     int64_t offset,
     enum aws_stream_seek_basis basis) {
     struct aws_input_py_stream_file_impl *impl = AWS_CONTAINER_OF(stream, struct aws_input_py_stream_file_impl, base);
-    return aws_input_stream_seek(impl->actual_stream, offset, basis);
+    if (aws_input_stream_seek(impl->actual_stream, offset, basis)) {
+        return AWS_OP_ERR;
+    }
+    return s_record_seek(impl->binding, offset, basis);
 }
 
 static int s_aws_input_stream_file_get_status(struct aws_input_stream *stream, struct aws_stream_status *status) {
@@ -415,6 +948,149 @@ static struct aws_input_stream *s_input_stream_new_from_file(
     return &impl->base;
 }
 
+#if !defined(_WIN32)
+/*
+ * memory-mapped file input stream, for uploads from send_filepath with send_filepath_mmap.
+ * Reads are a memcpy out of the page cache, instead of a read() syscall and a copy through stdio's buffer,
+ * and the kernel is told how the file will be read, so it can read ahead.
+ */
+struct aws_input_py_stream_mmap_impl {
+    struct aws_input_stream base;
+    struct s3_meta_request_binding *binding;
+    /* Kept open to check the file's size before each read */
+    int fd;
+    uint8_t *data;
+    size_t length;
+    size_t position;
+    /* Everything before this offset has already been advised with MADV_WILLNEED */
+    size_t advised_until;
+};
+
+/* How far ahead of the read position to ask the kernel to read the file in */
+static const size_t s_mmap_read_ahead = 32 * 1024 * 1024;
+
+static int s_aws_input_stream_mmap_read(struct aws_input_stream *stream, struct aws_byte_buf *dest) {
+    struct aws_input_py_stream_mmap_impl *impl = AWS_CONTAINER_OF(stream, struct aws_input_py_stream_mmap_impl, base);
+
+    size_t actually_read = aws_min_size(dest->capacity - dest->len, impl->length - impl->position);
+    if (actually_read == 0) {
+        return AWS_OP_SUCCESS;
+    }
+
+    /* Touching a page beyond the end of the file raises SIGBUS, so fail the read if the file has shrunk */
+    struct stat file_stat;
+    if (fstat(impl->fd, &file_stat)) {
+        return aws_translate_and_raise_io_error(errno);
+    }
+    if ((uint64_t)file_stat.st_size < (uint64_t)(impl->position + actually_read)) {
+        return aws_raise_error(AWS_IO_STREAM_READ_FAILED);
+    }
+
+    /* Keep the kernel reading ahead of us. It's only advice, so failure doesn't matter. */
+    size_t read_ahead_end = aws_min_size(impl->position + actually_read + s_mmap_read_ahead, impl->length);
+    if (read_ahead_end > impl->advised_until) {
+        size_t page_size = (size_t)sysconf(_SC_PAGESIZE);
+        size_t advise_start = impl->advised_until - (impl->advised_until % page_size);
+        (void)madvise(impl->data + advise_start, read_ahead_end - advise_start, MADV_WILLNEED);
+        impl->advised_until = read_ahead_end;
+    }
+
+    struct aws_byte_cursor data_read = aws_byte_cursor_from_array(impl->data + impl->position, actually_read);
+    aws_byte_buf_write_from_whole_cursor(dest, data_read);
+    impl->position += actually_read;
+
+    return s_record_read(impl->binding, data_read);
+}
+
+static int s_aws_input_stream_mmap_seek(
+    struct aws_input_stream *stream,
+    int64_t offset,
+    enum aws_stream_seek_basis basis) {
+    struct aws_input_py_stream_mmap_impl *impl = AWS_CONTAINER_OF(stream, struct aws_input_py_stream_mmap_impl, base);
+
+    uint64_t position = basis == AWS_SSB_BEGIN ? 0 : (uint64_t)impl->length;
+    if (offset < 0) {
+        /* written this way so INT64_MIN doesn't overflow */
+        uint64_t back = (uint64_t)(-(offset + 1)) + 1;
+        if (back > position) {
+            return aws_raise_error(AWS_IO_STREAM_INVALID_SEEK_POSITION);
+        }
+        position -= back;
+    } else {
+        if ((uint64_t)offset > impl->length - position) {
+            return aws_raise_error(AWS_IO_STREAM_INVALID_SEEK_POSITION);
+        }
+        position += (uint64_t)offset;
+    }
+    impl->position = (size_t)position;
+    impl->advised_until = aws_max_size(impl->advised_until, impl->position);
+    return s_record_seek(impl->binding, offset, basis);
+}
+
+static int s_aws_input_stream_mmap_get_status(struct aws_input_stream *stream, struct aws_stream_status *status) {
+    struct aws_input_py_stream_mmap_impl *impl = AWS_CONTAINER_OF(stream, struct aws_input_py_stream_mmap_impl, base);
+    status->is_valid = true;
+    status->is_end_of_stream = impl->position == impl->length;
+    return AWS_OP_SUCCESS;
+}
+
+static int s_aws_input_stream_mmap_get_length(struct aws_input_stream *stream, int64_t *length) {
+    struct aws_input_py_stream_mmap_impl *impl = AWS_CONTAINER_OF(stream, struct aws_input_py_stream_mmap_impl, base);
+    *length = (int64_t)impl->length;
+    return AWS_OP_SUCCESS;
+}
+
+static void s_aws_input_stream_mmap_destroy(struct aws_input_py_stream_mmap_impl *impl) {
+    munmap(impl->data, impl->length);
+    close(impl->fd);
+    aws_mem_release(aws_py_get_allocator(), impl);
+}
+
+static struct aws_input_stream_vtable s_aws_input_stream_mmap_vtable = {
+    .seek = s_aws_input_stream_mmap_seek,
+    .read = s_aws_input_stream_mmap_read,
+    .get_status = s_aws_input_stream_mmap_get_status,
+    .get_length = s_aws_input_stream_mmap_get_length,
+};
+
+/* Returns NULL, without raising an error, if the file can't be mapped (ex: it's empty, or not a regular file).
+ * The caller should fall back to reading the file normally. */
+static struct aws_input_stream *s_input_stream_new_from_mmap(
+    struct aws_allocator *allocator,
+    const char *file_name,
+    struct s3_meta_request_binding *request_binding) {
+
+    int fd = open(file_name, O_RDONLY);
+    if (fd < 0) {
+        return NULL;
+    }
+    struct stat file_stat;
+    if (fstat(fd, &file_stat) || !S_ISREG(file_stat.st_mode) || file_stat.st_size <= 0 ||
+        (uint64_t)file_stat.st_size > SIZE_MAX) {
+        close(fd);
+        return NULL;
+    }
+    size_t length = (size_t)file_stat.st_size;
+    void *data = mmap(NULL, length, PROT_READ, MAP_SHARED, fd, 0);
+    if (data == MAP_FAILED) {
+        close(fd);
+        return NULL;
+    }
+    (void)madvise(data, length, MADV_SEQUENTIAL);
+
+    struct aws_input_py_stream_mmap_impl *impl =
+        aws_mem_calloc(allocator, 1, sizeof(struct aws_input_py_stream_mmap_impl));
+    impl->base.vtable = &s_aws_input_stream_mmap_vtable;
+    aws_ref_count_init(&impl->base.ref_count, impl, (aws_simple_completion_callback *)s_aws_input_stream_mmap_destroy);
+    impl->binding = request_binding;
+    impl->fd = fd;
+    impl->data = data;
+    impl->length = length;
+
+    return &impl->base;
+}
+#endif /* !_WIN32 */
+
 /* Copy an existing HTTP message without body. */
 struct aws_http_message *s_copy_http_message(struct aws_allocator *allocator, struct aws_http_message *base_message) {
     AWS_PRECONDITION(allocator);
@@ -481,10 +1157,21 @@ PyObject *aws_py_s3_client_make_meta_request(PyObject *self, PyObject *args) {
     const char *send_filepath;
     const char *region;
     Py_ssize_t region_len;
+    int reuse_body_buffer;
+    int use_buffer_pool;
+    unsigned long long progress_interval_bytes;
+    unsigned long long progress_interval_ms;
+    int manual_read_window;
+    int send_filepath_mmap;
+    int checksum_algorithm;
+    int checksum_location;
+    int validate_response_checksum;
+    unsigned long long resume_recv_file_offset;
+    int report_parts;
     PyObject *py_core = NULL;
     if (!PyArg_ParseTuple(
             args,
-            "OOOiOzzs#O",
+            "OOOiOzzs#ppKKppiipKpO",
             &py_s3_request,
             &s3_client_py,
             &http_request_py,
@@ -494,6 +1181,17 @@ PyObject *aws_py_s3_client_make_meta_request(PyObject *self, PyObject *args) {
             &send_filepath,
             &region,
             &region_len,
+            &reuse_body_buffer,
+            &use_buffer_pool,
+            &progress_interval_bytes,
+            &progress_interval_ms,
+            &manual_read_window,
+            &send_filepath_mmap,
+            &checksum_algorithm,
+            &checksum_location,
+            &validate_response_checksum,
+            &resume_recv_file_offset,
+            &report_parts,
             &py_core)) {
         return NULL;
     }
@@ -539,19 +1237,60 @@ PyObject *aws_py_s3_client_make_meta_request(PyObject *self, PyObject *args) {
     meta_request->py_core = py_core;
     Py_INCREF(meta_request->py_core);
 
+    meta_request->reuse_body_buffer = reuse_body_buffer != 0;
+    meta_request->use_buffer_pool = use_buffer_pool != 0;
+    meta_request->report_parts = report_parts != 0;
+    meta_request->progress_interval_bytes = progress_interval_bytes;
+    meta_request->progress_interval_ns =
+        aws_timestamp_convert(progress_interval_ms, AWS_TIMESTAMP_MILLIS, AWS_TIMESTAMP_NANOS, NULL);
+    meta_request->auto_increment_read_window = manual_read_window == 0;
+
+    if (type != AWS_S3_META_REQUEST_TYPE_GET_OBJECT) {
+        /* For downloads, the algorithm only picks the checksum computed over the whole object, below */
+        meta_request->checksum_config.checksum_algorithm = checksum_algorithm;
+        meta_request->checksum_config.location = checksum_location;
+    }
+    meta_request->checksum_config.validate_response_checksum = validate_response_checksum != 0;
+    /* Compute a checksum of the whole object, for uploads from send_filepath and for downloads */
+    if (type == AWS_S3_META_REQUEST_TYPE_GET_OBJECT ||
+        (type == AWS_S3_META_REQUEST_TYPE_PUT_OBJECT && send_filepath)) {
+        meta_request->object_checksum_algorithm = checksum_algorithm;
+    }
+    if (s_object_checksum_reset(meta_request)) {
+        PyErr_SetAwsLastError();
+        goto error;
+    }
+
     if (recv_filepath) {
-        meta_request->recv_file = aws_fopen(recv_filepath, "wb+");
+        /* When resuming, keep what's already been downloaded, the rest is written after it */
+        meta_request->recv_file = aws_fopen(recv_filepath, resume_recv_file_offset ? "rb+" : "wb+");
+        meta_request->recv_file_resumed = resume_recv_file_offset != 0;
         if (!meta_request->recv_file) {
             aws_translate_and_raise_io_error(errno);
             PyErr_SetAwsLastError();
             goto error;
         }
+        /* The response only has the rest of the object, so checksum what was already downloaded first */
+        if (s_object_checksum_update_from_file(meta_request, meta_request->recv_file, resume_recv_file_offset)) {
+            PyErr_SetAwsLastError();
+            goto error;
+        }
     }
     if (send_filepath) {
         if (type == AWS_S3_META_REQUEST_TYPE_PUT_OBJECT) {
             /* Copy the http request from python object and replace the old pointer with new pointer */
             meta_request->copied_message = s_copy_http_message(allocator, http_request);
-            struct aws_input_stream *input_body = s_input_stream_new_from_file(allocator, send_filepath, meta_request);
+            struct aws_input_stream *input_body = NULL;
+#if !defined(_WIN32)
+            if (send_filepath_mmap) {
+                input_body = s_input_stream_new_from_mmap(allocator, send_filepath, meta_request);
+            }
+#else
+            (void)send_filepath_mmap;
+#endif
+            if (!input_body) {
+                input_body = s_input_stream_new_from_file(allocator, send_filepath, meta_request);
+            }
             if (!input_body) {
                 PyErr_SetAwsLastError();
                 goto error;
@@ -571,6 +1310,7 @@ PyObject *aws_py_s3_client_make_meta_request(PyObject *self, PyObject *args) {
         .body_callback = s_s3_request_on_body,
         .finish_callback = s_s3_request_on_finish,
         .shutdown_callback = s_s3_request_on_shutdown,
+        .checksum_config = &meta_request->checksum_config,
         .user_data = meta_request,
     };
 
@@ -608,3 +1348,22 @@ PyObject *aws_py_s3_meta_request_cancel(PyObject *self, PyObject *args) {
 
     Py_RETURN_NONE;
 }
+
+PyObject *aws_py_s3_meta_request_increment_read_window(PyObject *self, PyObject *args) {
+    (void)self;
+
+    PyObject *py_meta_request = NULL;
+    unsigned long long size;
+    if (!PyArg_ParseTuple(args, "OK", &py_meta_request, &size)) {
+        return NULL;
+    }
+
+    struct aws_s3_meta_request *meta_request = aws_py_get_s3_meta_request(py_meta_request);
+    if (!meta_request) {
+        return NULL;
+    }
+
+    aws_s3_meta_request_increment_read_window(meta_request, (uint64_t)size);
+
+    Py_RETURN_NONE;
+}
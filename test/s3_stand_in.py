@@ -0,0 +1,426 @@
+"""
+In-process stand-in for S3, for testing and benchmarking without network access.
+
+It speaks enough of the S3 REST API for :class:`awscrt.s3.S3Client`:
+GetObject (with a Range), HeadObject, PutObject, CopyObject, multipart uploads
+(including UploadPartCopy), and ListObjectsV2. Requests aren't authenticated,
+every bucket is the same bucket, and objects are kept in memory.
+Latency and errors can be injected, to exercise timeouts and retries.
+"""
+
+# Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.
+# SPDX-License-Identifier: Apache-2.0.
+
+import hashlib
+import random
+import threading
+import time
+import uuid
+import xml.etree.ElementTree as ElementTree
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qsl, unquote, urlsplit
+
+_XML_NS = 'http://s3.amazonaws.com/doc/2006-03-01/'
+
+
+class S3StandIn:
+    """In-process S3 stand-in, serving plain HTTP on a background thread.
+
+    Point a client at it with a ``host`` header of :attr:`endpoint` and
+    ``tls_mode=S3RequestTlsMode.DISABLED``.
+
+    Args:
+        latency (float): Seconds to wait before responding to each request.
+
+        error_rate (float): Fraction (0.0 to 1.0) of requests that fail with a 503 SlowDown,
+            which clients are expected to retry.
+
+        seed (Optional[int]): Seed for picking which requests fail, for repeatable runs.
+
+        host (str): Address to listen on.
+
+        port (int): Port to listen on. If 0, a free port is picked.
+    """
+
+    def __init__(self, latency=0.0, error_rate=0.0, seed=None, host='127.0.0.1', port=0):
+        self.latency = latency
+        self.error_rate = error_rate
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        # key -> _StoredObject
+        self._objects = {}
+        # upload ID -> _MultipartUpload
+        self._uploads = {}
+        self._errors_to_inject = []
+        self._stats = {
+            'requests': 0,
+            'errors_injected': 0,
+            'bytes_sent': 0,
+            'bytes_received': 0,
+        }
+
+        handler = type('_BoundHandler', (_S3StandInHandler,), {'stand_in': self})
+        self._server = ThreadingHTTPServer((host, port), handler)
+        self._server.daemon_threads = True
+        self._thread = None
+
+    @property
+    def endpoint(self):
+        """str: "host:port" the stand-in is listening on"""
+        host, port = self._server.server_address[:2]
+        return '{}:{}'.format(host, port)
+
+    def start(self):
+        self._thread = threading.Thread(target=self._server.serve_forever, name='S3StandIn', daemon=True)
+        self._thread.start()
+        return self
+
+    def close(self):
+        if self._thread is not None:
+            self._server.shutdown()
+            self._thread.join()
+            self._thread = None
+        self._server.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def put_object(self, key, data):
+        """Store an object, as if it had been uploaded"""
+        with self._lock:
+            self._objects[key.lstrip('/')] = _StoredObject(bytes(data))
+
+    def get_object(self, key):
+        """Returns the object's data, or None if there's no such object"""
+        with self._lock:
+            stored = self._objects.get(key.lstrip('/'))
+        return stored.data if stored is not None else None
+
+    def keys(self):
+        """Returns the keys of all objects, sorted"""
+        with self._lock:
+            return sorted(self._objects)
+
+    def inject_errors(self, count, status=503, code='SlowDown'):
+        """Fail the next `count` requests with the given status and S3 error code"""
+        with self._lock:
+            self._errors_to_inject.extend([(status, code)] * count)
+
+    @property
+    def stats(self):
+        """dict: Snapshot of counters: requests, errors_injected, bytes_sent, bytes_received,
+        and the number of requests for each operation (ex: "GetObject")"""
+        with self._lock:
+            return dict(self._stats)
+
+    def _count(self, **counts):
+        with self._lock:
+            for name, count in counts.items():
+                self._stats[name] = self._stats.get(name, 0) + count
+
+    def _next_error(self):
+        with self._lock:
+            if self._errors_to_inject:
+                return self._errors_to_inject.pop(0)
+            if self.error_rate and self._random.random() < self.error_rate:
+                return (503, 'SlowDown')
+        return None
+
+
+class _StoredObject:
+    __slots__ = ('data', 'etag')
+
+    def __init__(self, data, etag=None):
+        self.data = data
+        self.etag = etag or '"{}"'.format(hashlib.md5(data).hexdigest())
+
+
+class _MultipartUpload:
+    __slots__ = ('key', 'parts')
+
+    def __init__(self, key):
+        self.key = key
+        # part number -> _StoredObject
+        self.parts = {}
+
+
+class _S3Error(Exception):
+    def __init__(self, status, code, message=''):
+        super().__init__(message or code)
+        self.status = status
+        self.code = code
+
+
+class _S3StandInHandler(BaseHTTPRequestHandler):
+    # keep connections alive, clients pool them
+    protocol_version = 'HTTP/1.1'
+    stand_in = None
+
+    def log_message(self, format, *args):
+        pass
+
+    def do_GET(self):
+        self._handle()
+
+    def do_HEAD(self):
+        self._handle()
+
+    def do_PUT(self):
+        self._handle()
+
+    def do_POST(self):
+        self._handle()
+
+    def do_DELETE(self):
+        self._handle()
+
+    def _handle(self):
+        stand_in = self.stand_in
+        try:
+            body = self._read_body()
+        except _S3Error as e:
+            self._send_error(e)
+            return
+        stand_in._count(requests=1, bytes_received=len(body))
+        if stand_in.latency:
+            time.sleep(stand_in.latency)
+
+        error = stand_in._next_error()
+        if error is not None:
+            stand_in._count(errors_injected=1)
+            self._send_error(_S3Error(*error))
+            return
+
+        url = urlsplit(self.path)
+        key = unquote(url.path).lstrip('/')
+        query = dict(parse_qsl(url.query, keep_blank_values=True))
+        try:
+            operation, handler = self._route(key, query)
+            stand_in._count(**{operation: 1})
+            handler(key, query, body)
+        except _S3Error as e:
+            self._send_error(e)
+
+    def _route(self, key, query):
+        method = self.command
+        if method in ('GET', 'HEAD') and not key:
+            return 'ListObjectsV2', self._list_objects
+        if method == 'GET':
+            return 'GetObject', self._get_object
+        if method == 'HEAD':
+            return 'HeadObject', self._get_object
+        if method == 'POST' and 'uploads' in query:
+            return 'CreateMultipartUpload', self._create_multipart_upload
+        if method == 'POST' and 'uploadId' in query:
+            return 'CompleteMultipartUpload', self._complete_multipart_upload
+        if method == 'PUT' and 'uploadId' in query:
+            if self.headers.get('x-amz-copy-source'):
+                return 'UploadPartCopy', self._upload_part
+            return 'UploadPart', self._upload_part
+        if method == 'PUT':
+            if self.headers.get('x-amz-copy-source'):
+                return 'CopyObject', self._put_object
+            return 'PutObject', self._put_object
+        if method == 'DELETE' and 'uploadId' in query:
+            return 'AbortMultipartUpload', self._abort_multipart_upload
+        if method == 'DELETE':
+            return 'DeleteObject', self._delete_object
+        raise _S3Error(501, 'NotImplemented')
+
+    def _read_body(self):
+        if self.headers.get('Transfer-Encoding'):
+            # aws-chunked/chunked bodies (ex: trailing checksums) aren't supported
+            self.close_connection = True
+            raise _S3Error(501, 'NotImplemented', 'Transfer-Encoding is not supported')
+        length = int(self.headers.get('Content-Length') or 0)
+        return self.rfile.read(length) if length else b''
+
+    def _get_object(self, key, query, body):
+        stored = self._find_object(key)
+        if_match = self.headers.get('If-Match')
+        if if_match is not None and if_match != stored.etag:
+            raise _S3Error(412, 'PreconditionFailed')
+
+        data = memoryview(stored.data)
+        headers = [('ETag', stored.etag), ('Accept-Ranges', 'bytes')]
+        byte_range = _parse_range(self.headers.get('Range'), len(data))
+        status = 200
+        if byte_range is not None:
+            start, end = byte_range
+            headers.append(('Content-Range', 'bytes {}-{}/{}'.format(start, end - 1, len(data))))
+            data = data[start:end]
+            status = 206
+        self._send(status, headers, data, content_length=len(data))
+
+    def _put_object(self, key, query, body):
+        copy_source = self.headers.get('x-amz-copy-source')
+        if copy_source:
+            stored = self._find_object(_copy_source_key(copy_source))
+            with self.stand_in._lock:
+                self.stand_in._objects[key] = stored
+            self._send_xml(200, 'CopyObjectResult', [('ETag', stored.etag)])
+            return
+
+        stored = _StoredObject(body)
+        with self.stand_in._lock:
+            self.stand_in._objects[key] = stored
+        self._send(200, [('ETag', stored.etag)])
+
+    def _delete_object(self, key, query, body):
+        with self.stand_in._lock:
+            self.stand_in._objects.pop(key, None)
+        self._send(204, [])
+
+    def _create_multipart_upload(self, key, query, body):
+        upload_id = uuid.uuid4().hex
+        with self.stand_in._lock:
+            self.stand_in._uploads[upload_id] = _MultipartUpload(key)
+        self._send_xml(200, 'InitiateMultipartUploadResult', [('Key', key), ('UploadId', upload_id)])
+
+    def _upload_part(self, key, query, body):
+        upload = self._find_upload(key, query)
+        try:
+            part_number = int(query.get('partNumber', ''))
+        except ValueError:
+            part_number = 0
+        if not 1 <= part_number <= 10000:
+            raise _S3Error(400, 'InvalidArgument', 'partNumber must be between 1 and 10000')
+
+        copy_source = self.headers.get('x-amz-copy-source')
+        if copy_source:
+            source = self._find_object(_copy_source_key(copy_source))
+            byte_range = _parse_range(self.headers.get('x-amz-copy-source-range'), len(source.data))
+            start, end = byte_range if byte_range is not None else (0, len(source.data))
+            part = _StoredObject(source.data[start:end])
+        else:
+            part = _StoredObject(body)
+        with self.stand_in._lock:
+            upload.parts[part_number] = part
+
+        if copy_source:
+            self._send_xml(200, 'CopyPartResult', [('ETag', part.etag)])
+        else:
+            self._send(200, [('ETag', part.etag)])
+
+    def _complete_multipart_upload(self, key, query, body):
+        upload = self._find_upload(key, query)
+        try:
+            root = ElementTree.fromstring(body)
+        except ElementTree.ParseError:
+            raise _S3Error(400, 'MalformedXML')
+
+        parts = []
+        for element in root.iter():
+            if element.tag.rsplit('}', 1)[-1] != 'Part':
+                continue
+            fields = {child.tag.rsplit('}', 1)[-1]: (child.text or '') for child in element}
+            part = upload.parts.get(int(fields.get('PartNumber', 0)))
+            if part is None or part.etag.strip('"') != fields.get('ETag', '').strip('"'):
+                raise _S3Error(400, 'InvalidPart')
+            parts.append(part)
+        if not parts:
+            raise _S3Error(400, 'MalformedXML')
+
+        md5s = b''.join(bytes.fromhex(part.etag.strip('"')) for part in parts)
+        etag = '"{}-{}"'.format(hashlib.md5(md5s).hexdigest(), len(parts))
+        stored = _StoredObject(b''.join(part.data for part in parts), etag)
+        with self.stand_in._lock:
+            self.stand_in._objects[key] = stored
+            self.stand_in._uploads.pop(query['uploadId'], None)
+        self._send_xml(200, 'CompleteMultipartUploadResult', [('Key', key), ('ETag', etag)])
+
+    def _abort_multipart_upload(self, key, query, body):
+        self._find_upload(key, query)
+        with self.stand_in._lock:
+            self.stand_in._uploads.pop(query['uploadId'], None)
+        self._send(204, [])
+
+    def _list_objects(self, key, query, body):
+        prefix = query.get('prefix', '')
+        max_keys = int(query.get('max-keys', 1000))
+        start_after = query.get('continuation-token') or query.get('start-after', '')
+        with self.stand_in._lock:
+            matches = sorted((k, v) for k, v in self.stand_in._objects.items()
+                             if k.startswith(prefix) and k > start_after)
+        page = matches[:max_keys]
+        truncated = len(matches) > max_keys
+
+        root = ElementTree.Element('ListBucketResult', xmlns=_XML_NS)
+        ElementTree.SubElement(root, 'Prefix').text = prefix
+        ElementTree.SubElement(root, 'KeyCount').text = str(len(page))
+        ElementTree.SubElement(root, 'IsTruncated').text = 'true' if truncated else 'false'
+        if truncated:
+            ElementTree.SubElement(root, 'NextContinuationToken').text = page[-1][0]
+        for object_key, stored in page:
+            contents = ElementTree.SubElement(root, 'Contents')
+            ElementTree.SubElement(contents, 'Key').text = object_key
+            ElementTree.SubElement(contents, 'Size').text = str(len(stored.data))
+            ElementTree.SubElement(contents, 'ETag').text = stored.etag
+        self._send(200, [('Content-Type', 'application/xml')], ElementTree.tostring(root))
+
+    def _find_object(self, key):
+        with self.stand_in._lock:
+            stored = self.stand_in._objects.get(key)
+        if stored is None:
+            raise _S3Error(404, 'NoSuchKey')
+        return stored
+
+    def _find_upload(self, key, query):
+        with self.stand_in._lock:
+            upload = self.stand_in._uploads.get(query.get('uploadId'))
+        if upload is None or upload.key != key:
+            raise _S3Error(404, 'NoSuchUpload')
+        return upload
+
+    def _send_xml(self, status, root_tag, fields):
+        root = ElementTree.Element(root_tag, xmlns=_XML_NS)
+        for name, value in fields:
+            ElementTree.SubElement(root, name).text = value
+        self._send(status, [('Content-Type', 'application/xml')], ElementTree.tostring(root))
+
+    def _send_error(self, error):
+        root = ElementTree.Element('Error')
+        ElementTree.SubElement(root, 'Code').text = error.code
+        ElementTree.SubElement(root, 'Message').text = str(error)
+        self._send(error.status, [('Content-Type', 'application/xml')], ElementTree.tostring(root))
+
+    def _send(self, status, headers, body=b'', content_length=None):
+        self.send_response(status)
+        for name, value in headers:
+            self.send_header(name, value)
+        self.send_header('Content-Length', str(len(body) if content_length is None else content_length))
+        self.end_headers()
+        if body and self.command != 'HEAD':
+            self.wfile.write(body)
+            self.stand_in._count(bytes_sent=len(body))
+
+
+def _parse_range(value, size):
+    # Returns (start, end) with end exclusive, or None if there's no range. Only single ranges are supported.
+    if value is None:
+        return None
+    try:
+        unit, _, spec = value.partition('=')
+        first, _, last = spec.strip().partition('-')
+        if unit.strip() != 'bytes' or ',' in spec:
+            raise ValueError()
+        if not first:
+            # suffix range: the last N bytes
+            start, end = max(size - int(last), 0), size
+        else:
+            start = int(first)
+            end = min(int(last) + 1, size) if last else size
+    except ValueError:
+        raise _S3Error(400, 'InvalidArgument', 'malformed range: ' + value)
+    if start >= end:
+        raise _S3Error(416, 'InvalidRange')
+    return start, end
+
+
+def _copy_source_key(copy_source):
+    # "/bucket/key" or "bucket/key", URL encoded, maybe with "?versionId=..."
+    path = unquote(copy_source.split('?', 1)[0]).lstrip('/')
+    return path.split('/', 1)[1] if '/' in path else ''
@@ -1,8 +1,12 @@
 # Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.
 # SPDX-License-Identifier: Apache-2.0.
 
+import asyncio
 import awscrt.exceptions
-from awscrt.http import HttpClientConnection, HttpClientStream, HttpHeaders, HttpProxyOptions, HttpRequest, HttpVersion
+import ctypes
+from awscrt.http import HttpClientConnection, HttpClientConnectionManager
+from awscrt.http import HttpHeaders, HttpProxyOptions, HttpRequest, HttpVersion
+from awscrt.http import Http2ClientConnection, Http2Setting, Http2SettingID
 from awscrt.io import ClientBootstrap, ClientTlsContext, DefaultHostResolver, EventLoopGroup, TlsConnectionOptions, TlsContextOptions, TlsCipherPref
 from concurrent.futures import Future
 from http.server import HTTPServer, SimpleHTTPRequestHandler
@@ -11,6 +15,7 @@ import os
 import ssl
 from test import NativeResourceTest
 import threading
+import time
 import unittest
 from urllib.parse import urlparse
 
@@ -43,6 +48,25 @@ class TestRequestHandler(SimpleHTTPRequestHandler):
         self.end_headers()
 
 
+class TestHttp2Settings(unittest.TestCase):
+    class _Connection:
+        UNLIMITED_CONCURRENT_STREAMS = Http2ClientConnection.UNLIMITED_CONCURRENT_STREAMS
+        max_concurrent_streams = Http2ClientConnection.max_concurrent_streams
+
+        def __init__(self, remote_settings):
+            self.remote_settings = remote_settings
+
+        def get_remote_settings(self):
+            return self.remote_settings
+
+    def test_max_concurrent_streams(self):
+        connection = self._Connection([Http2Setting(Http2SettingID.MAX_CONCURRENT_STREAMS, 100)])
+        self.assertEqual(100, connection.max_concurrent_streams)
+        # the peer never limited it
+        connection = self._Connection([Http2Setting(Http2SettingID.ENABLE_PUSH, 0)])
+        self.assertEqual(2**32 - 1, connection.max_concurrent_streams)
+
+
 class TestClient(NativeResourceTest):
     hostname = 'localhost'
     timeout = 10  # seconds
@@ -74,7 +98,7 @@ class TestClient(NativeResourceTest):
         self.server.server_close()
         self.server_thread.join()
 
-    def _new_client_connection(self, secure, proxy_options=None, cipher_pref=TlsCipherPref.DEFAULT):
+    def _new_client_connection(self, secure, proxy_options=None, cipher_pref=TlsCipherPref.DEFAULT, **kwargs):
         if secure:
             tls_ctx_opt = TlsContextOptions()
             tls_ctx_opt.cipher_pref = cipher_pref
@@ -92,7 +116,8 @@ class TestClient(NativeResourceTest):
                                                      port=self.port,
                                                      bootstrap=bootstrap,
                                                      tls_connection_options=tls_conn_opt,
-                                                     proxy_options=proxy_options)
+                                                     proxy_options=proxy_options,
+                                                     **kwargs)
         return connection_future.result(self.timeout)
 
     def _test_connect(self, secure, cipher_pref=TlsCipherPref.DEFAULT):
@@ -180,6 +205,100 @@ class TestClient(NativeResourceTest):
     def test_get_https(self):
         self._test_get(secure=True)
 
+    def _test_get_reuse_body_buffer(self, secure):
+        self._start_server(secure)
+        try:
+            connection = self._new_client_connection(secure)
+
+            test_asset_path = 'test/test_http_client.py'
+            request = HttpRequest('GET', '/' + test_asset_path)
+            response = Response()
+            chunk_types = set()
+
+            def on_body(http_stream, chunk, **kwargs):
+                chunk_types.add(type(chunk))
+                response.on_body(http_stream, chunk)
+
+            stream = connection.request(request, response.on_response, on_body, reuse_body_buffer=True)
+            stream.activate()
+            self.assertEqual(200, stream.completion_future.result(self.timeout))
+
+            self.assertEqual({memoryview}, chunk_types)
+            with open(test_asset_path, 'rb') as test_asset:
+                self.assertEqual(test_asset.read(), response.body)
+
+            # keeping exports of the chunks past the callback is safe, their data must not be overwritten
+            exports = []
+
+            def on_body_keeping_export(http_stream, chunk, **kwargs):
+                # ctypes holds a real buffer export of the chunk for as long as the array lives
+                exports.append((ctypes.c_char * len(chunk)).from_buffer(chunk))
+
+            request = HttpRequest('GET', '/' + test_asset_path)
+            stream = connection.request(request, on_body=on_body_keeping_export, reuse_body_buffer=True)
+            stream.activate()
+            self.assertEqual(200, stream.completion_future.result(self.timeout))
+            self.assertEqual(response.body, b''.join(bytes(export) for export in exports))
+
+            self.assertEqual(None, connection.close().exception(self.timeout))
+
+        finally:
+            self._stop_server()
+
+    def test_get_reuse_body_buffer_http(self):
+        self._test_get_reuse_body_buffer(secure=False)
+
+    def test_get_reuse_body_buffer_https(self):
+        self._test_get_reuse_body_buffer(secure=True)
+
+    def _test_manual_window_management(self, secure):
+        self._start_server(secure)
+        try:
+            initial_window_size = 1024
+            connection = self._new_client_connection(secure,
+                                                     manual_window_management=True,
+                                                     initial_window_size=initial_window_size)
+
+            test_asset_path = 'test/test_http_client.py'
+            request = HttpRequest('GET', '/' + test_asset_path)
+            response = Response()
+            first_body_future = Future()
+
+            def on_body(http_stream, chunk, **kwargs):
+                response.on_body(http_stream, chunk)
+                if not first_body_future.done():
+                    first_body_future.set_result(None)
+
+            stream = connection.request(request, response.on_response, on_body)
+            stream.activate()
+
+            # body stops arriving once the window is used up
+            first_body_future.result(self.timeout)
+            time.sleep(0.5)
+            self.assertFalse(stream.completion_future.done())
+            self.assertLessEqual(len(response.body), initial_window_size)
+
+            with open(test_asset_path, 'rb') as test_asset:
+                test_asset_bytes = test_asset.read()
+
+            stream.update_window(len(test_asset_bytes))
+            self.assertEqual(200, stream.completion_future.result(self.timeout))
+            self.assertEqual(test_asset_bytes, response.body)
+
+            with self.assertRaises(ValueError):
+                stream.update_window(-1)
+
+            self.assertEqual(None, connection.close().exception(self.timeout))
+
+        finally:
+            self._stop_server()
+
+    def test_manual_window_management_http(self):
+        self._test_manual_window_management(secure=False)
+
+    def test_manual_window_management_https(self):
+        self._test_manual_window_management(secure=True)
+
     def _test_shutdown_error(self, secure):
         # Use HTTP/1.0 connection to force a SOCKET_CLOSED error after request completes
         self._start_server(secure, http_1_0=True)
@@ -328,6 +447,135 @@ class TestClient(NativeResourceTest):
     def test_stream_cleans_up_if_never_activated_https(self):
         self._test_stream_cleans_up_if_never_activated(secure=True)
 
+    def _new_connection_manager(self, secure, max_connections=2, **kwargs):
+        if secure:
+            tls_ctx_opt = TlsContextOptions()
+            tls_ctx_opt.verify_peer = False
+            tls_ctx = ClientTlsContext(tls_ctx_opt)
+            tls_conn_opt = tls_ctx.new_connection_options()
+            tls_conn_opt.set_server_name(self.hostname)
+        else:
+            tls_conn_opt = None
+
+        event_loop_group = EventLoopGroup()
+        host_resolver = DefaultHostResolver(event_loop_group)
+        bootstrap = ClientBootstrap(event_loop_group, host_resolver)
+        return HttpClientConnectionManager(host_name=self.hostname,
+                                           port=self.port,
+                                           bootstrap=bootstrap,
+                                           tls_connection_options=tls_conn_opt,
+                                           max_connections=max_connections,
+                                           **kwargs)
+
+    def _test_connection_manager(self, secure):
+        self._start_server(secure)
+        try:
+            manager = self._new_connection_manager(secure, max_connections=1)
+
+            connection = manager.acquire_connection().result(self.timeout)
+            self.assertTrue(connection.is_open())
+
+            # only 1 connection allowed, so a second acquisition waits for the first to be released
+            pending_future = manager.acquire_connection()
+            self.assertFalse(pending_future.done())
+            metrics = manager.get_metrics()
+            self.assertEqual(1, metrics.leased_connections)
+            self.assertEqual(1, metrics.pending_acquisitions)
+
+            test_asset_path = 'test/test_http_client.py'
+            request = HttpRequest('GET', '/' + test_asset_path)
+            response = Response()
+            stream = connection.request(request, response.on_response, response.on_body)
+            stream.activate()
+            self.assertEqual(200, stream.completion_future.result(self.timeout))
+
+            manager.release_connection(connection)
+            self.assertEqual(None, connection.shutdown_future.result(self.timeout))
+
+            # warm connection is reused
+            reused_connection = pending_future.result(self.timeout)
+            self.assertTrue(reused_connection.is_open())
+            metrics = manager.get_metrics()
+            self.assertEqual(1, metrics.leased_connections)
+            self.assertEqual(0, metrics.pending_acquisitions)
+
+            manager.release_connection(reused_connection)
+            self.assertEqual(1, manager.get_metrics().idle_connections)
+
+            # releasing twice is an error
+            with self.assertRaises(ValueError):
+                manager.release_connection(reused_connection)
+
+            # manager shuts down once it's garbage-collected and its connections are released
+            shutdown_future = manager.shutdown_future
+            del stream
+            del connection
+            del reused_connection
+            del manager
+            self.assertEqual(None, shutdown_future.result(self.timeout))
+
+        finally:
+            self._stop_server()
+
+    def test_connection_manager_http(self):
+        self._test_connection_manager(secure=False)
+
+    def test_connection_manager_https(self):
+        self._test_connection_manager(secure=True)
+
+    def _test_request_async(self, secure):
+        self._start_server(secure)
+        try:
+            # a small window, so the body only arrives as it's consumed
+            connection = self._new_client_connection(secure, manual_window_management=True, initial_window_size=1024)
+            manager = self._new_connection_manager(secure, manual_window_management=True, initial_window_size=1024)
+            test_asset_path = 'test/test_http_client.py'
+            with open(test_asset_path, 'rb') as test_asset:
+                test_asset_bytes = test_asset.read()
+
+            async def get_twice():
+                response = await connection.request_async(HttpRequest('GET', '/' + test_asset_path))
+                self.assertEqual(200, response.status_code)
+                self.assertEqual(str(len(test_asset_bytes)), HttpHeaders(response.headers).get('Content-Length'))
+                body = bytearray()
+                async for chunk in response:
+                    body.extend(chunk)
+                self.assertEqual(test_asset_bytes, body)
+
+                pooled_connection = await manager.acquire_connection_async()
+                try:
+                    response = await pooled_connection.request_async(HttpRequest('GET', '/' + test_asset_path))
+                    self.assertEqual(test_asset_bytes, await response.read())
+                finally:
+                    manager.release_connection(pooled_connection)
+
+                # closing credits the dropped body back to the window, so the stream still completes
+                response = await connection.request_async(HttpRequest('GET', '/' + test_asset_path))
+                response.close()
+                self.assertEqual(200, await asyncio.wrap_future(response.stream.completion_future))
+
+            asyncio.run(get_twice())
+
+            automatic_window_connection = self._new_client_connection(secure)
+
+            async def get_without_manual_window():
+                with self.assertRaises(ValueError):
+                    await automatic_window_connection.request_async(HttpRequest('GET', '/' + test_asset_path))
+
+            asyncio.run(get_without_manual_window())
+            self.assertEqual(None, automatic_window_connection.close().exception(self.timeout))
+
+            self.assertEqual(None, connection.close().exception(self.timeout))
+
+        finally:
+            self._stop_server()
+
+    def test_request_async_http(self):
+        self._test_request_async(secure=False)
+
+    def test_request_async_https(self):
+        self._test_request_async(secure=True)
+
     def _new_h2_client_connection(self, url):
         event_loop_group = EventLoopGroup()
         host_resolver = DefaultHostResolver(event_loop_group)
@@ -369,6 +617,54 @@ class TestClient(NativeResourceTest):
 
         self.assertEqual(None, connection.close().exception(self.timeout))
 
+    def test_h2_client_connection(self):
+        url = urlparse("https://d1cz66xoahf9cl.cloudfront.net/http_test_doc.txt")
+        event_loop_group = EventLoopGroup()
+        host_resolver = DefaultHostResolver(event_loop_group)
+        bootstrap = ClientBootstrap(event_loop_group, host_resolver)
+
+        tls_ctx = ClientTlsContext(TlsContextOptions())
+        tls_conn_opt = tls_ctx.new_connection_options()
+        tls_conn_opt.set_server_name(url.hostname)
+        tls_conn_opt.set_alpn_list(["h2"])
+
+        initial_settings = [Http2Setting(Http2SettingID.ENABLE_PUSH, 0),
+                            Http2Setting(Http2SettingID.INITIAL_WINDOW_SIZE, 65535)]
+        connection = Http2ClientConnection.new(host_name=url.hostname,
+                                               port=443,
+                                               bootstrap=bootstrap,
+                                               tls_connection_options=tls_conn_opt,
+                                               initial_settings=initial_settings).result(self.timeout)
+        self.assertEqual(connection.version, HttpVersion.Http2)
+        self.assertGreater(connection.max_concurrent_streams, 1)
+
+        self.assertGreaterEqual(connection.ping().result(self.timeout), 0.0)
+
+        connection.change_settings([Http2Setting(Http2SettingID.MAX_HEADER_LIST_SIZE, 65536)]).result(self.timeout)
+        local_settings = {setting.id: setting.value for setting in connection.get_local_settings()}
+        self.assertEqual(0, local_settings[Http2SettingID.ENABLE_PUSH])
+        self.assertEqual(65536, local_settings[Http2SettingID.MAX_HEADER_LIST_SIZE])
+
+        # several concurrent streams over the one connection
+        streams = []
+        responses = []
+        for i in range(4):
+            request = HttpRequest('GET', url.path)
+            request.headers.add('host', url.hostname)
+            response = Response()
+            stream = connection.request(request, response.on_response, response.on_body)
+            stream.activate()
+            streams.append(stream)
+            responses.append(response)
+        self.assertGreater(connection.active_stream_count, 0)
+
+        for stream, response in zip(streams, responses):
+            self.assertEqual(200, stream.completion_future.result(60))
+            self.assertEqual(14428801, len(response.body))
+        self.assertEqual(0, connection.active_stream_count)
+
+        self.assertEqual(None, connection.close().exception(self.timeout))
+
     @unittest.skipIf(not TlsCipherPref.PQ_TLSv1_0_2021_05.is_supported(), "Cipher pref not supported")
     def test_connect_pq_tlsv1_0_2021_05(self):
         self._test_connect(secure=True, cipher_pref=TlsCipherPref.PQ_TLSv1_0_2021_05)
@@ -1,16 +1,29 @@
 # Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.
 # SPDX-License-Identifier: Apache-2.0.
 
+import asyncio
+import functools
+import hashlib
+import io
 import unittest
 import os
 import tempfile
 import math
 import shutil
+import threading
+import time
 from test import NativeResourceTest
 from concurrent.futures import Future
 
 from awscrt.http import HttpHeaders, HttpRequest
-from awscrt.s3 import S3Client, S3RequestType
+from awscrt.checksums import crc32c
+from awscrt.common import get_cpu_group_count
+from awscrt.s3 import S3BufferPool, S3ChecksumAlgorithm, S3ChecksumConfig, S3Client
+from awscrt.s3 import S3RequestPriority, S3RequestTlsMode, S3RequestType
+from awscrt._asyncio import _AsyncChunkQueue, _AsyncSourceReader
+from awscrt.s3 import _S3AdaptiveTuner, _S3ObjectSummary, _S3PriorityScheduler, _S3RequestCore, _S3WarmUp
+from awscrt.s3 import _skip_unchanged
+from test.s3_stand_in import S3StandIn
 from awscrt.io import ClientBootstrap, ClientTlsContext, DefaultHostResolver, EventLoopGroup, TlsConnectionOptions, TlsContextOptions
 from awscrt.auth import AwsCredentialsProvider
 
@@ -68,7 +81,7 @@ class FileCreator(object):
         return os.path.join(self.rootdir, filename)
 
 
-def s3_client_new(secure, region, part_size=0):
+def s3_client_new(secure, region, part_size=0, **kwargs):
 
     event_loop_group = EventLoopGroup()
     host_resolver = DefaultHostResolver(event_loop_group)
@@ -85,7 +98,8 @@ def s3_client_new(secure, region, part_size=0):
         region=region,
         credential_provider=credential_provider,
         tls_connection_options=tls_option,
-        part_size=part_size)
+        part_size=part_size,
+        **kwargs)
 
     return s3_client
 
@@ -102,6 +116,577 @@ class FakeReadStream(object):
         return fake_data
 
 
+class S3BufferPoolTest(unittest.TestCase):
+    def test_acquire_release(self):
+        buffers = [bytearray(16), bytearray(16)]
+        pool = S3BufferPool(buffers)
+        self.assertEqual(2, pool.available)
+
+        buffer_a, view_a = pool.acquire()
+        buffer_b, view_b = pool.acquire()
+        self.assertEqual(0, pool.available)
+        self.assertIsNot(buffer_a, buffer_b)
+        view_a[0:3] = b'abc'
+        self.assertEqual(b'abc', bytes(buffer_a[0:3]))
+
+        with self.assertRaises(TimeoutError):
+            pool.acquire(timeout=0.01)
+
+        pool.release(buffer_a)
+        # a memoryview over the buffer is accepted too
+        pool.release(view_b[0:3])
+        self.assertEqual(2, pool.available)
+
+        # releasing twice would put the same buffer in the pool twice
+        with self.assertRaises(ValueError):
+            pool.release(buffer_a)
+        self.assertEqual(2, pool.available)
+
+    def test_request_core_delivers_into_pool(self):
+        # the binding copies each piece of a part into a buffer from _acquire_pool_buffer()
+        received = []
+        pool = S3BufferPool([bytearray(4)])
+        core = _S3RequestCore(None, Future(), threading.Event(), buffer_pool=pool,
+                              on_body=lambda chunk, offset, buffer, **kwargs: received.append(
+                                  (bytes(chunk), offset, buffer)))
+        view = core._acquire_pool_buffer()
+        view[:3] = b'abc'
+        core._on_body_pooled(view, 3, 10)
+        self.assertEqual([(b'abc', 10, view.obj)], received)
+        # the buffer is out of the pool until the user releases it
+        self.assertIsNone(core._acquire_pool_buffer())
+        core._on_body_unpooled(b'def', 13)
+        self.assertEqual((b'def', 13, None), received[-1])
+        pool.release(received[0][2])
+        self.assertEqual(1, pool.available)
+
+    def test_rejects_bad_buffers(self):
+        with self.assertRaises(ValueError):
+            S3BufferPool([])
+        with self.assertRaises(ValueError):
+            S3BufferPool([bytearray(0)])
+        with self.assertRaises((ValueError, TypeError)):
+            S3BufferPool([b'read-only'])
+        pool = S3BufferPool([bytearray(4)])
+        with self.assertRaises(ValueError):
+            pool.release(bytearray(4))
+
+
+class S3SkipUnchangedTest(unittest.TestCase):
+    def test_skip_unchanged(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            candidates = []
+            for i, (content, remote_content) in enumerate([
+                    (b'same', b'same'),
+                    (b'new!', b'old!'),
+                    (b'longer', b'short'),
+                    (b'missing', None)]):
+                path = os.path.join(tmpdir, str(i))
+                with open(path, 'wb') as f:
+                    f.write(content)
+                remote = None
+                if remote_content is not None:
+                    remote = _S3ObjectSummary(str(i), len(remote_content), hashlib.md5(remote_content).hexdigest())
+                candidates.append((str(i), path, len(content), remote))
+
+            changed = list(_skip_unchanged(iter(candidates), 5 * MB, max_workers=2))
+            self.assertEqual(['1', '2', '3'], sorted(key for key, path in changed))
+
+
+class S3AsyncUtilsTest(unittest.TestCase):
+    def test_source_reader_never_waits(self):
+        async def source():
+            yield b'abc'
+            await asyncio.sleep(0)
+            yield b'def'
+
+        async def read_all():
+            reader = _AsyncSourceReader(asyncio.get_running_loop(), source(), 1024)
+            buf = bytearray(16)
+            # nothing is buffered until the pump task runs
+            with self.assertRaises(BlockingIOError):
+                reader.readinto(buf)
+            data = bytearray()
+            while True:
+                try:
+                    n = reader.readinto(buf)
+                except BlockingIOError:
+                    await asyncio.sleep(0)
+                    continue
+                if n == 0:
+                    break
+                data.extend(buf[:n])
+            reader.close()
+            return bytes(data)
+
+        self.assertEqual(b'abcdef', asyncio.run(read_all()))
+
+    def test_chunk_queue_lets_go_of_on_consumed(self):
+        consumed = []
+
+        async def consume():
+            queue = _AsyncChunkQueue(asyncio.get_running_loop(), consumed.append)
+            queue.put(b'abc')
+            queue.put(b'de')
+            self.assertEqual(b'abc', await queue.get())
+            queue.close()
+            # dropped after close, still reported until finish()
+            self.assertFalse(queue.put(b'f'))
+            queue.finish()
+            self.assertIsNone(queue._on_consumed)
+            self.assertFalse(queue.put(b'g'))
+
+        asyncio.run(consume())
+        self.assertEqual([3, 2, 1], consumed)
+
+
+class S3AdaptiveTunerTest(unittest.TestCase):
+    class _Tuner(_S3AdaptiveTuner):
+        def _new_tier_client(self, part_size, throughput_target_gbps):
+            return object()
+
+    def test_concurrent_requests_share_the_target(self):
+        tuner = self._Tuner({}, None, None, 8 * MB, 8.0)
+        now = [0.0]
+        tuner._clock = lambda: now[0]
+        targets = []
+        for _ in range(25):
+            # 8 requests at a time, each only getting an eighth of the combined ~8.6 Gbps
+            decisions = [tuner.choose(128 * MB)[1] for _ in range(8)]
+            now[0] += 1.0
+            for decision in decisions:
+                tuner.observe(decision, None)
+            targets.append(decisions[0].throughput_target_gbps)
+
+        self.assertLess(decisions[0].observed_gbps, 0.25 * 8.0)
+        # together they saturate the 8 Gbps target, so it's raised (no sooner than MIN_SECONDS_BETWEEN_CHANGES),
+        # and then kept, since they reach well over a quarter of 16 Gbps
+        self.assertEqual([8.0] * 10 + [16.0] * 15, targets)
+
+    def test_requests_that_fail_to_start_are_not_in_flight(self):
+        tuner = self._Tuner({}, None, None, 8 * MB, 8.0)
+        _, decision = tuner.choose(128 * MB)
+        tier = decision._tier
+        self.assertEqual(1, tier.in_flight)
+        tuner.observe(decision, ValueError())
+        tuner.observe(decision, None)
+        self.assertEqual(0, tier.in_flight)
+        self.assertEqual([tier.client], tuner.clients())
+        self.assertIsNone(decision.observed_gbps)
+
+
+class S3PrioritySchedulerTest(unittest.TestCase):
+    WEIGHTS = {S3RequestPriority.LOW: 1, S3RequestPriority.NORMAL: 2, S3RequestPriority.HIGH: 4}
+
+    def test_lone_request_is_sent_at_once(self):
+        scheduler = _S3PriorityScheduler(self.WEIGHTS, max_in_flight=1)
+        sent = []
+        self.assertIsNone(scheduler.submit(S3RequestPriority.LOW, lambda: sent.append('low'), None))
+        self.assertEqual(['low'], sent)
+        scheduler.finished()
+        self.assertIsNone(scheduler.submit(S3RequestPriority.NORMAL, lambda: sent.append('normal'), None))
+        self.assertEqual(['low', 'normal'], sent)
+
+    def test_turns_are_weighted(self):
+        scheduler = _S3PriorityScheduler(self.WEIGHTS, max_in_flight=1)
+        sent = []
+        scheduler.submit(S3RequestPriority.LOW, lambda: sent.append(None), None)
+        for priority in self.WEIGHTS:
+            for _ in range(14):
+                self.assertIsNotNone(scheduler.submit(priority, functools.partial(sent.append, priority), None))
+        for _ in range(14):
+            scheduler.finished()
+
+        # 2 rounds of 7 turns, each split 4:2:1
+        del sent[0]
+        self.assertEqual(S3RequestPriority.HIGH, sent[0])
+        self.assertEqual([1, 2, 4], [sent[:7].count(priority) for priority in self.WEIGHTS])
+        self.assertEqual([2, 4, 8], [sent.count(priority) for priority in self.WEIGHTS])
+
+        # once HIGH has nothing waiting, its turns go to the others
+        for _ in range(28):
+            scheduler.finished()
+        self.assertEqual([14, 14, 14], [sent.count(priority) for priority in self.WEIGHTS])
+
+    def test_send_now_and_failure(self):
+        scheduler = _S3PriorityScheduler(self.WEIGHTS, max_in_flight=1)
+        scheduler.submit(S3RequestPriority.HIGH, lambda: None, None)
+        sent = []
+        failed = []
+
+        def start():
+            raise ValueError()
+
+        def fail(error):
+            failed.append(error)
+            scheduler.finished()
+
+        waiting = scheduler.submit(S3RequestPriority.HIGH, lambda: sent.append('cancelled'), None)
+        scheduler.submit(S3RequestPriority.HIGH, start, fail)
+        scheduler.submit(S3RequestPriority.LOW, lambda: sent.append('low'), None)
+        self.assertTrue(scheduler.send_now(waiting))
+        self.assertFalse(scheduler.send_now(waiting))
+        self.assertEqual(['cancelled'], sent)
+
+        # 2 in flight now, the failure passes its turn on
+        scheduler.finished()
+        self.assertEqual(1, len(failed))
+        self.assertEqual(['cancelled', 'low'], sent)
+        scheduler.finished()
+        scheduler.finished()
+        self.assertEqual(0, scheduler._in_flight)
+
+
+class S3WarmUpTest(unittest.TestCase):
+    class _Request:
+        def __init__(self, warm_up):
+            self.warm_up = warm_up
+
+        def cancel(self):
+            self.warm_up.on_done(error=ValueError('canceled'))
+
+    def test_request_fails_to_start(self):
+        warm_up = _S3WarmUp(4)
+        warm_up.add(self._Request(warm_up))
+        warm_up.on_done()
+        warm_up.add(self._Request(warm_up))
+        # the 3rd request raised, the 2nd is cancelled and the 4th never made
+        error = RuntimeError('no 3rd request')
+        warm_up.fail_to_start(error)
+        self.assertIs(error, warm_up.finished_future.exception(0))
+        self.assertEqual([], warm_up._requests)
+
+
+class S3StandInTest(NativeResourceTest):
+    """Runs S3Client against the local S3 stand-in, no network or credentials needed"""
+
+    def setUp(self):
+        self.timeout = 30  # seconds
+        self.stand_in = S3StandIn().start()
+        super().setUp()
+
+    def tearDown(self):
+        self.stand_in.close()
+        super().tearDown()
+
+    def _new_client(self):
+        return S3Client(bootstrap=None, region="us-east-1", tls_mode=S3RequestTlsMode.DISABLED, part_size=5 * MB)
+
+    def _headers(self):
+        return HttpHeaders([("host", self.stand_in.endpoint)])
+
+    def _wait(self, s3_request):
+        s3_request.finished_future.result(self.timeout)
+        shutdown_event = s3_request.shutdown_event
+        del s3_request
+        self.assertTrue(shutdown_event.wait(self.timeout))
+
+    def test_get_object(self):
+        data = os.urandom(12 * MB)
+        self.stand_in.put_object("/get.bin", data)
+        received = bytearray(len(data))
+
+        def on_body(chunk, offset, **kwargs):
+            received[offset:offset + len(chunk)] = chunk
+
+        s3_client = self._new_client()
+        self._wait(s3_client.make_request(
+            request=HttpRequest("GET", "/get.bin", self._headers()),
+            type=S3RequestType.GET_OBJECT,
+            on_body=on_body))
+        self.assertEqual(data, received)
+        # split into ranged parts
+        self.assertGreater(self.stand_in.stats["GetObject"], 1)
+
+    def test_get_object_to_file_metrics(self):
+        data = os.urandom(12 * MB)
+        self.stand_in.put_object("/metrics.bin", data)
+        with tempfile.TemporaryDirectory() as tmpdir:
+            recv_filepath = os.path.join(tmpdir, "metrics.bin")
+            s3_client = self._new_client()
+            # without on_part, the parts are counted natively and reported as the request finishes
+            s3_request = s3_client.make_request(
+                request=HttpRequest("GET", "/metrics.bin", self._headers()),
+                type=S3RequestType.GET_OBJECT,
+                recv_filepath=recv_filepath)
+            metrics = s3_request.metrics
+            s3_request.finished_future.result(self.timeout)
+            shutdown_event = s3_request.shutdown_event
+            del s3_request
+            self.assertTrue(shutdown_event.wait(self.timeout))
+            self.assertEqual(3, metrics.parts_received)
+            self.assertGreater(metrics.max_part_interval, 0.0)
+            self.assertEqual(3, s3_client.metrics.parts_received)
+            with open(recv_filepath, 'rb') as f:
+                self.assertEqual(data, f.read())
+
+    def test_get_object_async_read_backpressure(self):
+        data = os.urandom(12 * MB)
+        self.stand_in.put_object("/async.bin", data)
+        s3_client = S3Client(bootstrap=None, region="us-east-1", tls_mode=S3RequestTlsMode.DISABLED,
+                             part_size=5 * MB, enable_read_backpressure=True, initial_read_window=5 * MB)
+
+        async def get_object():
+            s3_request = s3_client.make_request_async(
+                request=HttpRequest("GET", "/async.bin", self._headers()),
+                type=S3RequestType.GET_OBJECT)
+            received = bytearray()
+            async for chunk in s3_request:
+                # the window only grows as chunks are taken, so a slow consumer holds the download back
+                await asyncio.sleep(0.01)
+                received.extend(chunk)
+            await s3_request
+            return received
+
+        self.assertEqual(data, asyncio.run(get_object()))
+
+    def test_get_object_resume_checksum(self):
+        data = os.urandom(12 * MB)
+        self.stand_in.put_object("/resume.bin", data)
+        s3_client = self._new_client()
+        with tempfile.TemporaryDirectory() as tmpdir:
+            checkpoint_filepath = os.path.join(tmpdir, "resume.checkpoint")
+            recv_filepath = os.path.join(tmpdir, "resume.bin")
+            s3_request = None
+
+            def on_part(part, **kwargs):
+                # interrupt once the first part is down
+                s3_request.cancel()
+
+            s3_request = s3_client.make_request(
+                request=HttpRequest("GET", "/resume.bin", self._headers()),
+                type=S3RequestType.GET_OBJECT,
+                recv_filepath=recv_filepath,
+                checkpoint_filepath=checkpoint_filepath,
+                on_part=on_part)
+            with self.assertRaises(Exception):
+                s3_request.finished_future.result(self.timeout)
+            self.assertTrue(os.path.exists(checkpoint_filepath))
+
+            results = []
+            request = HttpRequest("GET", "/resume.bin", self._headers())
+            s3_request = s3_client.make_request(
+                request=request,
+                type=S3RequestType.GET_OBJECT,
+                recv_filepath=recv_filepath,
+                checkpoint_filepath=checkpoint_filepath,
+                checksum_config=S3ChecksumConfig(algorithm=S3ChecksumAlgorithm.CRC32C),
+                on_done=lambda **kwargs: results.append(kwargs))
+            s3_request.finished_future.result(self.timeout)
+            self.assertIsNotNone(request.headers.get("Range"))
+            with open(recv_filepath, 'rb') as f:
+                self.assertEqual(data, f.read())
+            # the checksum covers what was downloaded before resuming too
+            self.assertEqual(crc32c(data).to_bytes(4, 'big'), results[-1]['object_checksum'])
+
+    def test_get_object_range_to_file(self):
+        data = os.urandom(12 * MB)
+        self.stand_in.put_object("/range.bin", data)
+        headers = self._headers()
+        headers.set("Range", "bytes={}-{}".format(3 * MB, 11 * MB - 1))
+        with tempfile.TemporaryDirectory() as tmpdir:
+            recv_filepath = os.path.join(tmpdir, "range.bin")
+            s3_client = self._new_client()
+            self._wait(s3_client.make_request(
+                request=HttpRequest("GET", "/range.bin", headers),
+                type=S3RequestType.GET_OBJECT,
+                recv_filepath=recv_filepath))
+            # the file holds just the range, from its start
+            with open(recv_filepath, 'rb') as f:
+                self.assertEqual(data[3 * MB:11 * MB], f.read())
+
+    def test_get_object_ranges(self):
+        data = os.urandom(12 * MB)
+        self.stand_in.put_object("/ranges.bin", data)
+        # the first two ranges are coalesced into one Range GET, the last is split into parts
+        ranges = [(100, 10), (7, 50), (2 * MB + 3, 6 * MB)]
+        received = [bytearray(length) for offset, length in ranges]
+
+        def on_body(chunk, offset, range_index, **kwargs):
+            # offset is in the object, not in the Range GET's body
+            range_offset = ranges[range_index][0]
+            received[range_index][offset - range_offset:offset - range_offset + len(chunk)] = chunk
+
+        s3_client = self._new_client()
+        ranged_request = s3_client.make_ranged_request(
+            request=HttpRequest("GET", "/ranges.bin", self._headers()),
+            ranges=ranges,
+            max_coalesce_gap=1024,
+            on_body=on_body)
+        self.assertEqual([(7, 103), (2 * MB + 3, 6 * MB)], ranged_request.fetched_ranges)
+        ranged_request.finished_future.result(self.timeout)
+        for (offset, length), body in zip(ranges, received):
+            self.assertEqual(data[offset:offset + length], body)
+
+    def test_put_object(self):
+        data = os.urandom(12 * MB)
+        headers = self._headers()
+        headers.set("Content-Length", str(len(data)))
+        s3_client = self._new_client()
+        self._wait(s3_client.make_request(
+            request=HttpRequest("PUT", "/put.bin", headers, io.BytesIO(data)),
+            type=S3RequestType.PUT_OBJECT))
+        self.assertEqual(data, self.stand_in.get_object("/put.bin"))
+        self.assertEqual(3, self.stand_in.stats["UploadPart"])
+
+    def test_get_object_buffer_pool_exhausted(self):
+        data = os.urandom(12 * MB)
+        self.stand_in.put_object("/pool.bin", data)
+        pool = S3BufferPool([bytearray(5 * MB)])
+        received = bytearray(len(data))
+        pooled = []
+
+        def on_body(chunk, offset, buffer, **kwargs):
+            received[offset:offset + len(chunk)] = chunk
+            if buffer is not None:
+                # hold on to it, so later parts find the pool empty
+                pooled.append(buffer)
+            else:
+                self.assertIsInstance(chunk, bytes)
+
+        s3_client = S3Client(bootstrap=None, region="us-east-1", tls_mode=S3RequestTlsMode.DISABLED,
+                             part_size=5 * MB, buffer_pool=pool)
+        self._wait(s3_client.make_request(
+            request=HttpRequest("GET", "/pool.bin", self._headers()),
+            type=S3RequestType.GET_OBJECT,
+            on_body=on_body))
+        # parts that found the pool empty were copied rather than waiting, which would never end
+        self.assertEqual(data, received)
+        self.assertEqual(1, len(pooled))
+        pool.release(pooled[0])
+        self.assertEqual(1, pool.available)
+
+    def test_retries_injected_errors(self):
+        data = os.urandom(MB)
+        self.stand_in.put_object("/retry.bin", data)
+        self.stand_in.inject_errors(2)
+        received = bytearray()
+
+        def on_body(chunk, **kwargs):
+            received.extend(chunk)
+
+        s3_client = self._new_client()
+        self._wait(s3_client.make_request(
+            request=HttpRequest("GET", "/retry.bin", self._headers()),
+            type=S3RequestType.GET_OBJECT,
+            on_body=on_body))
+        self.assertEqual(data, received)
+        self.assertEqual(2, self.stand_in.stats["errors_injected"])
+
+    def test_cpu_groups(self):
+        data = os.urandom(MB)
+        self.stand_in.put_object("/numa.bin", data)
+        cpu_groups = range(get_cpu_group_count())
+        s3_client = S3Client(bootstrap=None, region="us-east-1", tls_mode=S3RequestTlsMode.DISABLED,
+                             cpu_groups=cpu_groups)
+        shutdown_event = s3_client.shutdown_event
+        bodies = [bytearray() for i in range(2 * len(cpu_groups))]
+        s3_requests = []
+        for body in bodies:
+            s3_requests.append(s3_client.make_request(
+                request=HttpRequest("GET", "/numa.bin", self._headers()),
+                type=S3RequestType.GET_OBJECT,
+                on_body=lambda chunk, body=body, **kwargs: body.extend(chunk)))
+        for s3_request in s3_requests:
+            s3_request.finished_future.result(self.timeout)
+        for body in bodies:
+            self.assertEqual(data, body)
+
+        # shutdown_event also waits for the clients for each group
+        del s3_request
+        del s3_requests
+        del s3_client
+        self.assertTrue(shutdown_event.wait(self.timeout))
+
+        with self.assertRaises(ValueError):
+            S3Client(bootstrap=None, region="us-east-1", cpu_groups=[get_cpu_group_count()])
+        with self.assertRaises(ValueError):
+            S3Client(bootstrap=ClientBootstrap.get_or_create_static_default(), region="us-east-1", cpu_groups=[0])
+
+    def test_priority(self):
+        small = os.urandom(1024)
+        big = os.urandom(20 * MB)
+        self.stand_in.put_object("/small.bin", small)
+        self.stand_in.put_object("/big.bin", big)
+        s3_client = S3Client(bootstrap=None, region="us-east-1", tls_mode=S3RequestTlsMode.DISABLED,
+                             part_size=5 * MB, priority_weights={S3RequestPriority.LOW: 1},
+                             max_requests_in_flight=1)
+        shutdown_event = s3_client.shutdown_event
+        bodies = {}
+
+        def get(key, priority):
+            body = bodies.setdefault(key, bytearray())
+            return s3_client.make_request(
+                request=HttpRequest("GET", key, self._headers()),
+                type=S3RequestType.GET_OBJECT,
+                on_body=lambda chunk, **kwargs: body.extend(chunk),
+                priority=priority)
+
+        # the HIGH request waits for its turn, a lone request doesn't
+        s3_requests = [get("/big.bin", S3RequestPriority.LOW), get("/small.bin", S3RequestPriority.HIGH)]
+        for s3_request in s3_requests:
+            s3_request.finished_future.result(self.timeout)
+        self.assertEqual(big, bodies["/big.bin"])
+        self.assertEqual(small, bodies["/small.bin"])
+
+        # a waiting request that's cancelled fails at once
+        s3_requests = [get("/big.bin", S3RequestPriority.LOW), get("/small.bin", S3RequestPriority.HIGH)]
+        s3_requests[1].cancel()
+        with self.assertRaises(Exception):
+            s3_requests[1].finished_future.result(self.timeout)
+        s3_requests[0].finished_future.result(self.timeout)
+
+        del s3_request
+        del s3_requests
+        del s3_client
+        self.assertTrue(shutdown_event.wait(self.timeout))
+
+        with self.assertRaises(ValueError):
+            S3Client(bootstrap=None, region="us-east-1", priority_weights={S3RequestPriority.HIGH: 0})
+        with self.assertRaises(ValueError):
+            S3Client(bootstrap=None, region="us-east-1", priority_weights={}, adaptive=True)
+        with self.assertRaises(ValueError):
+            S3Client(bootstrap=None, region="us-east-1", max_requests_in_flight=4)
+
+    def test_warm_up(self):
+        s3_client = self._new_client()
+        s3_client.warm_up([self.stand_in.endpoint], connections=2).result(self.timeout)
+        self.assertEqual(2, self.stand_in.stats["requests"])
+
+        # nothing listening there
+        with self.assertRaises(Exception):
+            s3_client.warm_up(["127.0.0.1:1"]).result(self.timeout)
+
+    def test_streaming_upload(self):
+        data = os.urandom(11 * MB)
+        s3_client = self._new_client()
+        upload = s3_client.make_streaming_upload(
+            request=HttpRequest("PUT", "/streamed.bin", self._headers()),
+            source=io.BytesIO(data))
+        upload.finished_future.result(self.timeout)
+        self.assertEqual(data, self.stand_in.get_object("/streamed.bin"))
+
+    def test_streaming_upload_part_fails_to_start(self):
+        class FailingClient(S3Client):
+            def make_request(self, *, request, **kwargs):
+                if 'partNumber=3' in request.path:
+                    raise ValueError('part 3 fails')
+                return super().make_request(request=request, **kwargs)
+
+        s3_client = FailingClient(bootstrap=None, region="us-east-1", tls_mode=S3RequestTlsMode.DISABLED)
+        upload = s3_client.make_streaming_upload(
+            request=HttpRequest("PUT", "/streamed.bin", self._headers()),
+            source=io.BytesIO(os.urandom(16 * MB)),
+            part_size=5 * MB,
+            max_parts_in_flight=4)
+        with self.assertRaisesRegex(ValueError, 'part 3 fails'):
+            upload.finished_future.result(self.timeout)
+        # parts 1 and 2 were done with (not left in flight) before the upload was aborted
+        self.assertEqual(0, upload._in_flight)
+        self.assertEqual(1, self.stand_in.stats.get("AbortMultipartUpload"))
+        self.assertIsNone(self.stand_in.get_object("/streamed.bin"))
+
+
 @unittest.skipUnless(os.environ.get('AWS_TEST_S3'), 'set env var to run test: AWS_TEST_S3')
 class S3ClientTest(NativeResourceTest):
 
@@ -222,11 +807,366 @@ class S3RequestTest(NativeResourceTest):
         request = self._get_object_request(self.get_test_object_path)
         self._test_s3_put_get_object(request, S3RequestType.GET_OBJECT)
 
+    def test_get_object_reuse_body_buffer(self):
+        request = self._get_object_request(self.get_test_object_path)
+        s3_client = s3_client_new(False, self.region, 5 * MB)
+        chunks = []
+
+        def on_body(chunk, offset, **kwargs):
+            self.assertIsInstance(chunk, memoryview)
+            self.received_body_len += len(chunk)
+            # keep a derived view, and a copy to compare it against once the download is done
+            chunks.append((chunk[:], bytes(chunk)))
+
+        s3_request = s3_client.make_request(
+            request=request,
+            type=S3RequestType.GET_OBJECT,
+            on_headers=self._on_request_headers,
+            on_body=on_body,
+            reuse_body_buffer=True)
+        s3_request.finished_future.result(self.timeout)
+        self._validate_successful_get_response(False)
+
+        # kept chunks must still hold their own data, the buffer must not have been reused under them
+        self.assertTrue(len(chunks) > 0)
+        for kept, expected in chunks:
+            self.assertEqual(expected, bytes(kept))
+
+        shutdown_event = s3_request.shutdown_event
+        s3_request = None
+        self.assertTrue(shutdown_event.wait(self.timeout))
+
+    def test_get_object_buffer_pool(self):
+        request = self._get_object_request(self.get_test_object_path)
+        pool = S3BufferPool([bytearray(5 * MB) for i in range(2)])
+        s3_client = s3_client_new(False, self.region, 5 * MB, buffer_pool=pool)
+
+        def on_body(chunk, offset, buffer, **kwargs):
+            self.assertIsNotNone(buffer)
+            self.received_body_len += len(chunk)
+            pool.release(buffer)
+
+        s3_request = s3_client.make_request(
+            request=request,
+            type=S3RequestType.GET_OBJECT,
+            on_headers=self._on_request_headers,
+            on_body=on_body)
+        s3_request.finished_future.result(self.timeout)
+        self._validate_successful_get_response(False)
+        self.assertEqual(2, pool.available)
+
+        shutdown_event = s3_request.shutdown_event
+        s3_request = None
+        self.assertTrue(shutdown_event.wait(self.timeout))
+
+    def test_get_object_ranges(self):
+        request = self._get_object_request(self.get_test_object_path)
+        s3_client = s3_client_new(False, self.region, 5 * MB)
+        # the first two ranges are coalesced, the last is split into parts
+        ranges = [(100, 10), (0, 50), (2 * MB, 6 * MB)]
+        received = [0] * len(ranges)
+
+        def on_body(chunk, offset, range_index, **kwargs):
+            range_offset, range_length = ranges[range_index]
+            self.assertGreaterEqual(offset, range_offset)
+            self.assertLessEqual(offset + len(chunk), range_offset + range_length)
+            received[range_index] += len(chunk)
+
+        ranged_request = s3_client.make_ranged_request(
+            request=request,
+            ranges=ranges,
+            max_coalesce_gap=1024,
+            on_body=on_body)
+        self.assertEqual([(0, 110), (2 * MB, 6 * MB)], ranged_request.fetched_ranges)
+        ranged_request.finished_future.result(self.timeout)
+        self.assertEqual([length for offset, length in ranges], received)
+
+    def test_batch_transfer(self):
+        s3_client = s3_client_new(False, self.region, 5 * MB)
+        host = self._build_endpoint_string(self.region, self.bucket_name)
+        keys = ["batch_transfer_test_py/{}.txt".format(i) for i in range(5)]
+        upload_items = [(key, self.files.create_file_with_size(key, 10 * 1024)) for key in keys]
+
+        upload = s3_client.make_batch_transfer(
+            type=S3RequestType.PUT_OBJECT,
+            items=iter(upload_items),
+            host=host,
+            max_in_flight=2)
+        results = upload.finished_future.result(self.timeout)
+        self.assertEqual(len(keys), len(results))
+        for result in results:
+            self.assertIsNone(result.error)
+        self.assertEqual(0, upload.failed_count)
+        self.assertGreater(upload.objects_per_second, 0)
+
+        download_items = [(key, self.files.create_file("download_" + str(i), "")) for i, key in enumerate(keys)]
+        download = s3_client.make_batch_transfer(
+            type=S3RequestType.GET_OBJECT,
+            items=download_items,
+            host=host)
+        results = download.finished_future.result(self.timeout)
+        for result in results:
+            self.assertIsNone(result.error)
+            self.assertEqual(10 * 1024, os.stat(result.path).st_size)
+
+    def test_upload_download_directory(self):
+        s3_client = s3_client_new(False, self.region, 5 * MB)
+        host = self._build_endpoint_string(self.region, self.bucket_name)
+        prefix = "directory_test_py/"
+        relative_paths = ["a.txt", "sub/b.txt", "sub/deeper/c.txt"]
+        upload_dir = self.files.full_path("upload")
+        for path in relative_paths:
+            self.files.create_file_with_size(os.path.join("upload", path), 1024)
+
+        upload = s3_client.upload_directory(directory=upload_dir, host=host, prefix=prefix, skip_unchanged=False)
+        results = upload.finished_future.result(self.timeout)
+        self.assertEqual(sorted(prefix + path for path in relative_paths), sorted(r.key for r in results))
+        for result in results:
+            self.assertIsNone(result.error)
+
+        # nothing changed, so nothing is uploaded again
+        upload = s3_client.upload_directory(directory=upload_dir, host=host, prefix=prefix)
+        self.assertEqual([], upload.finished_future.result(self.timeout))
+
+        download_dir = self.files.full_path("download")
+        download = s3_client.download_directory(directory=download_dir, host=host, prefix=prefix)
+        for result in download.finished_future.result(self.timeout):
+            self.assertIsNone(result.error)
+        for path in relative_paths:
+            self.assertEqual(1024, os.stat(os.path.join(download_dir, path)).st_size)
+
+    def test_streaming_upload(self):
+        s3_client = s3_client_new(False, self.region, 5 * MB)
+        headers = HttpHeaders([("host", self._build_endpoint_string(self.region, self.bucket_name)),
+                               ("Content-Type", "text/plain")])
+
+        def body():
+            # 12 MiB, of unknown length, in odd sized chunks
+            for i in range(12):
+                yield b'a' * (MB - 1)
+            yield b'a' * 12
+
+        upload = s3_client.make_streaming_upload(
+            request=HttpRequest("PUT", self.put_test_object_path, headers),
+            source=body(),
+            max_parts_in_flight=2)
+        upload.finished_future.result(self.timeout)
+        self.assertIsNotNone(upload.upload_id)
+        self.assertEqual([1, 2, 3], [number for number, etag in upload.completed_parts])
+        self.assertEqual(12 * MB, upload.bytes_uploaded)
+
+        # a body that fits in one part is a single PutObject
+        upload = s3_client.make_streaming_upload(
+            request=HttpRequest("PUT", self.put_test_object_path, headers),
+            source=io.BytesIO(b'a' * 1024))
+        upload.finished_future.result(self.timeout)
+        self.assertIsNone(upload.upload_id)
+
+    def test_streaming_upload_resume(self):
+        s3_client = s3_client_new(False, self.region, 5 * MB)
+        headers = HttpHeaders([("host", self._build_endpoint_string(self.region, self.bucket_name)),
+                               ("Content-Type", "text/plain")])
+        checkpoint_filepath = os.path.join(self.files.rootdir, "upload.checkpoint")
+        data = os.urandom(17 * MB)
+
+        def interrupted_body():
+            # fail once 2 parts have been read
+            yield data[:10 * MB]
+            raise RuntimeError('interrupted')
+
+        upload = s3_client.make_streaming_upload(
+            request=HttpRequest("PUT", self.put_test_object_path, headers),
+            source=interrupted_body(),
+            checkpoint_filepath=checkpoint_filepath)
+        with self.assertRaises(RuntimeError):
+            upload.finished_future.result(self.timeout)
+        self.assertTrue(os.path.exists(checkpoint_filepath))
+        upload_id = upload.upload_id
+
+        upload = s3_client.make_streaming_upload(
+            request=HttpRequest("PUT", self.put_test_object_path, headers),
+            source=io.BytesIO(data),
+            checkpoint_filepath=checkpoint_filepath)
+        upload.finished_future.result(self.timeout)
+        self.assertEqual(upload_id, upload.upload_id)
+        self.assertEqual([1, 2, 3, 4], [number for number, etag in upload.completed_parts])
+        self.assertFalse(os.path.exists(checkpoint_filepath))
+
+    def test_get_object_resume(self):
+        s3_client = s3_client_new(False, self.region, 5 * MB)
+        checkpoint_filepath = os.path.join(self.files.rootdir, "download.checkpoint")
+        recv_filepath = os.path.join(self.files.rootdir, "download")
+        s3_request = None
+
+        def on_part(part, **kwargs):
+            # interrupt once the first part is down
+            s3_request.cancel()
+
+        s3_request = s3_client.make_request(
+            request=self._get_object_request(self.get_test_object_path),
+            type=S3RequestType.GET_OBJECT,
+            recv_filepath=recv_filepath,
+            checkpoint_filepath=checkpoint_filepath,
+            on_part=on_part)
+        with self.assertRaises(Exception):
+            s3_request.finished_future.result(self.timeout)
+        self.assertTrue(os.path.exists(checkpoint_filepath))
+
+        request = self._get_object_request(self.get_test_object_path)
+        s3_request = s3_client.make_request(
+            request=request,
+            type=S3RequestType.GET_OBJECT,
+            recv_filepath=recv_filepath,
+            checkpoint_filepath=checkpoint_filepath,
+            on_headers=self._on_request_headers,
+            on_progress=self._on_progress)
+        s3_request.finished_future.result(self.timeout)
+        self.assertEqual(206, self.response_status_code)
+        self.assertIsNotNone(request.headers.get("Range"))
+        self.assertLess(self.transferred_len, 10 * MB)
+        self.assertEqual(10 * MB, os.stat(recv_filepath).st_size)
+        self.assertFalse(os.path.exists(checkpoint_filepath))
+
+    def test_get_object_read_backpressure(self):
+        s3_client = s3_client_new(False, self.region, 5 * MB,
+                                  enable_read_backpressure=True, initial_read_window=5 * MB)
+        first_window_received = threading.Event()
+
+        def on_body(chunk, offset, **kwargs):
+            self.received_body_len += len(chunk)
+            if self.received_body_len >= 5 * MB:
+                first_window_received.set()
+
+        s3_request = s3_client.make_request(
+            request=self._get_object_request(self.get_test_object_path),
+            type=S3RequestType.GET_OBJECT,
+            on_body=on_body,
+            manual_read_window=True)
+        self.assertTrue(first_window_received.wait(self.timeout))
+        # nothing more arrives until the window grows
+        self.assertFalse(s3_request.finished_future.done())
+        self.assertEqual(5 * MB, self.received_body_len)
+
+        s3_request.increment_read_window(5 * MB)
+        s3_request.finished_future.result(self.timeout)
+        self.assertEqual(10 * MB, self.received_body_len)
+
+    def test_get_object_async(self):
+        s3_client = s3_client_new(False, self.region, 5 * MB)
+
+        async def get_object():
+            s3_request = s3_client.make_request_async(
+                request=self._get_object_request(self.get_test_object_path),
+                type=S3RequestType.GET_OBJECT,
+                max_buffered_bytes=5 * MB)
+            status_code, headers = await s3_request.wait_for_headers()
+            self.assertEqual(200, status_code)
+            received = 0
+            async for chunk in s3_request:
+                received += len(chunk)
+            await s3_request
+            return received
+
+        self.assertEqual(10 * MB, asyncio.run(get_object()))
+
+    def test_put_object_async_source(self):
+        s3_client = s3_client_new(False, self.region, 5 * MB)
+        headers = HttpHeaders([("host", self._build_endpoint_string(self.region, self.bucket_name)),
+                               ("Content-Type", "text/plain"), ("Content-Length", str(10 * MB))])
+        request = HttpRequest("PUT", self.put_test_object_path, headers)
+
+        async def body():
+            for i in range(10):
+                await asyncio.sleep(0)
+                yield b'a' * MB
+
+        async def put_object():
+            s3_request = s3_client.make_request_async(
+                request=request,
+                type=S3RequestType.PUT_OBJECT,
+                send_async_source=body(),
+                max_buffered_bytes=2 * MB)
+            async for chunk in s3_request:
+                pass
+            await s3_request
+            return s3_request.status_code
+
+        self.assertEqual(200, asyncio.run(put_object()))
+
+    def test_get_object_metrics(self):
+        s3_client = s3_client_new(False, self.region, 5 * MB)
+        parts = []
+        download_path = self.files.full_path("metrics_download")
+        s3_request = s3_client.make_request(
+            request=self._get_object_request(self.get_test_object_path),
+            type=S3RequestType.GET_OBJECT,
+            recv_filepath=download_path,
+            on_part=lambda part, **kwargs: parts.append(part))
+        s3_request.finished_future.result(self.timeout)
+
+        metrics = s3_request.metrics
+        self.assertEqual(10 * MB, metrics.bytes_transferred)
+        self.assertEqual(2, metrics.parts_received)
+        self.assertEqual([0, 5 * MB], sorted(part.offset for part in parts))
+        self.assertIsNotNone(metrics.time_to_first_byte)
+        self.assertGreaterEqual(metrics.duration, metrics.time_to_first_byte)
+
+        client_metrics = s3_client.metrics
+        self.assertEqual(1, client_metrics.requests_succeeded)
+        self.assertEqual(0, client_metrics.requests_in_flight)
+        self.assertEqual(10 * MB, client_metrics.bytes_transferred)
+
+    def test_adaptive_tuning(self):
+        s3_client = s3_client_new(False, self.region, 5 * MB, adaptive=True)
+        shutdown_event = s3_client.shutdown_event
+        request = self._put_object_request(self.temp_put_obj_file_path)
+        s3_request = s3_client.make_request(
+            request=request,
+            type=S3RequestType.PUT_OBJECT,
+            send_filepath=self.temp_put_obj_file_path)
+        s3_request.finished_future.result(self.timeout)
+        self.put_body_stream.close()
+        self.assertEqual(10 * MB, s3_request.tuning.object_size)
+        self.assertEqual(5 * MB, s3_request.tuning.part_size)
+        self.assertIsNotNone(s3_request.tuning.time_to_first_byte)
+        self.assertGreater(s3_request.tuning.observed_gbps, 0)
+
+        request = self._get_object_request(self.get_test_object_path)
+        s3_request = s3_client.make_request(
+            request=request,
+            type=S3RequestType.GET_OBJECT,
+            on_body=self._on_request_body)
+        s3_request.finished_future.result(self.timeout)
+        self.assertIsNone(s3_request.tuning.object_size)
+        self.assertEqual(2, len(s3_client.tuning_decisions))
+
+        # shutdown_event also waits for the clients used for each part size
+        s3_request = None
+        s3_client = None
+        self.assertTrue(shutdown_event.wait(self.timeout))
+
     def test_put_object(self):
         request = self._put_object_request(self.temp_put_obj_file_path)
         self._test_s3_put_get_object(request, S3RequestType.PUT_OBJECT)
         self.put_body_stream.close()
 
+    def test_copy_object(self):
+        headers = HttpHeaders([("host", self._build_endpoint_string(self.region, self.bucket_name)),
+                               ("x-amz-copy-source", "/" + self.bucket_name + self.get_test_object_path)])
+        request = HttpRequest("PUT", "/copy_object_test_py_10MB.txt", headers)
+        s3_client = s3_client_new(False, self.region, 5 * MB)
+        s3_request = s3_client.make_request(
+            request=request,
+            type=S3RequestType.COPY_OBJECT,
+            on_headers=self._on_request_headers)
+        s3_request.finished_future.result(self.timeout)
+        self.assertEqual(200, self.response_status_code)
+
+        request = HttpRequest("PUT", "/copy_object_test_py_10MB.txt", HttpHeaders(
+            [("host", self._build_endpoint_string(self.region, self.bucket_name))]))
+        with self.assertRaises(ValueError):
+            s3_client.make_request(request=request, type=S3RequestType.COPY_OBJECT)
+
     def test_put_object_multiple_times(self):
         s3_client = s3_client_new(False, self.region, 5 * MB)
         finished_futures = []
@@ -309,6 +1249,72 @@ class S3RequestTest(NativeResourceTest):
             "the transferred length reported does not match body we sent")
         self._validate_successful_get_response(request_type is S3RequestType.PUT_OBJECT)
 
+    def test_put_object_file_mmap(self):
+        request = self._put_object_request(self.temp_put_obj_file_path)
+        self.put_body_stream.close()
+        s3_client = s3_client_new(False, self.region, 5 * MB)
+        s3_request = s3_client.make_request(
+            request=request,
+            type=S3RequestType.PUT_OBJECT,
+            send_filepath=self.temp_put_obj_file_path,
+            send_filepath_mmap=True,
+            on_headers=self._on_request_headers,
+            on_progress=self._on_progress)
+        s3_request.finished_future.result(self.timeout)
+        self.assertEqual(self.data_len, self.transferred_len)
+        self._validate_successful_get_response(True)
+
+    def test_put_object_progress_interval(self):
+        request = self._put_object_request(self.temp_put_obj_file_path)
+        self.put_body_stream.close()
+        s3_client = s3_client_new(False, self.region, 5 * MB)
+        reports = []
+        s3_request = s3_client.make_request(
+            request=request,
+            type=S3RequestType.PUT_OBJECT,
+            send_filepath=self.temp_put_obj_file_path,
+            on_progress=reports.append,
+            progress_interval_bytes=4 * MB,
+            progress_interval_ms=0)
+        s3_request.finished_future.result(self.timeout)
+
+        self.assertEqual(self.data_len, sum(reports))
+        # only the remainder, reported when the request finishes, may be smaller than the interval
+        for progress in reports[:-1]:
+            self.assertGreaterEqual(progress, 4 * MB)
+
+    def test_put_get_object_checksum(self):
+        with open(self.temp_put_obj_file_path, 'rb') as f:
+            expected_checksum = crc32c(f.read()).to_bytes(4, 'big')
+        s3_client = s3_client_new(False, self.region, 5 * MB)
+        results = []
+
+        def on_done(**kwargs):
+            results.append(kwargs)
+
+        request = self._put_object_request(self.temp_put_obj_file_path)
+        self.put_body_stream.close()
+        s3_request = s3_client.make_request(
+            request=request,
+            type=S3RequestType.PUT_OBJECT,
+            send_filepath=self.temp_put_obj_file_path,
+            checksum_config=S3ChecksumConfig(algorithm=S3ChecksumAlgorithm.CRC32C),
+            on_done=on_done)
+        s3_request.finished_future.result(self.timeout)
+        self.assertEqual(expected_checksum, results[-1]['object_checksum'])
+
+        request = self._get_object_request(self.put_test_object_path)
+        s3_request = s3_client.make_request(
+            request=request,
+            type=S3RequestType.GET_OBJECT,
+            checksum_config=S3ChecksumConfig(algorithm=S3ChecksumAlgorithm.CRC32C, validate_response=True),
+            on_body=self._on_request_body,
+            on_done=on_done)
+        s3_request.finished_future.result(self.timeout)
+        self.assertTrue(results[-1]['did_validate_checksum'])
+        self.assertEqual(S3ChecksumAlgorithm.CRC32C, results[-1]['checksum_validation_algorithm'])
+        self.assertEqual(expected_checksum, results[-1]['object_checksum'])
+
     def test_put_object_file_object_move(self):
         # remove the input file when request done
         tempfile = self.files.create_file_with_size("temp_file", 10 * MB)